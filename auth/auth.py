@@ -1,20 +1,13 @@
 import os
 import streamlit as st
 from streamlit_lottie import st_lottie
-import requests
-import psycopg2
-from core.db import get_connection
+from core.animaciones import cargar_animacion
+from core.db import conexion
 from features.utils import registrar_entrada  # ✅ Bitácora
 
 # 📌 Ruta del logo usando la ubicación real
 LOGO_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "img", "uleam_logo.png")
 
-# Cargar animación Lottie desde URL
-def cargar_animacion(url):
-    r = requests.get(url)
-    if r.status_code == 200:
-        return r.json()
-    return None
 
 def login():
     st.set_page_config(page_title="Login", page_icon="🔐", layout="centered")
@@ -44,7 +37,7 @@ def login():
     st.markdown("Bienvenido al sistema de gestión futbolística. Por favor, inicia sesión para continuar.")
 
     # 🎬 Animación decorativa
-    animacion = cargar_animacion("https://lottie.host/f1dcbfd0-b816-4a86-8a64-3eeae51a03cc/XBOkU82A4J.json")
+    animacion = cargar_animacion("login")
     if animacion:
         st_lottie(animacion, height=180, key="login")
 
@@ -63,14 +56,13 @@ def login():
                 st.warning("⚠️ Por favor, completa todos los campos.")
             else:
                 try:
-                    conn = get_connection()
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT rol FROM usuarios WHERE nombre_usuario = %s AND contrasena = %s",
-                        (usuario, contrasena)
-                    )
-                    resultado = cursor.fetchone()
-                    conn.close()
+                    with conexion() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute(
+                            "SELECT rol FROM usuarios WHERE nombre_usuario = %s AND contrasena = %s",
+                            (usuario, contrasena)
+                        )
+                        resultado = cursor.fetchone()
 
                     if resultado:
                         st.success(f"✅ Bienvenido, {usuario}")
@@ -1,16 +1,9 @@
 import streamlit as st
 from streamlit_lottie import st_lottie
-import requests
-import psycopg2
+from core.animaciones import cargar_animacion
 from psycopg2 import errors
-from core.db import get_connection
+from core.db import conexion
 
-# Función para cargar animaciones desde URL
-def cargar_animacion(url):
-    r = requests.get(url)
-    if r.status_code == 200:
-        return r.json()
-    return None
 
 def register():
     st.set_page_config(page_title="Registro", page_icon="📝", layout="centered")
@@ -40,7 +33,7 @@ def register():
     st.markdown("Por favor, completa los campos para crear una cuenta nueva.")
 
     # Animación decorativa
-    animacion = cargar_animacion("https://lottie.host/2d0b3d94-7d14-4f8b-bf07-0a82cc8029d2/VnOeKzMTyM.json")
+    animacion = cargar_animacion("registro")
     if animacion:
         st_lottie(animacion, height=180, key="registro")
 
@@ -63,14 +56,13 @@ def register():
                 st.warning("⚠️ Las contraseñas no coinciden.")
             else:
                 try:
-                    conn = get_connection()
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT INTO usuarios (nombre_usuario, contrasena, rol)
-                        VALUES (%s, %s, %s)
-                    """, (nombre_usuario.strip(), contrasena.strip(), "invitado"))
-                    conn.commit()
-                    conn.close()
+                    with conexion() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute("""
+                            INSERT INTO usuarios (nombre_usuario, contrasena, rol)
+                            VALUES (%s, %s, %s)
+                        """, (nombre_usuario.strip(), contrasena.strip(), "invitado"))
+                        conn.commit()
 
                     st.success("✅ Registro exitoso. Redirigiendo al inicio de sesión...")
                     st.session_state["registro_ok"] = True
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-from core.db import get_connection
+from core.db import get_connection, liberar_conexion
+from core.trazas import tramo
 from psycopg2 import errors
 
 def gestion_usuarios():
@@ -10,11 +11,13 @@ def gestion_usuarios():
         st.error("🚫 Acceso restringido: solo disponible para administradores.")
         return
 
+    conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
 
-        df = pd.read_sql("SELECT id_usuario, nombre_usuario, rol FROM usuarios ORDER BY rol", conn)
+        with tramo("read_sql"):
+            df = pd.read_sql("SELECT id_usuario, nombre_usuario, rol FROM usuarios ORDER BY rol", conn)
 
         # Filtro de roles
         st.markdown("### 📋 Lista de usuarios registrados")
@@ -98,4 +101,4 @@ def gestion_usuarios():
     except Exception as e:
         st.error(f"❌ Error al conectar a la base de datos: {e}")
     finally:
-        conn.close()
+        liberar_conexion(conn)
@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import time
+import threading
+from core.paths import anim_path
+from core.trazas import trazado
+
+# 🎬 Caché de animaciones Lottie
+# Cada clave apunta a un archivo en assets/animaciones. Ningún rerun espera a la
+# red: si el archivo no está se muestra la animación por defecto y, si la clave
+# tiene URL, un hilo aparte la descarga y la guarda en assets/animaciones para
+# las lecturas siguientes. Un archivo que falta se vuelve a buscar (y a
+# descargar) como mucho cada ANIMACIONES_REINTENTO segundos.
+# Para dejarlas todas descargadas al desplegar:
+#     python -m core.animaciones
+
+ANIMACIONES = {
+    "login": ("login.json", "https://lottie.host/f1dcbfd0-b816-4a86-8a64-3eeae51a03cc/XBOkU82A4J.json"),
+    "registro": ("registro.json", "https://lottie.host/2d0b3d94-7d14-4f8b-bf07-0a82cc8029d2/VnOeKzMTyM.json"),
+    "graficos": ("graficos.json", "https://lottie.host/f6339a7d-3e55-4fd0-80db-1b5012fc0f44/vq13lQ86V5.json"),
+    "reportes": ("reportes.json", "https://lottie.host/8f1c5566-e4b9-4d08-8ad0-9b7348441bfb/yvOKmBGz1L.json"),
+    "sanciones": ("sanciones.json", "https://lottie.host/5aa309cf-d46f-4aa4-a548-6a49ac8bba9e/yFM4lqBCxg.json"),
+    "bienvenida": ("lottie_futbol.json", None),
+    "vistas": ("futbol.json", None),
+}
+
+ANIMACION_POR_DEFECTO = "lottie_futbol.json"
+REINTENTO = float(os.getenv("ANIMACIONES_REINTENTO", "300"))
+
+# Animaciones ya parseadas, por nombre de archivo (compartidas entre sesiones)
+_cache = {}
+# Archivos que faltaban / descargas lanzadas -> instante (monotonic) del último intento
+_faltantes = {}
+_descargas = {}
+_lock = threading.Lock()
+
+
+def _leer(nombre_archivo):
+    if nombre_archivo in _cache:
+        return _cache[nombre_archivo]
+    fallo = _faltantes.get(nombre_archivo)
+    if fallo is not None and time.monotonic() - fallo < REINTENTO:
+        return None
+    with _lock:
+        if nombre_archivo not in _cache:
+            ruta = anim_path(nombre_archivo)
+            try:
+                _cache[nombre_archivo] = json.loads(ruta.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                _faltantes[nombre_archivo] = time.monotonic()
+                return None
+            _faltantes.pop(nombre_archivo, None)
+    return _cache[nombre_archivo]
+
+
+def _descargar(nombre_archivo, url, timeout=10):
+    """Descarga `url` en assets/animaciones; lanza la excepción si falla."""
+    import requests
+    r = requests.get(url, timeout=timeout)
+    r.raise_for_status()
+    r.json()  # valida que sea JSON antes de guardarlo
+    anim_path(nombre_archivo).write_bytes(r.content)
+    _faltantes.pop(nombre_archivo, None)
+
+
+def _descargar_en_segundo_plano(nombre_archivo, url):
+    with _lock:
+        ultima = _descargas.get(nombre_archivo)
+        if ultima is not None and time.monotonic() - ultima < REINTENTO:
+            return
+        _descargas[nombre_archivo] = time.monotonic()
+
+    def tarea():
+        try:
+            _descargar(nombre_archivo, url)
+        except Exception as e:
+            print(f"⚠️ No se pudo descargar la animación {nombre_archivo}: {e}")
+
+    threading.Thread(target=tarea, name=f"animacion-{nombre_archivo}", daemon=True).start()
+
+
+@trazado("lottie.cargar")
+def cargar_animacion(clave):
+    """
+    Devuelve el JSON de la animación `clave` desde assets/animaciones, sin esperar a la red.
+    Si el archivo no existe o está dañado devuelve la animación por defecto (o None)
+    y, si la clave tiene URL, lanza su descarga en segundo plano.
+    """
+    nombre_archivo, url = ANIMACIONES.get(clave, (ANIMACION_POR_DEFECTO, None))
+    datos = _leer(nombre_archivo)
+    if datos is None and url:
+        _descargar_en_segundo_plano(nombre_archivo, url)
+    return datos or _leer(ANIMACION_POR_DEFECTO)
+
+
+def precargar(descargar=True, timeout=10):
+    """
+    Descarga las animaciones que falten en assets/animaciones y llena la caché en memoria.
+    Devuelve {clave: estado} con "ok", "descargada", "por defecto" o el error de descarga.
+    """
+    resultado = {}
+    for clave, (nombre_archivo, url) in ANIMACIONES.items():
+        ruta = anim_path(nombre_archivo)
+        estado = "ok"
+        if not ruta.exists() and url and descargar:
+            try:
+                _descargar(nombre_archivo, url, timeout)
+                _cache.pop(nombre_archivo, None)
+                estado = "descargada"
+            except Exception as e:
+                estado = f"error: {e}"
+        _faltantes.pop(nombre_archivo, None)
+        if _leer(nombre_archivo) is None:
+            estado = "por defecto" if estado in ("ok", "descargada") else f"{estado} (por defecto)"
+        resultado[clave] = estado
+    _leer(ANIMACION_POR_DEFECTO)
+    return resultado
+
+
+if __name__ == "__main__":
+    estados = precargar(descargar="--sin-red" not in sys.argv)
+    for clave, estado in estados.items():
+        print(f"{clave:12} {estado}")
@@ -0,0 +1,189 @@
+import os
+import re
+import sys
+import argparse
+from datetime import date
+from pathlib import Path
+from core.db import nueva_conexion, conexion
+from core.paths import ARCHIVO_DIR
+
+# 🗄️ Mantenimiento de la bitácora particionada (ver migraciones/001_bitacora_particionada.sql)
+#   - asegurar_particiones(): crea las particiones de los próximos meses.
+#   - archivar(): exporta a Parquet los meses antiguos, los separa y los borra.
+#   - leer_archivo(): consulta los meses archivados desde la pantalla de Bitácora.
+# Uso desde consola:
+#     python -m core.archivo_bitacora particiones --meses 3
+#     python -m core.archivo_bitacora archivar --conservar 12
+#     python -m core.archivo_bitacora listar
+
+PARTICION = re.compile(r"^bitacora_(\d{4})_(\d{2})$")
+COLUMNAS = ["id_bitacora", "usuario", "hora_ingreso", "hora_salida", "navegador", "ip",
+            "nombre_maquina", "tabla_afectada", "tipo_accion", "descripcion"]
+
+
+def directorio_archivo():
+    return Path(os.getenv("ARCHIVO_BITACORA_DIR", ARCHIVO_DIR / "bitacora"))
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("El archivo de bitácora necesita pyarrow: pip install pyarrow")
+
+
+def asegurar_particiones(meses_adelante=3):
+    """Crea las particiones mensuales que falten. Devuelve cuántas se crearon."""
+    with conexion() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT crear_particiones_bitacora(%s)", (meses_adelante,))
+        creadas = cur.fetchone()[0]
+        conn.commit()
+    return creadas
+
+
+def listar_particiones(conn):
+    """[(nombre, primer día del mes, filas estimadas)] de las particiones mensuales."""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT c.relname, c.reltuples::bigint
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'bitacora'::regclass
+        ORDER BY c.relname
+    """)
+    particiones = []
+    for nombre, filas in cur.fetchall():
+        m = PARTICION.match(nombre)
+        if m:
+            particiones.append((nombre, date(int(m.group(1)), int(m.group(2)), 1), max(filas, 0)))
+    return particiones
+
+
+def _exportar_particion(conn, nombre, destino, tamano_bloque=50_000):
+    """Vuelca una partición a Parquet (zstd) leyendo por bloques con un cursor de servidor."""
+    pa = _pyarrow()
+    esquema = pa.schema([
+        ("id_bitacora", pa.int64()), ("usuario", pa.string()), ("hora_ingreso", pa.timestamp("us")),
+        ("hora_salida", pa.timestamp("us")), ("navegador", pa.string()), ("ip", pa.string()),
+        ("nombre_maquina", pa.string()), ("tabla_afectada", pa.string()), ("tipo_accion", pa.string()),
+        ("descripcion", pa.string()),
+    ])
+    temporal = destino.with_suffix(".parquet.tmp")
+    filas = 0
+    cur = conn.cursor(name=f"exportar_{nombre}")
+    cur.itersize = tamano_bloque
+    cur.execute(f'SELECT {", ".join(COLUMNAS)} FROM "{nombre}" ORDER BY hora_ingreso, id_bitacora')
+    with pa.parquet.ParquetWriter(temporal, esquema, compression="zstd") as escritor:
+        while True:
+            bloque = cur.fetchmany(tamano_bloque)
+            if not bloque:
+                break
+            columnas = list(zip(*bloque))
+            escritor.write_table(pa.table(
+                {col: list(valores) for col, valores in zip(COLUMNAS, columnas)}, schema=esquema
+            ))
+            filas += len(bloque)
+    cur.close()
+    temporal.replace(destino)
+    return filas
+
+
+def archivar(conservar_meses=12, progreso=print):
+    """
+    Exporta a Parquet, separa (DETACH) y elimina las particiones con más de
+    `conservar_meses` meses de antigüedad. La partición del mes en curso nunca se archiva.
+    Devuelve [(partición, filas exportadas)].
+    """
+    hoy = date.today()
+    total_meses = hoy.year * 12 + hoy.month - 1 - max(conservar_meses, 1)
+    corte = date(total_meses // 12, total_meses % 12 + 1, 1)
+
+    carpeta = directorio_archivo()
+    carpeta.mkdir(parents=True, exist_ok=True)
+
+    archivadas = []
+    conn = nueva_conexion()
+    try:
+        for nombre, mes, _ in listar_particiones(conn):
+            if mes >= corte:
+                continue
+            destino = carpeta / f"{nombre}.parquet"
+            filas = _exportar_particion(conn, nombre, destino)
+            conn.commit()
+
+            cur = conn.cursor()
+            cur.execute(f'ALTER TABLE bitacora DETACH PARTITION "{nombre}"')
+            cur.execute(f'DROP TABLE "{nombre}"')
+            conn.commit()
+            archivadas.append((nombre, filas))
+            progreso(f"🗄️ {nombre}: {filas} filas → {destino}")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return archivadas
+
+
+def meses_archivados():
+    """[(primer día del mes, ruta)] de los archivos Parquet disponibles."""
+    meses = []
+    for ruta in sorted(directorio_archivo().glob("bitacora_*.parquet")):
+        m = PARTICION.match(ruta.stem)
+        if m:
+            meses.append((date(int(m.group(1)), int(m.group(2)), 1), ruta))
+    return meses
+
+
+def leer_archivo(fecha_ini, fecha_fin, usuario=None, tabla=None, accion=None):
+    """
+    Lee de los Parquet archivados las filas entre dos fechas (inclusive) que cumplan
+    los filtros. Solo abre los archivos de los meses que se solapan con el rango.
+    """
+    import pandas as pd
+    _pyarrow()
+
+    primer_mes = date(fecha_ini.year, fecha_ini.month, 1)
+    rutas = [ruta for mes, ruta in meses_archivados() if primer_mes <= mes <= fecha_fin]
+    if not rutas:
+        return pd.DataFrame(columns=COLUMNAS)
+
+    filtros = [("hora_ingreso", ">=", pd.Timestamp(fecha_ini)),
+               ("hora_ingreso", "<", pd.Timestamp(fecha_fin) + pd.Timedelta(days=1))]
+    for columna, valor in (("usuario", usuario), ("tabla_afectada", tabla), ("tipo_accion", accion)):
+        if valor is not None:
+            filtros.append((columna, "==", valor))
+
+    partes = [pd.read_parquet(ruta, filters=filtros) for ruta in rutas]
+    df = pd.concat(partes, ignore_index=True)
+    return df.sort_values(["hora_ingreso", "id_bitacora"], ascending=False, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento de la bitácora particionada")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_part = sub.add_parser("particiones", help="Crea las particiones de los próximos meses")
+    p_part.add_argument("--meses", type=int, default=3)
+    p_arch = sub.add_parser("archivar", help="Archiva en Parquet los meses antiguos")
+    p_arch.add_argument("--conservar", type=int, default=12, help="Meses que se quedan en la base de datos")
+    sub.add_parser("listar", help="Muestra particiones y meses archivados")
+    args = parser.parse_args()
+
+    if args.comando == "particiones":
+        print(f"✅ {asegurar_particiones(args.meses)} particiones creadas")
+    elif args.comando == "archivar":
+        hechas = archivar(args.conservar)
+        print(f"✅ {len(hechas)} particiones archivadas" if hechas else "✅ No hay meses para archivar")
+    else:
+        conn = nueva_conexion()
+        try:
+            for nombre, mes, filas in listar_particiones(conn):
+                print(f"🟢 {nombre:20} ~{filas} filas")
+        finally:
+            conn.close()
+        for mes, ruta in meses_archivados():
+            print(f"🗄️ {mes:%Y-%m}  {ruta}")
+    sys.exit(0)
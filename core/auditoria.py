@@ -0,0 +1,204 @@
+import os
+import time
+import queue
+import atexit
+import threading
+from datetime import date
+from psycopg2.extras import execute_values
+from core.db import conexion, obtener_pool
+from core.archivo_bitacora import asegurar_particiones
+from core.cache import invalidar
+
+# 📝 Escritura asíncrona de la bitácora
+# Las pantallas encolan eventos en memoria y un hilo los inserta por lotes,
+# así ningún login o guardado espera a la base de datos para auditarse.
+# hora_ingreso es el momento en que se encola el evento, en UTC con zona
+# horaria: al guardarlo en la columna TIMESTAMP la base lo convierte a su zona,
+# igual que el current_timestamp con el que se registra la hora de salida.
+
+COLUMNAS_BITACORA = (
+    "usuario", "hora_ingreso", "navegador", "ip", "nombre_maquina",
+    "tabla_afectada", "tipo_accion", "descripcion",
+)
+
+_VACIAR = object()   # marca que despierta al hilo para escribir lo pendiente
+_DETENER = object()
+
+
+class EscritorBitacora:
+    """
+    Cola acotada + hilo escritor que inserta la bitácora en lotes multi-fila.
+
+    Parámetros:
+        capacidad (int): Máximo de eventos en espera; si se llena se descartan los nuevos.
+        tamano_lote (int): Se escribe en cuanto se juntan estos eventos...
+        intervalo (float): ...o cuando pasan estos segundos desde el primero pendiente.
+        reintentos (int): Intentos adicionales por lote antes de descartarlo.
+        espera_encolar (float): Segundos que `registrar` espera si la cola está llena.
+    """
+
+    def __init__(self, capacidad=1000, tamano_lote=50, intervalo=2.0, reintentos=3, espera_encolar=0.05):
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.reintentos = reintentos
+        self.espera_encolar = espera_encolar
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._hilo = None
+        self._particiones_del = None   # día en que se revisaron las particiones por última vez
+        self._lock = threading.Lock()
+        self._stats = {"encolados": 0, "escritos": 0, "lotes": 0, "descartados": 0, "reintentos": 0}
+
+    def registrar(self, evento):
+        """Encola un evento (tupla en el orden de COLUMNAS_BITACORA). Devuelve False si se descartó."""
+        self._arrancar()
+        try:
+            self._cola.put(evento, timeout=self.espera_encolar)
+        except queue.Full:
+            self._contar("descartados")
+            return False
+        self._contar("encolados")
+        return True
+
+    def vaciar(self, timeout=5.0):
+        """Fuerza la escritura de lo pendiente y espera a que termine. Devuelve True si quedó vacía."""
+        if self._hilo is None:
+            return True
+        try:
+            self._cola.put_nowait(_VACIAR)
+        except queue.Full:
+            pass  # con la cola llena el hilo ya está escribiendo lotes completos
+        limite = time.monotonic() + timeout
+        with self._cola.all_tasks_done:
+            while self._cola.unfinished_tasks:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return False
+                self._cola.all_tasks_done.wait(restante)
+        return True
+
+    def detener(self, timeout=5.0):
+        """Escribe lo pendiente y termina el hilo (se llama al cerrar el proceso)."""
+        if self._hilo is None:
+            return
+        self.vaciar(timeout)
+        self._cola.put(_DETENER)
+        self._hilo.join(timeout)
+        self._hilo = None
+
+    def estadisticas(self):
+        with self._lock:
+            datos = dict(self._stats)
+        datos["pendientes"] = self._cola.qsize()
+        return datos
+
+    # 🔧 Internos
+    def _contar(self, clave, n=1):
+        with self._lock:
+            self._stats[clave] += n
+
+    def _arrancar(self):
+        if self._hilo is None:
+            with self._lock:
+                if self._hilo is None:
+                    self._hilo = threading.Thread(target=self._bucle, name="escritor-bitacora", daemon=True)
+                    self._hilo.start()
+
+    def _revisar_particiones(self):
+        """Una vez al día, que nunca falte la partición del mes en curso ni las siguientes."""
+        hoy = date.today()
+        if self._particiones_del == hoy:
+            return
+        self._particiones_del = hoy
+        try:
+            asegurar_particiones()
+        except Exception as e:
+            print(f"⚠️ No se pudieron crear las particiones de la bitácora: {e}")
+
+    def _bucle(self):
+        lote, primero = [], None
+        while True:
+            self._revisar_particiones()
+            espera = self.intervalo if primero is None else max(0.0, primero + self.intervalo - time.monotonic())
+            try:
+                item = self._cola.get(timeout=espera)
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not _VACIAR and item is not _DETENER:
+                lote.append(item)
+                primero = primero or time.monotonic()
+
+            lleno = len(lote) >= self.tamano_lote
+            vencido = primero is not None and time.monotonic() - primero >= self.intervalo
+            if lote and (lleno or vencido or item is _VACIAR or item is _DETENER):
+                self._escribir(lote)
+                for _ in lote:
+                    self._cola.task_done()
+                lote, primero = [], None
+
+            if item is _VACIAR or item is _DETENER:
+                self._cola.task_done()
+            if item is _DETENER:
+                return
+
+    def _escribir(self, lote):
+        for intento in range(self.reintentos + 1):
+            confirmado = False
+            try:
+                with conexion() as conn:
+                    cur = conn.cursor()
+                    execute_values(
+                        cur,
+                        f"INSERT INTO bitacora ({', '.join(COLUMNAS_BITACORA)}) VALUES %s",
+                        lote,
+                    )
+                    conn.commit()
+                    confirmado = True
+                self._contar("escritos", len(lote))
+                self._contar("lotes")
+                invalidar("bitacora")
+                return
+            except Exception as e:
+                if confirmado:
+                    # El lote ya está en la base: reintentarlo lo insertaría dos veces
+                    print(f"⚠️ Lote de bitácora escrito, pero falló después del commit: {e}")
+                    return
+                if intento < self.reintentos:
+                    self._contar("reintentos")
+                    time.sleep(min(0.5 * 2 ** intento, 5))
+                else:
+                    self._contar("descartados", len(lote))
+                    print(f"❌ Error al escribir lote de bitácora ({len(lote)} eventos): {e}")
+
+
+_escritor = None
+_escritor_lock = threading.Lock()
+
+
+def obtener_escritor():
+    """Escritor único del proceso, configurado con BITACORA_* del entorno."""
+    global _escritor
+    if _escritor is None:
+        with _escritor_lock:
+            if _escritor is None:
+                obtener_pool()  # así atexit detiene el escritor antes de cerrar el pool
+                _escritor = EscritorBitacora(
+                    capacidad=int(os.getenv("BITACORA_CAPACIDAD", "1000")),
+                    tamano_lote=int(os.getenv("BITACORA_LOTE", "50")),
+                    intervalo=float(os.getenv("BITACORA_INTERVALO", "2")),
+                    reintentos=int(os.getenv("BITACORA_REINTENTOS", "3")),
+                )
+                atexit.register(_escritor.detener)
+    return _escritor
+
+
+def encolar_evento(evento):
+    return obtener_escritor().registrar(evento)
+
+
+def vaciar_bitacora(timeout=5.0):
+    return obtener_escritor().vaciar(timeout)
+
+
+def estadisticas_bitacora():
+    return obtener_escritor().estadisticas()
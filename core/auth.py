@@ -1,16 +1,9 @@
 import streamlit as st
 from streamlit_lottie import st_lottie
-import requests
-import psycopg2
-from core.db import get_connection
+from core.animaciones import cargar_animacion
+from core.db import conexion
 from features.utils import registrar_entrada  # ✅ Bitácora
 
-# Cargar animación Lottie desde URL
-def cargar_animacion(url):
-    r = requests.get(url)
-    if r.status_code == 200:
-        return r.json()
-    return None
 
 def login():
     st.set_page_config(page_title="Login", page_icon="🔐", layout="centered")
@@ -40,7 +33,7 @@ def login():
     st.markdown("Bienvenido al sistema de gestión futbolística. Por favor, inicia sesión para continuar.")
 
     # Animación decorativa
-    animacion = cargar_animacion("https://lottie.host/f1dcbfd0-b816-4a86-8a64-3eeae51a03cc/XBOkU82A4J.json")
+    animacion = cargar_animacion("login")
     if animacion:
         st_lottie(animacion, height=180, key="login")
 
@@ -58,14 +51,13 @@ def login():
                 st.warning("⚠️ Por favor, completa todos los campos.")
             else:
                 try:
-                    conn = get_connection()
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT rol FROM usuarios WHERE nombre_usuario = %s AND contrasena = %s",
-                        (usuario, contrasena)
-                    )
-                    resultado = cursor.fetchone()
-                    conn.close()
+                    with conexion() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute(
+                            "SELECT rol FROM usuarios WHERE nombre_usuario = %s AND contrasena = %s",
+                            (usuario, contrasena)
+                        )
+                        resultado = cursor.fetchone()
 
                     if resultado:
                         st.success(f"✅ Bienvenido, {usuario}")
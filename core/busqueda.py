@@ -0,0 +1,103 @@
+import time
+import pandas as pd
+from core.cache import consultar, consultar_filas
+from core.catalogo import escapar_like, buscar_partidos, _rango_fechas
+
+# 🔎 Búsqueda global
+# Una sola consulta busca el texto en jugadores, equipos, entrenadores y torneos
+# sin distinguir mayúsculas ni acentos (normalizar_busqueda, migraciones/006) y
+# devuelve los resultados con su tipo, ordenados por puntaje. Con pg_trgm además
+# tolera errores de tipeo ("macra" → Macará) y cada rama entra por su índice de
+# trigramas; sin pg_trgm busca el texto dentro del nombre.
+# Los partidos se buscan por fecha o por cruce ("Emelec vs Barcelona") con
+# core/catalogo.buscar_partidos.
+
+MIN_LETRAS = 2
+
+# tipo -> (FROM, id, etiqueta, detalle, tablas que lee)
+FUENTES = {
+    "jugador": ("jugadores x LEFT JOIN equipos e ON e.id_equipo = x.id_equipo",
+                "x.id_jugador", "x.nombre", "COALESCE(e.nombre_equipo, 'Sin equipo')", ("jugadores", "equipos")),
+    "equipo": ("equipos x", "x.id_equipo", "x.nombre_equipo", "x.pais", ("equipos",)),
+    "entrenador": ("entrenadores x LEFT JOIN equipos e ON e.id_equipo = x.id_equipo",
+                   "x.id_entrenador", "x.nombre", "COALESCE(e.nombre_equipo, 'Sin equipo')", ("entrenadores", "equipos")),
+    "torneo": ("torneos x", "x.id_torneo", "x.nombre", "x.categoria", ("torneos",)),
+}
+
+# Exacto, al inicio del nombre, al inicio de otra palabra, en cualquier parte
+_PUNTAJE = """
+    CASE WHEN {n} = normalizar_busqueda(%(texto)s) THEN 1.0
+         WHEN {n} LIKE normalizar_busqueda(%(prefijo)s) THEN 0.9
+         WHEN {n} LIKE '%% ' || normalizar_busqueda(%(prefijo)s) THEN 0.8
+         WHEN {n} LIKE normalizar_busqueda(%(contiene)s) THEN 0.6
+         ELSE 0 END
+"""
+
+
+# Se vuelve a preguntar cada tanto: si la migración 006 se aplica (o pg_trgm vuelve)
+# con la aplicación andando, la búsqueda pasa a los trigramas sin reiniciar
+REVISAR_TRIGRAMAS = 300
+_trigramas = {"hay": None, "revisado": 0.0}
+
+
+def _hay_trigramas():
+    """True si la base tiene los índices de trigramas de migraciones/006 (pg_trgm)."""
+    if _trigramas["hay"] is None or time.monotonic() - _trigramas["revisado"] > REVISAR_TRIGRAMAS:
+        _, filas = consultar_filas("SELECT to_regclass('idx_busqueda_jugadores') IS NOT NULL")
+        _trigramas.update(hay=filas[0][0], revisado=time.monotonic())
+    return _trigramas["hay"]
+
+
+def _rama(tipo, limite, trigramas):
+    origen, id_, etiqueta, detalle, _ = FUENTES[tipo]
+    n = f"normalizar_busqueda({etiqueta})"
+    puntaje = _PUNTAJE.format(n=n)
+    condicion = f"{n} LIKE normalizar_busqueda(%(contiene)s)"
+    if trigramas:
+        # word_similarity compara el texto con la palabra más parecida del nombre
+        puntaje = f"GREATEST({puntaje}, word_similarity(normalizar_busqueda(%(texto)s), {n}))"
+        condicion = f"({condicion} OR normalizar_busqueda(%(texto)s) <%% {n})"
+    return f"""
+        (SELECT '{tipo}' AS tipo, {id_} AS id, {etiqueta} AS etiqueta, {detalle} AS detalle, {puntaje} AS puntaje
+         FROM {origen}
+         WHERE {condicion}
+         ORDER BY puntaje DESC, {etiqueta}
+         LIMIT {int(limite)})
+    """
+
+
+def buscar(texto, tipos=None, limite=10):
+    """
+    Busca `texto` en los `tipos` pedidos (por defecto todos los de FUENTES y partidos).
+
+    Devuelve:
+        DataFrame con tipo, id, etiqueta, detalle y puntaje (0 a 1), mejores primero.
+    """
+    texto = " ".join(texto.split())
+    columnas = ["tipo", "id", "etiqueta", "detalle", "puntaje"]
+    if len(texto) < MIN_LETRAS:
+        return pd.DataFrame(columns=columnas)
+    tipos = list(tipos or list(FUENTES) + ["partido"])
+
+    partes = []
+    fuentes = [t for t in tipos if t in FUENTES]
+    if fuentes:
+        tablas = sorted({tabla for t in fuentes for tabla in FUENTES[t][4]})
+        sql = " UNION ALL ".join(_rama(t, limite, _hay_trigramas()) for t in fuentes)
+        params = {"texto": texto, "prefijo": escapar_like(texto) + "%", "contiene": f"%{escapar_like(texto)}%"}
+        partes.append(consultar(f"SELECT * FROM ({sql}) r ORDER BY puntaje DESC, etiqueta LIMIT {int(limite)}",
+                                params, tablas=tablas))
+
+    # Un partido se busca por su fecha o por los dos equipos; un solo nombre ya trae al equipo
+    if "partido" in tipos and (_rango_fechas(texto) or " vs" in texto.lower()):
+        partidos = buscar_partidos(texto, limite=limite)
+        partes.append(pd.DataFrame({
+            "tipo": "partido", "id": partidos.ids, "etiqueta": [partidos.etiqueta(i) for i in partidos.ids],
+            "detalle": "Partido", "puntaje": 1.0,
+        }, columns=columnas))
+
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        return pd.DataFrame(columns=columnas)
+    resultados = pd.concat(partes, ignore_index=True)
+    return resultados.sort_values("puntaje", ascending=False, kind="stable").head(limite).reset_index(drop=True)
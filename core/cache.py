@@ -0,0 +1,233 @@
+import os
+import sys
+import time
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from core.db import conexion, es_replica, escrita_hace_poco, marcar_escritura
+from core.trazas import tramo
+
+# 🗃️ Caché de resultados de consultas
+# La clave de cada resultado es (sql, parámetros, versión de cada tabla leída).
+# Las rutas de escritura llaman a `invalidar(tabla)` después del commit: la versión
+# sube y las entradas que leían esa tabla dejan de poder encontrarse (y se liberan).
+# Memoria acotada con desalojo LRU; además cada entrada caduca a los
+# CACHE_CONSULTAS_TTL segundos por si alguien escribe fuera de la aplicación.
+
+# Escribir en la tabla de la izquierda también cambia las de la derecha
+# (triggers y claves foráneas ON DELETE CASCADE / SET NULL de tablas.sql y migraciones/).
+DEPENDENCIAS = {
+    "equipos": ("bitacora", "jugadores", "partidos", "entrenadores"),
+    "jugadores": ("bitacora", "estadisticas", "sanciones", "totales_jugadores"),
+    "partidos": ("bitacora", "estadisticas", "sanciones", "asistencias_partido"),
+    "estadisticas": ("bitacora", "totales_jugadores"),
+    "sanciones": ("bitacora",),
+    "torneos": ("partidos",),
+}
+
+# Tablas que lee cada vista de la base de datos
+VISTAS = {
+    "vista_estadisticas_jugadores": ("jugadores", "equipos", "totales_jugadores"),
+    "vista_partidos_completos": ("partidos", "equipos", "torneos"),
+    "vista_sanciones_jugadores": ("sanciones", "jugadores", "equipos", "partidos"),
+}
+
+
+def _tamano(filas):
+    """Bytes aproximados de una lista de tuplas (contenedores + valores)."""
+    total = sys.getsizeof(filas)
+    for fila in filas:
+        total += sys.getsizeof(fila) + sum(sys.getsizeof(v) for v in fila)
+    return total
+
+
+class CacheConsultas:
+    """
+    Caché LRU acotada en bytes para resultados (columnas, filas).
+
+    Parámetros:
+        max_bytes (int): Memoria máxima de todas las entradas juntas.
+        ttl (float): Segundos de vida de cada entrada (0 = sin caducidad).
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=300):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entradas = OrderedDict()   # clave -> (columnas, filas, tamaño, creada, tablas)
+        self._versiones = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"aciertos": 0, "fallos": 0, "desalojos": 0, "invalidaciones": 0, "caducadas": 0}
+
+    def _version(self, tablas):
+        return tuple((t, self._versiones.get(t, 0)) for t in sorted(set(tablas)))
+
+    def _clave(self, sql, params, tablas):
+        return sql, repr(params), self._version(tablas)
+
+    def version(self, tablas):
+        with self._lock:
+            return self._version(tablas)
+
+    def obtener(self, sql, params, tablas, ejecutar):
+        """Devuelve (columnas, filas) desde la caché o llamando a `ejecutar()`."""
+        with self._lock:
+            clave = self._clave(sql, params, tablas)
+            entrada = self._entradas.get(clave)
+            if entrada and self.ttl and time.monotonic() - entrada[3] > self.ttl:
+                self._quitar(clave)
+                self._stats["caducadas"] += 1
+                entrada = None
+            if entrada:
+                self._entradas.move_to_end(clave)
+                self._stats["aciertos"] += 1
+                return entrada[0], entrada[1]
+            self._stats["fallos"] += 1
+
+        # La consulta corre fuera del lock; la clave ya lleva las versiones de antes
+        # de leer, así que si alguien escribe mientras tanto el resultado nace obsoleto.
+        columnas, filas = ejecutar()
+        tamano = _tamano(filas)
+        if tamano <= self.max_bytes:
+            with self._lock:
+                if clave not in self._entradas:
+                    self._entradas[clave] = (columnas, filas, tamano, time.monotonic(), frozenset(tablas))
+                    self._bytes += tamano
+                    while self._bytes > self.max_bytes:
+                        self._quitar(next(iter(self._entradas)))
+                        self._stats["desalojos"] += 1
+        return columnas, filas
+
+    def invalidar(self, *tablas):
+        """Sube la versión de las tablas (y de las que dependen de ellas) y libera sus entradas."""
+        afectadas, pendientes = set(), list(tablas)
+        while pendientes:
+            tabla = pendientes.pop()
+            if tabla not in afectadas:
+                afectadas.add(tabla)
+                pendientes.extend(DEPENDENCIAS.get(tabla, ()))
+        with self._lock:
+            for tabla in afectadas:
+                self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+            for clave in [c for c, e in self._entradas.items() if e[4] & afectadas]:
+                self._quitar(clave)
+            self._stats["invalidaciones"] += 1
+        return afectadas
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        with self._lock:
+            datos = dict(self._stats)
+            datos.update(entradas=len(self._entradas), bytes=self._bytes, max_bytes=self.max_bytes)
+        consultas = datos["aciertos"] + datos["fallos"]
+        datos["tasa_aciertos"] = round(datos["aciertos"] / consultas, 3) if consultas else 0.0
+        return datos
+
+    def _quitar(self, clave):
+        entrada = self._entradas.pop(clave)
+        self._bytes -= entrada[2]
+
+
+_cache = CacheConsultas(
+    max_bytes=int(float(os.getenv("CACHE_CONSULTAS_MB", "64")) * 1024 * 1024),
+    ttl=float(os.getenv("CACHE_CONSULTAS_TTL", "300")),
+)
+
+
+def consultar_filas(sql, params=None, tablas=(), conn=None):
+    """
+    Ejecuta un SELECT a través de la caché y devuelve (columnas, filas).
+
+    Parámetros:
+        sql (str): Consulta de solo lectura.
+        params: Parámetros de la consulta (tupla, lista o dict).
+        tablas (tuple): Tablas (o vistas de VISTAS) que lee; sin tablas no se cachea.
+        conn: Conexión a usar si hay que ir a la base de datos (si no, una del pool).
+    """
+    leidas = _tablas_base(tablas)
+
+    def ejecutar():
+        # Lo recién escrito puede no haber llegado a la réplica: esas lecturas van a la principal
+        primaria = escrita_hace_poco(leidas)
+        if conn is not None and not (primaria and es_replica(conn)):
+            return _ejecutar(conn, sql, params)
+        with conexion(primaria) as nueva:
+            return _ejecutar(nueva, sql, params)
+
+    if not tablas:
+        return ejecutar()
+    return _cache.obtener(sql, params, leidas, ejecutar)
+
+
+def consultar(sql, params=None, tablas=(), conn=None):
+    """Igual que `consultar_filas` pero devuelve un DataFrame nuevo (se puede modificar)."""
+    columnas, filas = consultar_filas(sql, params, tablas, conn)
+    with tramo("dataframe", filas=len(filas)):
+        return pd.DataFrame(filas, columns=columnas)
+
+
+_ejecutor = None
+_ejecutor_lock = threading.Lock()
+
+
+def consultar_en_paralelo(consultas):
+    """
+    Lanza a la vez las consultas {nombre: (sql, params, tablas)}, cada una con su
+    conexión del pool, y devuelve un iterador de (nombre, DataFrame) en el orden en
+    que van terminando, para dibujar cada panel apenas llegan sus datos.
+    Cada consulta corre con el contexto de quien llama (pantalla, réplica, traza).
+    Hasta CONSULTAS_PARALELAS consultas a la vez en todo el proceso.
+    """
+    global _ejecutor
+    if _ejecutor is None:
+        with _ejecutor_lock:
+            if _ejecutor is None:
+                _ejecutor = ThreadPoolExecutor(max_workers=int(os.getenv("CONSULTAS_PARALELAS", "4")),
+                                               thread_name_prefix="consultas")
+    futuros = {
+        _ejecutor.submit(contextvars.copy_context().run, consultar, sql, params, tablas): nombre
+        for nombre, (sql, params, tablas) in consultas.items()
+    }
+    return ((futuros[futuro], futuro.result()) for futuro in as_completed(futuros))
+
+
+def _tablas_base(tablas):
+    leidas = []
+    for tabla in tablas:
+        leidas.extend(VISTAS.get(tabla, (tabla,)))
+    return leidas
+
+
+def _ejecutar(conn, sql, params):
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    columnas = [desc[0] for desc in cur.description]
+    return columnas, cur.fetchall()
+
+
+def invalidar(*tablas):
+    marcar_escritura(*_cache.invalidar(*tablas))
+
+
+def recien_escritas(tablas):
+    """True si alguna tabla (o tabla de una vista) se escribió hace muy poco para leerla de la réplica."""
+    return escrita_hace_poco(_tablas_base(tablas))
+
+
+def version_datos(tablas):
+    """Versión actual de los datos de esas tablas (o vistas); cambia con cada `invalidar`."""
+    return _cache.version(_tablas_base(tablas))
+
+
+def limpiar_cache():
+    _cache.limpiar()
+
+
+def estadisticas_cache():
+    return _cache.estadisticas()
@@ -0,0 +1,205 @@
+import re
+import time
+import threading
+from datetime import date
+from core.cache import consultar_filas
+
+# 📚 Catálogo de datos de referencia para los formularios
+# Equipos, torneos y partidos (con su etiqueta «Local vs Visitante - fecha»)
+# compartidos por todo el proceso, con diccionarios id → etiqueta y etiqueta → id
+# para no recorrer listas en cada rerun. Las filas salen de la caché de consultas,
+# así que cada catálogo se reconstruye solo cuando `invalidar()` (o el TTL) cambia
+# esas filas; mientras tanto todas las sesiones y pantallas reusan el mismo objeto.
+# Jugadores y partidos crecen sin límite, así que los formularios no los listan
+# enteros: `buscar_jugadores` y `buscar_partidos` devuelven una página corta de
+# candidatos por índice (migraciones/005) con el mismo formato de catálogo.
+
+LIMITE_BUSQUEDA = 20
+
+
+class Catalogo:
+    """
+    Lista ordenada de (id, etiqueta, *extras) con búsquedas en ambos sentidos.
+    Si dos filas comparten etiqueta, se distinguen agregando « (#id)».
+    """
+
+    def __init__(self, filas):
+        self.ids = []
+        self.etiquetas = {}
+        self.extras = {}
+        repetidas = _repetidas(fila[1] for fila in filas)
+        for id_, etiqueta, *extras in filas:
+            texto = str(etiqueta)
+            self.ids.append(id_)
+            self.etiquetas[id_] = f"{texto} (#{id_})" if texto in repetidas else texto
+            self.extras[id_] = tuple(extras)
+        self.por_etiqueta = {etiqueta: id_ for id_, etiqueta in self.etiquetas.items()}
+
+    def etiqueta(self, id_):
+        """Etiqueta de un id; sirve directo como `format_func` de un selectbox sobre `ids`."""
+        return self.etiquetas.get(id_, f"#{id_}")
+
+    def id(self, etiqueta):
+        return self.por_etiqueta.get(etiqueta)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __bool__(self):
+        return bool(self.ids)
+
+
+def _repetidas(etiquetas):
+    vistas, repetidas = set(), set()
+    for etiqueta in map(str, etiquetas):
+        (repetidas if etiqueta in vistas else vistas).add(etiqueta)
+    return repetidas
+
+
+_catalogos = {}   # nombre -> (filas de la caché, Catalogo)
+_lock = threading.Lock()
+
+
+def _catalogo(nombre, sql, tablas):
+    # Mientras la caché devuelva la misma lista de filas, el catálogo sigue vigente
+    _, filas = consultar_filas(sql, tablas=tablas)
+    with _lock:
+        guardado = _catalogos.get(nombre)
+        if guardado and guardado[0] is filas:
+            return guardado[1]
+    catalogo = Catalogo(filas)
+    with _lock:
+        _catalogos[nombre] = (filas, catalogo)
+    return catalogo
+
+
+def equipos():
+    return _catalogo("equipos", """
+        SELECT id_equipo, nombre_equipo FROM equipos ORDER BY nombre_equipo, id_equipo
+    """, ("equipos",))
+
+
+def partidos():
+    """Partidos, más recientes primero; extras: (equipo_local, equipo_visitante)."""
+    return _catalogo("partidos", """
+        SELECT p.id_partido, el.nombre_equipo || ' vs ' || ev.nombre_equipo || ' - ' || p.fecha,
+               p.equipo_local, p.equipo_visitante
+        FROM partidos p
+        JOIN equipos el ON p.equipo_local = el.id_equipo
+        JOIN equipos ev ON p.equipo_visitante = ev.id_equipo
+        ORDER BY p.fecha DESC, p.id_partido DESC
+    """, ("partidos", "equipos"))
+
+
+def torneos():
+    return _catalogo("torneos", """
+        SELECT id_torneo, nombre FROM torneos ORDER BY año DESC, nombre, id_torneo
+    """, ("torneos",))
+
+
+def escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+REVISAR_TRIGRAMAS = 300
+_trigramas = {"hay": None, "revisado": 0.0}
+
+
+def _hay_trigramas():
+    """True si la base tiene el índice de trigramas de migraciones/005 (pg_trgm)."""
+    if _trigramas["hay"] is None or time.monotonic() - _trigramas["revisado"] > REVISAR_TRIGRAMAS:
+        _, filas = consultar_filas("SELECT to_regclass('idx_jugadores_nombre_trgm') IS NOT NULL")
+        _trigramas.update(hay=filas[0][0], revisado=time.monotonic())
+    return _trigramas["hay"]
+
+
+def buscar_jugadores(texto="", equipos=(), limite=LIMITE_BUSQUEDA):
+    """
+    Hasta `limite` jugadores cuyo nombre empieza con `texto` (o lo contiene, si hay
+    pg_trgm y el texto tiene 3 letras o más), opcionalmente solo de `equipos`.
+    """
+    texto = texto.strip()
+    params = {"prefijo": escapar_like(texto) + "%", "equipos": list(equipos), "limite": limite}
+    condiciones = []
+    if equipos:
+        condiciones.append("id_equipo = ANY(%(equipos)s)")
+    if len(texto) >= 3 and _hay_trigramas():
+        # Los que empiezan con el texto van primero
+        condiciones.append("nombre ILIKE %(contiene)s")
+        params["contiene"] = f"%{escapar_like(texto)}%"
+        orden = 'lower(nombre) COLLATE "C" LIKE lower(%(prefijo)s) DESC, lower(nombre) COLLATE "C"'
+    else:
+        if texto:
+            condiciones.append('lower(nombre) COLLATE "C" LIKE lower(%(prefijo)s)')
+        orden = 'lower(nombre) COLLATE "C"'
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    _, filas = consultar_filas(f"""
+        SELECT id_jugador, nombre FROM jugadores
+        {where}
+        ORDER BY {orden}, id_jugador
+        LIMIT %(limite)s
+    """, params, tablas=("jugadores",))
+    return Catalogo(filas)
+
+
+_FECHA = re.compile(r"^(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?$")
+
+
+def _rango_fechas(texto):
+    """'2025', '2025-08' o '2025-08-01' → (desde, hasta) con hasta exclusivo; None si no es una fecha."""
+    partes = _FECHA.match(texto)
+    if not partes:
+        return None
+    anio, mes, dia = (int(p) if p else None for p in partes.groups())
+    try:
+        if dia:
+            desde = date(anio, mes, dia)
+            return desde, date.fromordinal(desde.toordinal() + 1)
+        if mes:
+            return date(anio, mes, 1), date(anio + mes // 12, mes % 12 + 1, 1)
+        return date(anio, 1, 1), date(anio + 1, 1, 1)
+    except ValueError:
+        return None
+
+
+def buscar_partidos(texto="", id_torneo=None, limite=LIMITE_BUSQUEDA):
+    """
+    Hasta `limite` partidos, más recientes primero, por fecha ('2025', '2025-08',
+    '2025-08-01'), por equipo ('Barcelona') o por cruce ('Barcelona vs Emelec'),
+    opcionalmente de un torneo. Extras: (equipo_local, equipo_visitante).
+    """
+    texto = texto.strip()
+    params = {"torneo": id_torneo, "limite": limite}
+    condiciones = []
+    if id_torneo is not None:
+        condiciones.append("p.id_torneo = %(torneo)s")
+    rango = _rango_fechas(texto)
+    if rango:
+        condiciones.append("p.fecha >= %(desde)s AND p.fecha < %(hasta)s")
+        params["desde"], params["hasta"] = rango
+    elif texto:
+        # equipos es chica: se resuelven los equipos por nombre (sin acentos, migraciones/006)
+        # y se entra a partidos por sus índices
+        equipo = "SELECT id_equipo FROM equipos WHERE normalizar_busqueda(nombre_equipo) LIKE normalizar_busqueda(%({})s)"
+        partes = re.split(r"\s+vs\.?(?:\s+|$)", texto, maxsplit=1, flags=re.IGNORECASE)
+        local, visitante = partes[0], partes[1].strip() if len(partes) > 1 else ""
+        if visitante:
+            condiciones.append(f"p.equipo_local IN ({equipo.format('local')}) "
+                               f"AND p.equipo_visitante IN ({equipo.format('visitante')})")
+            params["local"], params["visitante"] = f"%{escapar_like(local)}%", f"%{escapar_like(visitante)}%"
+        else:
+            condiciones.append(f"(p.equipo_local IN ({equipo.format('equipo')}) "
+                               f"OR p.equipo_visitante IN ({equipo.format('equipo')}))")
+            params["equipo"] = f"%{escapar_like(local)}%"
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    _, filas = consultar_filas(f"""
+        SELECT p.id_partido, el.nombre_equipo || ' vs ' || ev.nombre_equipo || ' - ' || p.fecha,
+               p.equipo_local, p.equipo_visitante
+        FROM partidos p
+        JOIN equipos el ON p.equipo_local = el.id_equipo
+        JOIN equipos ev ON p.equipo_visitante = ev.id_equipo
+        {where}
+        ORDER BY p.fecha DESC, p.id_partido DESC
+        LIMIT %(limite)s
+    """, params, tablas=("partidos", "equipos"))
+    return Catalogo(filas)
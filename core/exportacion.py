@@ -0,0 +1,238 @@
+import os
+import csv
+import gzip
+import time
+import uuid
+import atexit
+import tempfile
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+import datetime as dt
+from core.db import conexion, solo_lectura, en_solo_lectura
+from core.cache import version_datos, recien_escritas
+from core.trazas import tramo
+
+# 📤 Exportaciones en streaming
+# Las filas se leen de un cursor con nombre (del lado del servidor) por bloques y se
+# escriben directamente a un archivo temporal: xlsx en modo write-only de openpyxl,
+# CSV o CSV comprimido con gzip. Nunca se arma un DataFrame con todo el resultado,
+# así que la memoria no crece con el número de filas.
+
+FORMATOS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+}
+
+MAX_FILAS_XLSX = 1_048_575   # límite de Excel menos la fila de encabezados
+
+
+def _valor_xlsx(valor):
+    """openpyxl no acepta horas con zona horaria ni tipos como inet; esos van como texto."""
+    if isinstance(valor, (dt.datetime, dt.time)) and valor.tzinfo is not None:
+        return valor.replace(tzinfo=None)
+    if valor is None or isinstance(valor, (str, int, float, Decimal, dt.date, dt.time, dt.timedelta)):
+        return valor
+    return str(valor)
+
+
+class _EscritorXlsx:
+    def __init__(self, ruta, columnas):
+        from openpyxl import Workbook
+        self.ruta = ruta
+        self.libro = Workbook(write_only=True)
+        self.hoja = self.libro.create_sheet("Datos")
+        self.hoja.append(columnas)
+
+    def escribir(self, filas):
+        for fila in filas:
+            self.hoja.append([_valor_xlsx(v) for v in fila])
+
+    def cerrar(self):
+        self.libro.save(self.ruta)
+
+
+class _EscritorCsv:
+    def __init__(self, ruta, columnas, comprimir=False):
+        if comprimir:
+            self.archivo = gzip.open(ruta, "wt", encoding="utf-8", newline="")
+        else:
+            self.archivo = open(ruta, "w", encoding="utf-8", newline="")
+        self.csv = csv.writer(self.archivo)
+        self.csv.writerow(columnas)
+
+    def escribir(self, filas):
+        self.csv.writerows(filas)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+def exportar(sql, params=None, formato="xlsx", destino=None, tamano_bloque=5000, max_filas=None):
+    """
+    Ejecuta `sql` y escribe el resultado en un archivo sin cargarlo entero en memoria.
+
+    Parámetros:
+        sql (str): SELECT a exportar (con su ORDER BY).
+        params: Parámetros de la consulta.
+        formato (str): "xlsx", "csv" o "csv.gz".
+        destino (str): Ruta del archivo; por defecto un temporal que borra quien lo usa.
+        tamano_bloque (int): Filas por viaje a la base de datos.
+        max_filas (int): Tope de filas exportadas (None = sin tope; xlsx nunca pasa del límite de Excel).
+
+    Devuelve:
+        (ruta, filas escritas, True si se cortó por el tope)
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+    if formato == "xlsx":
+        max_filas = min(max_filas or MAX_FILAS_XLSX, MAX_FILAS_XLSX)
+    if destino is None:
+        fd, destino = tempfile.mkstemp(prefix="exportacion_", suffix=f".{formato}")
+        os.close(fd)
+
+    escritas, truncado, escritor = 0, False, None
+    try:
+        with conexion() as conn:
+            cur = conn.cursor(name=f"exportar_{uuid.uuid4().hex[:12]}")
+            cur.itersize = tamano_bloque
+            cur.execute(sql, params)
+            while True:
+                pedir = tamano_bloque
+                if max_filas is not None:
+                    pedir = min(pedir, max_filas - escritas + 1)   # +1 para saber si hay más
+                filas = cur.fetchmany(pedir)
+                if escritor is None:
+                    columnas = [desc[0] for desc in cur.description]
+                    if formato == "xlsx":
+                        escritor = _EscritorXlsx(destino, columnas)
+                    else:
+                        escritor = _EscritorCsv(destino, columnas, comprimir=formato == "csv.gz")
+                if not filas:
+                    break
+                if max_filas is not None and escritas + len(filas) > max_filas:
+                    filas = filas[:max_filas - escritas]
+                    truncado = True
+                escritor.escribir(filas)
+                escritas += len(filas)
+                if truncado:
+                    break
+            cur.close()
+        escritor.cerrar()
+    except Exception:
+        if isinstance(escritor, _EscritorCsv):
+            escritor.archivo.close()
+        if os.path.exists(destino):
+            os.remove(destino)
+        raise
+    return destino, escritas, truncado
+
+
+# 🗂️ Caché de archivos exportados
+# Un mismo reporte con los mismos filtros y sin cambios en sus tablas se genera una
+# sola vez. La clave incluye la versión de los datos de core.cache, así que cualquier
+# escritura en esas tablas hace que la siguiente descarga lo regenere.
+
+class CacheExportaciones:
+    """
+    Archivos exportados en disco, con desalojo LRU por tamaño total.
+
+    Parámetros:
+        max_bytes (int): Espacio máximo en disco de todos los archivos.
+        ttl (float): Segundos de vida de cada archivo (0 = sin caducidad).
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=900):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._archivos = OrderedDict()   # clave -> (ruta, tamaño, creado)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"aciertos": 0, "fallos": 0, "desalojos": 0}
+
+    def abrir(self, clave, generar):
+        """
+        Devuelve el archivo de `clave` abierto en modo binario, generándolo con `generar()`
+        si falta. Se entrega abierto y no como bytes: si después se desaloja, el archivo
+        sigue legible hasta que quien lo recibió lo cierre.
+        """
+        with self._lock:
+            entrada = self._archivos.get(clave)
+            if entrada and self.ttl and time.monotonic() - entrada[2] > self.ttl:
+                self._quitar(clave)
+                entrada = None
+            if entrada:
+                self._archivos.move_to_end(clave)
+                self._stats["aciertos"] += 1
+                return open(entrada[0], "rb")   # abierto bajo el lock: un desalojo ya no lo afecta
+            self._stats["fallos"] += 1
+
+        ruta = generar()
+        tamano = os.path.getsize(ruta)
+        archivo = open(ruta, "rb")
+        with self._lock:
+            if clave in self._archivos or tamano > self.max_bytes:
+                os.remove(ruta)
+            else:
+                self._archivos[clave] = (ruta, tamano, time.monotonic())
+                self._bytes += tamano
+                while self._bytes > self.max_bytes:
+                    self._quitar(next(iter(self._archivos)))
+                    self._stats["desalojos"] += 1
+        return archivo
+
+    def limpiar(self):
+        with self._lock:
+            for clave in list(self._archivos):
+                self._quitar(clave)
+
+    def estadisticas(self):
+        with self._lock:
+            datos = dict(self._stats)
+            datos.update(archivos=len(self._archivos), bytes=self._bytes, max_bytes=self.max_bytes)
+        return datos
+
+    def _quitar(self, clave):
+        ruta, tamano, _ = self._archivos.pop(clave)
+        self._bytes -= tamano
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+
+_cache_archivos = CacheExportaciones(
+    max_bytes=int(float(os.getenv("EXPORTACIONES_CACHE_MB", "256")) * 1024 * 1024),
+    ttl=float(os.getenv("EXPORTACIONES_CACHE_TTL", "900")),
+)
+atexit.register(_cache_archivos.limpiar)
+
+
+def exportar_cacheado(sql, params=None, formato="xlsx", tablas=(), max_filas=None):
+    """
+    Devuelve la exportación de `sql` como archivo binario abierto (lo que acepta
+    st.download_button), reutilizando el archivo ya generado si la consulta, los
+    filtros y la versión de los datos de `tablas` no cambiaron. Así el contenido
+    nunca se copia a un `bytes` propio.
+    Sin `tablas` se genera siempre (no hay forma de saber si los datos cambiaron).
+    """
+    def generar():
+        # Streamlit la llama al descargar, fuera del rerun: es una traza propia.
+        # Desde una pantalla de solo lectura va a la réplica, salvo que lea algo recién escrito.
+        replica = en_solo_lectura() and not (tablas and recien_escritas(tablas))
+        with solo_lectura(replica), tramo("exportacion", raiz=True, formato=formato):
+            return exportar(sql, params, formato, max_filas=max_filas)[0]
+
+    if not tablas:
+        ruta = generar()
+        archivo = open(ruta, "rb")
+        os.remove(ruta)   # sigue legible mientras esté abierto
+        return archivo
+
+    clave = (repr(sql), repr(params), formato, max_filas, version_datos(tablas))
+    return _cache_archivos.abrir(clave, generar)
+
+
+def estadisticas_exportaciones():
+    return _cache_archivos.estadisticas()
@@ -0,0 +1,176 @@
+import io
+import pandas as pd
+from core.db import conexion
+from core.cache import consultar
+
+# 📥 Importación masiva de estadísticas
+# Un archivo CSV o XLSX con (jugador, partido, goles, asistencias, minutos) se valida
+# entero con pandas, resolviendo nombres contra jugadores y partidos, y después se
+# carga en una sola transacción: COPY a una tabla temporal y un único
+# INSERT ... ON CONFLICT (id_jugador, id_partido) DO UPDATE contra estadisticas
+# (restricción de migraciones/007). Los triggers de totales_jugadores son por
+# sentencia, así que también hacen una sola pasada.
+
+COLUMNAS = ("jugador", "partido", "goles", "asistencias", "minutos")
+
+# Otros encabezados aceptados para cada columna
+ALIAS = {
+    "id_jugador": "jugador",
+    "id_partido": "partido",
+    "minutos_jugados": "minutos",
+}
+
+MAX_MINUTOS = 150
+
+
+def leer_archivo(archivo, nombre):
+    """Lee un CSV (separado por coma o punto y coma) o un XLSX como texto, con encabezados normalizados."""
+    if nombre.lower().endswith(".xlsx"):
+        df = pd.read_excel(archivo, dtype=str)
+    else:
+        df = pd.read_csv(archivo, dtype=str, sep=None, engine="python", encoding="utf-8-sig")
+    df.columns = [ALIAS.get(c, c) for c in (str(c).strip().lower() for c in df.columns)]
+    faltan = [c for c in ("jugador", "partido", "minutos") if c not in df.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltan)}")
+    for columna in ("goles", "asistencias"):
+        if columna not in df.columns:
+            df[columna] = None
+    df = df[list(COLUMNAS)].dropna(how="all")
+    if df.empty:
+        raise ValueError("El archivo no tiene filas")
+    return df
+
+
+def _resolver(valores, catalogo, columna_id, columnas_clave):
+    """
+    Traduce cada valor (un id o un texto) al id del catálogo.
+    El texto se compara sin mayúsculas contra cada columna de `columnas_clave`, en orden.
+    Devuelve (ids, errores) alineados con `valores`; errores es None donde se resolvió.
+    """
+    texto = valores.fillna("").astype(str).str.strip()
+    numero = pd.to_numeric(texto, errors="coerce")
+    ids = numero.where(numero.isin(catalogo[columna_id]))
+    errores = pd.Series(None, index=valores.index, dtype=object)
+    clave = texto.str.casefold()
+    for columna in columnas_clave:
+        pendientes = ids.isna() & errores.isna()
+        claves = catalogo[columna].astype(str).str.strip().str.casefold()
+        conteo = catalogo.groupby(claves)[columna_id].agg(["first", "count"])
+        repetidos = clave.map(conteo["count"]).fillna(0)
+        ids = ids.mask(pendientes & (repetidos == 1), clave.map(conteo["first"]))
+        errores = errores.mask(pendientes & (repetidos > 1), "coincide con varios, usa el id")
+    errores = errores.mask(ids.isna() & errores.isna() & (texto == ""), "vacío")
+    errores = errores.mask(ids.isna() & errores.isna(), "no existe")
+    return ids, errores
+
+
+def _entero(valores, minimo, maximo=None, por_defecto=None):
+    """Convierte a entero; devuelve (números, errores) con el motivo donde no es válido."""
+    texto = valores.fillna("").astype(str).str.strip()
+    if por_defecto is not None:
+        texto = texto.mask(texto == "", str(por_defecto))
+    numero = pd.to_numeric(texto, errors="coerce")
+    errores = pd.Series(None, index=valores.index, dtype=object)
+    errores = errores.mask(numero.isna() | (numero % 1 != 0), "no es un número entero")
+    errores = errores.mask(errores.isna() & (numero < minimo), f"menor que {minimo}")
+    if maximo is not None:
+        errores = errores.mask(errores.isna() & (numero > maximo), f"mayor que {maximo}")
+    return numero, errores
+
+
+def validar_estadisticas(df, conn=None):
+    """
+    Valida todas las filas de una vez.
+
+    Devuelve:
+        (filas válidas con id_jugador, id_partido, goles, asistencias, minutos,
+         DataFrame de errores con fila del archivo y detalle; vacío si todo está bien)
+    """
+    jugadores = consultar("SELECT id_jugador, nombre FROM jugadores", tablas=("jugadores",), conn=conn)
+    partidos = consultar("""
+        SELECT p.id_partido, p.fecha::text AS fecha,
+               el.nombre_equipo || ' vs ' || ev.nombre_equipo || ' - ' || p.fecha AS descripcion
+        FROM partidos p
+        JOIN equipos el ON p.equipo_local = el.id_equipo
+        JOIN equipos ev ON p.equipo_visitante = ev.id_equipo
+    """, tablas=("partidos", "equipos"), conn=conn)
+
+    id_jugador, err_jugador = _resolver(df["jugador"], jugadores, "id_jugador", ["nombre"])
+    id_partido, err_partido = _resolver(df["partido"], partidos, "id_partido", ["descripcion", "fecha"])
+    goles, err_goles = _entero(df["goles"], 0, por_defecto=0)
+    asistencias, err_asistencias = _entero(df["asistencias"], 0, por_defecto=0)
+    minutos, err_minutos = _entero(df["minutos"], 1, MAX_MINUTOS)
+
+    clave = pd.DataFrame({"j": id_jugador, "p": id_partido})
+    repetida = clave.notna().all(axis=1) & clave.duplicated(keep=False)
+    err_repetida = pd.Series(None, index=df.index, dtype=object).mask(repetida, "jugador y partido repetidos en el archivo")
+
+    detalle = pd.DataFrame({
+        "jugador": err_jugador, "partido": err_partido, "goles": err_goles,
+        "asistencias": err_asistencias, "minutos": err_minutos, "fila": err_repetida,
+    })
+    con_error = detalle.notna().any(axis=1)
+    errores = pd.DataFrame({
+        "fila": df.index[con_error] + 2,   # +1 por el encabezado, +1 porque las hojas cuentan desde 1
+        "error": [
+            "; ".join(f"{col}: {msg}" if col != "fila" else msg for col, msg in fila.dropna().items())
+            for _, fila in detalle[con_error].iterrows()
+        ],
+    })
+
+    validas = pd.DataFrame({
+        "id_jugador": id_jugador, "id_partido": id_partido, "goles": goles,
+        "asistencias": asistencias, "minutos": minutos,
+    })[~con_error].astype("int64")
+    return validas, errores
+
+
+def importar_estadisticas(validas):
+    """
+    Carga las filas validadas en una transacción. Si el jugador ya tiene estadística
+    en ese partido se actualiza; si no, se inserta. Cada par (jugador, partido) debe
+    venir una sola vez, como lo deja `validar_estadisticas`.
+
+    Devuelve:
+        (insertadas, actualizadas)
+    """
+    if validas.duplicated(["id_jugador", "id_partido"]).any():
+        raise ValueError("Hay jugador y partido repetidos entre las filas a importar")
+
+    datos = io.StringIO()
+    validas[["id_jugador", "id_partido", "goles", "asistencias", "minutos"]].to_csv(datos, index=False, header=False)
+    datos.seek(0)
+
+    with conexion() as conn:
+        cur = conn.cursor()
+        try:
+            # Una sola entrada de bitácora la escribe quien importa (migraciones/004)
+            cur.execute("SET LOCAL futbol.bitacora_resumida = 'on'")
+            cur.execute("""
+                CREATE TEMP TABLE estadisticas_carga (
+                    id_jugador INT, id_partido INT, goles INT, asistencias INT, minutos INT
+                ) ON COMMIT DROP
+            """)
+            cur.copy_expert("COPY estadisticas_carga FROM STDIN WITH (FORMAT csv)", datos)
+            # Con la restricción única, otra importación o la planilla guardando a la vez
+            # no pueden duplicar un par: la segunda espera y actualiza la fila de la primera
+            cur.execute("""
+                WITH guardadas AS (
+                    INSERT INTO estadisticas (id_jugador, id_partido, goles, asistencias, minutos_jugados)
+                    SELECT c.id_jugador, c.id_partido, c.goles, c.asistencias, c.minutos
+                    FROM estadisticas_carga c
+                    ON CONFLICT (id_jugador, id_partido) DO UPDATE
+                    SET goles = EXCLUDED.goles, asistencias = EXCLUDED.asistencias,
+                        minutos_jugados = EXCLUDED.minutos_jugados
+                    RETURNING xmax = 0 AS insertada
+                )
+                SELECT COUNT(*) FILTER (WHERE insertada), COUNT(*) FILTER (WHERE NOT insertada)
+                FROM guardadas
+            """)
+            insertadas, actualizadas = cur.fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return insertadas, actualizadas
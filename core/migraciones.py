@@ -0,0 +1,63 @@
+import sys
+from core.db import nueva_conexion
+from core.paths import MIGRACIONES_DIR
+
+# 🧱 Migraciones versionadas del esquema
+# Cada archivo migraciones/NNN_descripcion.sql se aplica una sola vez, en orden,
+# dentro de su propia transacción. Uso:
+#     python -m core.migraciones            (aplica las pendientes)
+#     python -m core.migraciones --listar   (muestra el estado)
+
+def _asegurar_tabla(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS migraciones_aplicadas (
+            version VARCHAR(100) PRIMARY KEY,
+            aplicada TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """)
+
+def listar():
+    """Devuelve [(version, aplicada)] para cada archivo de migración."""
+    conn = nueva_conexion()
+    try:
+        cur = conn.cursor()
+        _asegurar_tabla(cur)
+        conn.commit()
+        cur.execute("SELECT version FROM migraciones_aplicadas")
+        aplicadas = {fila[0] for fila in cur.fetchall()}
+    finally:
+        conn.close()
+    return [(ruta.stem, ruta.stem in aplicadas) for ruta in sorted(MIGRACIONES_DIR.glob("*.sql"))]
+
+def aplicar_pendientes(progreso=print):
+    """Aplica en orden las migraciones que falten. Devuelve la lista de versiones aplicadas."""
+    aplicadas = []
+    conn = nueva_conexion()
+    try:
+        cur = conn.cursor()
+        _asegurar_tabla(cur)
+        conn.commit()
+        for ruta in sorted(MIGRACIONES_DIR.glob("*.sql")):
+            cur.execute("SELECT 1 FROM migraciones_aplicadas WHERE version = %s", (ruta.stem,))
+            if cur.fetchone():
+                continue
+            progreso(f"▶️ Aplicando {ruta.name}...")
+            try:
+                cur.execute(ruta.read_text(encoding="utf-8"))
+                cur.execute("INSERT INTO migraciones_aplicadas (version) VALUES (%s)", (ruta.stem,))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            aplicadas.append(ruta.stem)
+    finally:
+        conn.close()
+    return aplicadas
+
+if __name__ == "__main__":
+    if "--listar" in sys.argv:
+        for version, aplicada in listar():
+            print(f"{'✅' if aplicada else '⏳'} {version}")
+    else:
+        hechas = aplicar_pendientes()
+        print(f"✅ {len(hechas)} migraciones aplicadas" if hechas else "✅ El esquema ya está al día")
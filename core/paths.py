@@ -6,6 +6,9 @@ ASSETS = APP_ROOT / "assets"
 CSS_DIR = ASSETS / "css"
 IMG_DIR = ASSETS / "img"
 ANIM_DIR = ASSETS / "animaciones"
+MIGRACIONES_DIR = APP_ROOT / "migraciones"
+ARCHIVO_DIR = APP_ROOT / "archivo"              # particiones de bitácora archivadas
+TRAZAS_DIR = APP_ROOT / "trazas"                # trazas JSONL de core/trazas.py
 
 def css_path(name: str) -> Path:
     return CSS_DIR / name
@@ -0,0 +1,47 @@
+import sys
+from core.db import nueva_conexion
+
+# 📊 Verificación de totales_jugadores (ver migraciones/002_totales_jugadores.sql)
+# Los triggers de estadisticas mantienen los totales por deltas; este comando
+# compara la tabla con la agregación real y, si se pide, la reconstruye. Uso:
+#     python -m core.totales_jugadores              (solo verifica)
+#     python -m core.totales_jugadores --corregir   (reconstruye desde cero)
+
+COLUMNAS = ("goles", "asistencias", "minutos", "partidos")
+
+
+def reconciliar(corregir=False):
+    """
+    Devuelve [(id_jugador, {columna: (valor en tabla, valor real)})] con los jugadores
+    cuyo total no coincide. Con corregir=True además reconstruye la tabla.
+    """
+    conn = nueva_conexion()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM reconciliar_totales_jugadores(%s)", (corregir,))
+        diferencias = []
+        for fila in cur.fetchall():
+            valores = {col: (fila[1 + 2 * i], fila[2 + 2 * i]) for i, col in enumerate(COLUMNAS)}
+            diferencias.append((fila[0], {col: par for col, par in valores.items() if par[0] != par[1]}))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return diferencias
+
+
+if __name__ == "__main__":
+    corregir = "--corregir" in sys.argv
+    diferencias = reconciliar(corregir)
+    for id_jugador, cambios in diferencias:
+        detalle = ", ".join(f"{col}: {tabla} → {real}" for col, (tabla, real) in cambios.items())
+        print(f"⚠️ Jugador {id_jugador}: {detalle}")
+    if not diferencias:
+        print("✅ totales_jugadores coincide con estadisticas")
+    elif corregir:
+        print(f"✅ {len(diferencias)} jugadores corregidos")
+    else:
+        print(f"❌ {len(diferencias)} jugadores con diferencias (usa --corregir para reconstruir)")
+        sys.exit(1)
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from functools import wraps
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from core.paths import TRAZAS_DIR
+
+# 🔬 Trazas por ejecución de pantalla
+# Cada rerun de una pantalla abre un tramo raíz (main.py) y dentro se anidan tramos
+# para lo que cuesta: prestar una conexión, cada consulta, armar DataFrames, dibujar
+# gráficos, generar xlsx o cargar animaciones. Al cerrarse, cada tramo se escribe
+# como una línea JSON en trazas/trazas.jsonl (rotando el archivo), con la sesión y la
+# pantalla de su raíz. Fuera de una traza, `tramo()` no hace nada, así que las
+# herramientas y scripts no escriben trazas.
+# El hilo de la pantalla solo encola la línea; la escribe a disco un QueueListener
+# en su propio hilo. Si la cola se llena, las líneas que sobran se descartan.
+# Análisis: python -m herramientas.analizar_trazas
+# Desactivadas por defecto: TRAZAS=1 las activa; TRAZAS_MB y TRAZAS_ARCHIVOS controlan la rotación.
+
+ACTIVAS = os.getenv("TRAZAS", "0") == "1"
+ARCHIVO = TRAZAS_DIR / "trazas.jsonl"
+CAPACIDAD_COLA = 10000
+
+_actual = contextvars.ContextVar("tramo_actual", default=None)   # dict del tramo abierto más interno
+_logger = None
+_logger_lock = threading.Lock()
+
+
+class _EncolarSinEsperar(QueueHandler):
+    """Encola sin bloquear; con la cola llena la traza se pierde, la pantalla no espera."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def _escritor():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                TRAZAS_DIR.mkdir(parents=True, exist_ok=True)
+                manejador = RotatingFileHandler(
+                    ARCHIVO, encoding="utf-8",
+                    maxBytes=int(float(os.getenv("TRAZAS_MB", "20")) * 1024 * 1024),
+                    backupCount=int(os.getenv("TRAZAS_ARCHIVOS", "5")),
+                )
+                manejador.setFormatter(logging.Formatter("%(message)s"))
+                cola = queue.Queue(maxsize=CAPACIDAD_COLA)
+                oyente = QueueListener(cola, manejador)
+                oyente.start()
+                atexit.register(oyente.stop)   # escribe lo que quede en la cola al salir
+                logger = logging.getLogger("futbol_app.trazas")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(_EncolarSinEsperar(cola))
+                _logger = logger
+    return _logger
+
+
+@contextmanager
+def tramo(nombre, raiz=False, **atributos):
+    """
+    Mide el bloque como un tramo hijo del tramo abierto.
+    Con `raiz=True` empieza una traza nueva si no hay ninguna abierta
+    (`sesion` y `pantalla` de la raíz pasan a todos sus tramos).
+    """
+    padre = _actual.get()
+    if not ACTIVAS or (padre is None and not raiz):
+        yield
+        return
+
+    datos = {
+        "traza": padre["traza"] if padre else uuid.uuid4().hex[:16],
+        "tramo": uuid.uuid4().hex[:8],
+        "padre": padre["tramo"] if padre else None,
+        "nombre": nombre,
+        "sesion": atributos.pop("sesion", None) or (padre and padre["sesion"]),
+        "pantalla": atributos.pop("pantalla", None) or (padre and padre["pantalla"]),
+        "inicio": time.time(),
+    }
+    datos.update(atributos)
+    token = _actual.set(datos)
+    inicio = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        datos["error"] = e.__class__.__name__
+        raise
+    finally:
+        datos["ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+        _actual.reset(token)
+        try:
+            _escritor().info(json.dumps(datos, default=str, ensure_ascii=False))
+        except OSError:
+            pass   # sin disco para trazas la aplicación sigue igual
+
+
+def trazado(nombre):
+    """Decorador: cada llamada a la función es un tramo `nombre`."""
+    def decorar(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with tramo(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorar
+
+
+def en_traza():
+    """True si hay una traza abierta (para no armar atributos caros si no se van a escribir)."""
+    return ACTIVAS and _actual.get() is not None
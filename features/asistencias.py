@@ -1,42 +1,20 @@
 import streamlit as st
-import psycopg2
-import pandas as pd
-
-# 🎯 Conexión
-def conectar_bd():
-    return psycopg2.connect(
-        host="localhost",
-        database="futbol_gestion",
-        user="postgres",
-        password="12345"
-    )
-
-# 🔄 Partidos
-def obtener_partidos():
-    conn = conectar_bd()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT id_partido, 
-               (SELECT nombre_equipo FROM equipos WHERE id_equipo = equipo_local) || ' vs ' ||
-               (SELECT nombre_equipo FROM equipos WHERE id_equipo = equipo_visitante) || ' - ' || fecha
-        FROM partidos
-        ORDER BY fecha DESC;
-    """)
-    partidos = cur.fetchall()
-    conn.close()
-    return partidos
+from core.db import conexion
+from core.cache import consultar, invalidar
+from core import catalogo
+from views.componentes import fragmento
 
 # 💾 Registro
 def registrar_asistencia(id_partido, espectadores, capacidad):
     try:
-        conn = conectar_bd()
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO asistencias_partido (id_partido, espectadores, capacidad_estadio)
-            VALUES (%s, %s, %s)
-        """, (id_partido, espectadores, capacidad))
-        conn.commit()
-        conn.close()
+        with conexion() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                INSERT INTO asistencias_partido (id_partido, espectadores, capacidad_estadio)
+                VALUES (%s, %s, %s)
+            """, (id_partido, espectadores, capacidad))
+            conn.commit()
+        invalidar("asistencias_partido")
         return True
     except Exception as e:
         st.error(f"❌ Error al registrar asistencia: {e}")
@@ -44,9 +22,7 @@ def registrar_asistencia(id_partido, espectadores, capacidad):
 
 # 📋 Mostrar asistencias
 def mostrar_asistencias():
-    conn = conectar_bd()
-    cur = conn.cursor()
-    cur.execute("""
+    return consultar("""
         SELECT ap.id_asistencia,
                p.fecha,
                el.nombre_equipo AS equipo_local,
@@ -59,24 +35,53 @@ def mostrar_asistencias():
         JOIN equipos el ON p.equipo_local = el.id_equipo
         JOIN equipos ev ON p.equipo_visitante = ev.id_equipo
         ORDER BY p.fecha DESC;
-    """)
-    columnas = [desc[0] for desc in cur.description]
-    datos = cur.fetchall()
-    conn.close()
-    return pd.DataFrame(datos, columns=columnas)
+    """, tablas=("asistencias_partido", "partidos", "equipos"))
+
+# 🎯 Filtro y páginas: solo re-ejecutan este fragmento, sobre las asistencias ya consultadas
+@fragmento
+def lista_asistencias(df):
+    equipos_locales = df["equipo_local"].unique()
+    equipo_filtrado = st.selectbox("🔍 Filtrar por equipo local", ["Todos"] + list(equipos_locales))
+    if equipo_filtrado != "Todos":
+        df = df[df["equipo_local"] == equipo_filtrado]
+
+    # 🔢 Paginación
+    filas_por_pagina = 5
+    total_paginas = (len(df) - 1) // filas_por_pagina + 1
+    pagina = st.number_input("📄 Página", min_value=1, max_value=total_paginas, step=1)
+
+    inicio = (pagina - 1) * filas_por_pagina
+    fin = inicio + filas_por_pagina
+
+    # 🔵 Etiqueta visual
+    def color_ocupacion(valor):
+        if valor >= 90:
+            return "✅ Alta"
+        elif valor >= 70:
+            return "🟡 Media"
+        else:
+            return "🔴 Baja"
+
+    # Solo la página visible; assign devuelve una copia y el DataFrame del fragmento no se toca
+    df = df.iloc[inicio:fin]
+    df = df.assign(**{"Nivel de Ocupación": df["ocupacion"].apply(color_ocupacion)})
+    df = df.rename(columns={"ocupacion": "Porcentaje de Ocupación (%)"})
+
+    # 📋 Tabla paginada
+    st.dataframe(df.style.format({
+        "Porcentaje de Ocupación (%)": "{:.2f}"
+    }), use_container_width=True)
 
 # 🎨 Interfaz elegante con filtros y paginación
 def mostrar_pantalla_asistencias():
     st.title("🎟️ Registro y Análisis de Asistencias")
 
     with st.expander("➕ Registrar nueva asistencia"):
-        partidos = obtener_partidos()
+        partidos = catalogo.partidos()
         if not partidos:
             st.warning("⚠️ No hay partidos registrados aún.")
         else:
-            partidos_desc = [p[1] for p in partidos]
-            partido_sel = st.selectbox("📅 Selecciona un partido", partidos_desc)
-            id_partido = [p[0] for p in partidos if p[1] == partido_sel][0]
+            id_partido = st.selectbox("📅 Selecciona un partido", partidos.ids, format_func=partidos.etiqueta)
 
             espectadores = st.number_input("👥 Número de espectadores", min_value=0, step=10)
             capacidad = st.number_input("🏟️ Capacidad del estadio", min_value=1000, step=100)
@@ -97,36 +102,7 @@ def mostrar_pantalla_asistencias():
         st.info("ℹ️ No hay asistencias registradas aún.")
         return
 
-    # 🎯 Filtros
-    equipos_locales = df["equipo_local"].unique()
-    equipo_filtrado = st.selectbox("🔍 Filtrar por equipo local", ["Todos"] + list(equipos_locales))
-    if equipo_filtrado != "Todos":
-        df = df[df["equipo_local"] == equipo_filtrado]
-
-    # 🔢 Paginación
-    filas_por_pagina = 5
-    total_paginas = (len(df) - 1) // filas_por_pagina + 1
-    pagina = st.number_input("📄 Página", min_value=1, max_value=total_paginas, step=1)
-
-    inicio = (pagina - 1) * filas_por_pagina
-    fin = inicio + filas_por_pagina
-
-    # 🔵 Etiqueta visual
-    def color_ocupacion(valor):
-        if valor >= 90:
-            return "✅ Alta"
-        elif valor >= 70:
-            return "🟡 Media"
-        else:
-            return "🔴 Baja"
-
-    df["Nivel de Ocupación"] = df["ocupacion"].apply(color_ocupacion)
-    df = df.rename(columns={"ocupacion": "Porcentaje de Ocupación (%)"})
-
-    # 📋 Tabla paginada
-    st.dataframe(df.iloc[inicio:fin].style.format({
-        "Porcentaje de Ocupación (%)": "{:.2f}"
-    }), use_container_width=True)
+    lista_asistencias(df)
 
 # 🚀 Ejecutar
 if __name__ == "__main__":
@@ -1,71 +1,138 @@
 import streamlit as st
 import pandas as pd
-from core.db import get_connection
+from datetime import date, timedelta
+from core.db import get_connection, liberar_conexion, escrita_hace_poco
+from views.componentes import grilla_paginada, estimar_total, boton_exportar, fragmento
+from core.archivo_bitacora import meses_archivados, leer_archivo
+from core.cache import consultar_filas
+
+# Columnas por las que se puede filtrar (lista blanca para armar el SQL)
+COLUMNAS_FILTRO = ("usuario", "tabla_afectada", "tipo_accion")
+
+# Cambiar de página solo re-ejecuta la grilla (los filtros y el total quedan como están)
+grilla_bitacora = fragmento(grilla_paginada)
+
+# 📚 Valores de los desplegables: recorren toda la bitácora, así que se cachean solo por tiempo.
+# Sin `tablas` a propósito: el escritor invalida "bitacora" en cada lote y la caché de
+# consultas no acertaría nunca; un usuario o acción nueva aparece en el filtro a los 5 minutos.
+@st.cache_data(ttl=300, show_spinner=False)
+def valores_distintos(columna):
+    if columna not in COLUMNAS_FILTRO:
+        raise ValueError(f"Columna no filtrable: {columna}")
+    _, filas = consultar_filas(f"SELECT DISTINCT {columna} FROM bitacora WHERE {columna} IS NOT NULL ORDER BY 1")
+    return [fila[0] for fila in filas]
+
+@st.cache_data(ttl=300, show_spinner=False)
+def rango_fechas():
+    _, filas = consultar_filas("SELECT MIN(hora_ingreso)::date, MAX(hora_ingreso)::date FROM bitacora")
+    return filas[0]
+
+# 🔁 Filtros de la pantalla convertidos a un WHERE parametrizado
+def construir_filtros(usuario, tabla, accion, fecha_ini, fecha_fin):
+    condiciones = ["hora_ingreso >= %s", "hora_ingreso < %s"]
+    params = [fecha_ini, fecha_fin + timedelta(days=1)]
+    for columna, valor in zip(COLUMNAS_FILTRO, (usuario, tabla, accion)):
+        if valor is not None:
+            condiciones.append(f"{columna} = %s")
+            params.append(valor)
+    return " AND ".join(condiciones), params
+
+def resumen_bitacora(conn, where, params):
+    """Conteo de acciones por día, usuario y tipo, calculado en la base de datos."""
+    query = f"""
+        SELECT hora_ingreso::date AS dia, usuario, tipo_accion, COUNT(*) AS total
+        FROM bitacora
+        WHERE {where}
+        GROUP BY 1, 2, 3
+        ORDER BY dia DESC, total DESC
+    """
+    cur = conn.cursor()
+    cur.execute(query, params)
+    columnas = [desc[0] for desc in cur.description]
+    return pd.DataFrame(cur.fetchall(), columns=columnas)
 
 def mostrar_bitacora():
     st.title("📜 Registro de Bitácora del Sistema")
     st.markdown("Visualiza todas las acciones realizadas en el sistema, con filtros detallados.")
 
+    conn = None
     try:
-        conn = get_connection()
-        query = "SELECT * FROM bitacora ORDER BY hora_ingreso DESC"
-        df = pd.read_sql(query, conn)
-
-        if df.empty:
+        minimo, maximo = rango_fechas()
+        if minimo is None:
             st.info("ℹ️ No hay registros en la bitácora.")
             return
 
+        # Con la bitácora recién escrita la réplica puede no tenerla: el resumen lee de la principal
+        conn = get_connection(primaria=escrita_hace_poco(("bitacora",)))
+
         # 🧪 Filtros personalizados
         with st.expander("🔎 Filtrar registros"):
             col1, col2, col3 = st.columns(3)
 
-            usuarios = df["usuario"].dropna().unique().tolist()
-            tablas = df["tabla_afectada"].dropna().unique().tolist()
-            acciones = df["tipo_accion"].dropna().unique().tolist()
-
             with col1:
-                usuario_sel = st.selectbox("👤 Usuario", ["Todos"] + usuarios)
+                usuario_sel = st.selectbox("👤 Usuario", ["Todos"] + valores_distintos("usuario"))
 
             with col2:
-                tabla_sel = st.selectbox("📂 Tabla afectada", ["Todas"] + tablas)
+                tabla_sel = st.selectbox("📂 Tabla afectada", ["Todas"] + valores_distintos("tabla_afectada"))
 
             with col3:
-                accion_sel = st.selectbox("⚙️ Tipo de acción", ["Todas"] + acciones)
+                accion_sel = st.selectbox("⚙️ Tipo de acción", ["Todas"] + valores_distintos("tipo_accion"))
 
             col4, col5 = st.columns(2)
             with col4:
-                fecha_ini = st.date_input("📅 Desde", value=df["hora_ingreso"].min().date())
+                fecha_ini = st.date_input("📅 Desde", value=minimo)
             with col5:
-                fecha_fin = st.date_input("📅 Hasta", value=df["hora_ingreso"].max().date())
-
-        # 🔁 Aplicar filtros
-        df_filtrado = df.copy()
-
-        if usuario_sel != "Todos":
-            df_filtrado = df_filtrado[df_filtrado["usuario"] == usuario_sel]
-        if tabla_sel != "Todas":
-            df_filtrado = df_filtrado[df_filtrado["tabla_afectada"] == tabla_sel]
-        if accion_sel != "Todas":
-            df_filtrado = df_filtrado[df_filtrado["tipo_accion"] == accion_sel]
-
-        df_filtrado["fecha"] = pd.to_datetime(df_filtrado["hora_ingreso"]).dt.date
-        df_filtrado = df_filtrado[(df_filtrado["fecha"] >= fecha_ini) & (df_filtrado["fecha"] <= fecha_fin)]
-
-        # 📥 Botón de exportar
-        col_export, _ = st.columns(2)
-        with col_export:
-            st.download_button(
-                label="⬇️ Exportar a CSV",
-                data=df_filtrado.to_csv(index=False).encode('utf-8'),
-                file_name='bitacora_filtrada.csv',
-                mime='text/csv'
+                fecha_fin = st.date_input("📅 Hasta", value=max(maximo, date.today()))
+
+        where, params = construir_filtros(
+            None if usuario_sel == "Todos" else usuario_sel,
+            None if tabla_sel == "Todas" else tabla_sel,
+            None if accion_sel == "Todas" else accion_sel,
+            fecha_ini, fecha_fin,
+        )
+
+        modo = st.radio("🗂️ Vista", ["📋 Detalle", "📊 Resumen por día, usuario y acción"], horizontal=True)
+
+        if modo == "📋 Detalle":
+            # 📥 Botón de exportar
+            col_export, _ = st.columns(2)
+            with col_export:
+                boton_exportar("⬇️ Exportar a CSV", f"SELECT * FROM bitacora WHERE {where} ORDER BY hora_ingreso DESC",
+                               params, "bitacora_filtrada.csv", formato="csv", tablas=("bitacora",))
+
+            # 🧾 Mostrar bitácora filtrada (el total se calcula una vez y lo reutiliza la grilla)
+            total = estimar_total(conn, f"SELECT * FROM bitacora WHERE {where}", params, tablas=("bitacora",))
+            st.markdown(f"### 📋 Resultados encontrados: {'~' if total[1] else ''}{total[0]} registros")
+            grilla_bitacora(
+                "bitacora", "SELECT * FROM bitacora",
+                [("hora_ingreso", "DESC"), ("id_bitacora", "DESC")],
+                condiciones=[(where, params)], filas_por_pagina=25,
+                tablas=("bitacora",), total=total,
             )
 
-        # 🧾 Mostrar bitácora filtrada
-        st.markdown(f"### 📋 Resultados encontrados: {len(df_filtrado)} registros")
-        st.dataframe(df_filtrado.drop(columns=["fecha"]), use_container_width=True)
+            # 🗄️ Meses ya archivados fuera de la base de datos
+            if meses_archivados() and st.checkbox("🗄️ Incluir meses archivados"):
+                try:
+                    df_archivo = leer_archivo(
+                        fecha_ini, fecha_fin,
+                        None if usuario_sel == "Todos" else usuario_sel,
+                        None if tabla_sel == "Todas" else tabla_sel,
+                        None if accion_sel == "Todas" else accion_sel,
+                    )
+                    st.markdown(f"### 🗄️ Archivo: {len(df_archivo)} registros")
+                    st.dataframe(df_archivo, use_container_width=True)
+                except RuntimeError as e:
+                    st.warning(f"⚠️ {e}")
+        else:
+            df_resumen = resumen_bitacora(conn, where, params)
+            if df_resumen.empty:
+                st.info("ℹ️ No hay registros para los filtros seleccionados.")
+            else:
+                st.markdown(f"### 📊 {int(df_resumen['total'].sum())} acciones en el período")
+                st.bar_chart(df_resumen.groupby("dia")["total"].sum())
+                st.dataframe(df_resumen, use_container_width=True)
 
     except Exception as e:
         st.error(f"❌ Error al cargar la bitácora: {e}")
     finally:
-        conn.close()
+        liberar_conexion(conn)
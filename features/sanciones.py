@@ -1,52 +1,26 @@
 import streamlit as st
-import pandas as pd
-import psycopg2
-import requests
+from psycopg2 import errors
 from streamlit_lottie import st_lottie
-
-# 🔌 Conexión
-def conectar_bd():
-    return psycopg2.connect(
-        host="localhost",
-        database="futbol_gestion",
-        user="postgres",
-        password="12345"
-    )
-
-# Jugadores
-def obtener_jugadores():
-    conn = conectar_bd()
-    cur = conn.cursor()
-    cur.execute("SELECT id_jugador, nombre FROM jugadores ORDER BY nombre")
-    datos = cur.fetchall()
-    conn.close()
-    return datos
-
-# Partidos
-def obtener_partidos():
-    conn = conectar_bd()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT id_partido, 
-            (SELECT nombre_equipo FROM equipos WHERE id_equipo = equipo_local) || ' vs ' ||
-            (SELECT nombre_equipo FROM equipos WHERE id_equipo = equipo_visitante) || ' - ' || fecha
-        FROM partidos ORDER BY fecha DESC
-    """)
-    datos = cur.fetchall()
-    conn.close()
-    return datos
+from core.animaciones import cargar_animacion
+from core.db import conexion
+from core.cache import consultar, invalidar
+from core.trazas import tramo
+from views.componentes import selector_partido, selector_jugador, fragmento, tabla_por_paginas
 
 # Registrar sanción
 def registrar_sancion(jugador_id, partido_id, tipo, minuto, observacion, usuario):
     try:
-        conn = conectar_bd()
-        cur = conn.cursor()
-        cur.execute("""
-            CALL registrar_sancion(%s, %s, %s, %s, %s, %s)
-        """, (jugador_id, partido_id, tipo, minuto, observacion, usuario))
-        conn.commit()
-        conn.close()
+        with conexion() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                CALL registrar_sancion(%s, %s, %s, %s, %s, %s)
+            """, (jugador_id, partido_id, tipo, minuto, observacion, usuario))
+            conn.commit()
+        invalidar("sanciones")
         return True
+    except errors.UniqueViolation:
+        st.error("❌ El jugador ya tiene esta sanción en este partido.")
+        return False
     except Exception as e:
         st.error(f"❌ Error al registrar sanción: {e}")
         return False
@@ -54,9 +28,7 @@ def registrar_sancion(jugador_id, partido_id, tipo, minuto, observacion, usuario
 
 # Mostrar sanciones
 def mostrar_sanciones():
-    conn = conectar_bd()
-    cur = conn.cursor()
-    cur.execute("""
+    return consultar("""
         SELECT 
             s.id_sancion,
             j.nombre AS jugador,
@@ -70,18 +42,8 @@ def mostrar_sanciones():
         LEFT JOIN equipos eq ON j.id_equipo = eq.id_equipo
         JOIN partidos p ON s.id_partido = p.id_partido
         ORDER BY p.fecha DESC, s.tipo;
-    """)
-    columnas = [desc[0] for desc in cur.description]
-    datos = cur.fetchall()
-    conn.close()
-    return pd.DataFrame(datos, columns=columnas)
-
-# Cargar animación
-def cargar_lottie(url):
-    r = requests.get(url)
-    if r.status_code == 200:
-        return r.json()
-    return None
+    """, tablas=("sanciones", "jugadores", "equipos", "partidos"))
+
 
 # Interfaz mejorada con paginación y filtros
 def mostrar_pantalla_sanciones():
@@ -96,19 +58,14 @@ def mostrar_pantalla_sanciones():
 
     st.markdown('<h1 class="titulo">🟥 Registro de Sanciones</h1>', unsafe_allow_html=True)
 
-    animacion = cargar_lottie("https://lottie.host/5aa309cf-d46f-4aa4-a548-6a49ac8bba9e/yFM4lqBCxg.json")
+    animacion = cargar_animacion("sanciones")
     if animacion:
-        st_lottie(animacion, height=180)
+        with tramo("lottie.dibujar"):
+            st_lottie(animacion, height=180)
 
     with st.expander("➕ Registrar nueva sanción"):
-        jugadores = obtener_jugadores()
-        partidos = obtener_partidos()
-
-        jugador_sel = st.selectbox("👤 Jugador sancionado", [j[1] for j in jugadores])
-        partido_sel = st.selectbox("🗓️ Partido", [p[1] for p in partidos])
-
-        jugador_id = [j[0] for j in jugadores if j[1] == jugador_sel][0]
-        partido_id = [p[0] for p in partidos if p[1] == partido_sel][0]
+        partido_id, partidos = selector_partido("sancion_partido", "🗓️ Partido")
+        jugador_id, _ = selector_jugador("sancion_jugador", "👤 Jugador sancionado", partidos.extras.get(partido_id, ()))
 
         tipo = st.selectbox("🚩 Tipo de sanción", ["Amarilla", "Roja", "Suspensión"])
         minuto = st.number_input("⏱️ Minuto", min_value=0, max_value=120, step=1)
@@ -134,7 +91,12 @@ def mostrar_pantalla_sanciones():
         st.info("ℹ️ No hay sanciones registradas.")
         return
 
-    # Filtros
+    lista_sanciones(df)
+
+
+# Filtros y páginas: solo re-ejecutan este fragmento, sobre las sanciones ya consultadas
+@fragmento
+def lista_sanciones(df):
     col1, col2 = st.columns(2)
     jugadores = df["jugador"].unique()
     tipos = df["tipo"].unique()
@@ -149,13 +111,7 @@ def mostrar_pantalla_sanciones():
         df = df[df["tipo"] == tipo_filtro]
 
     # Paginación
-    registros_por_pagina = 10
-    total_paginas = (len(df) - 1) // registros_por_pagina + 1
-    pagina_actual = st.number_input("📄 Página", min_value=1, max_value=total_paginas, step=1)
-
-    inicio = (pagina_actual - 1) * registros_por_pagina
-    fin = inicio + registros_por_pagina
-    st.dataframe(df.iloc[inicio:fin], use_container_width=True)
+    tabla_por_paginas(df, 10)
 
 # ▶️ Ejecutar
 if __name__ == "__main__":
@@ -1,12 +1,16 @@
 # 📦 utils.py
 # Funciones auxiliares para bitácora, conexión y datos del sistema
 
-import psycopg2
 import socket
+import functools
+from datetime import datetime, timezone
 import streamlit as st
-from core.db import get_connection
+from core.db import get_connection, liberar_conexion
+from core.auditoria import encolar_evento, vaciar_bitacora
+from core.cache import invalidar
 
-# 🖥️ Obtener IP y nombre de la máquina local
+# 🖥️ Obtener IP y nombre de la máquina local (se resuelve una sola vez por proceso)
+@functools.lru_cache(maxsize=1)
 def obtener_datos_equipo():
     try:
         ip = socket.gethostbyname(socket.gethostname())
@@ -19,7 +23,9 @@ def obtener_datos_equipo():
 # 📝 Registrar acción en la bitácora
 def registrar_entrada(tabla, accion, descripcion, navegador="streamlit"):
     """
-    Registra una nueva entrada en la tabla bitácora con la hora actual.
+    Registra una nueva entrada en la tabla bitácora.
+    La fila se encola con la hora del evento y la escribe en segundo plano el
+    escritor de core.auditoria.
     
     Parámetros:
         tabla (str): Nombre de la tabla afectada.
@@ -27,27 +33,14 @@ def registrar_entrada(tabla, accion, descripcion, navegador="streamlit"):
         descripcion (str): Descripción de lo ocurrido.
         navegador (str): Origen del acceso. Por defecto es "streamlit".
     """
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        usuario = st.session_state.get("usuario", "desconocido")
-        ip, nombre_maquina = obtener_datos_equipo()
+    usuario = st.session_state.get("usuario", "desconocido")
+    ip, nombre_maquina = obtener_datos_equipo()
 
-        cursor.execute("""
-            INSERT INTO bitacora (
-                usuario, hora_ingreso, navegador, ip, nombre_maquina,
-                tabla_afectada, tipo_accion, descripcion
-            ) VALUES (%s, current_timestamp, %s, %s, %s, %s, %s, %s)
-        """, (
-            usuario, navegador, ip, nombre_maquina, tabla, accion, descripcion
-        ))
-
-        conn.commit()
-        conn.close()
-        print(f"🟢 Entrada registrada en bitácora: {usuario} - {accion} en {tabla}")
-    except Exception as e:
-        print(f"❌ Error al registrar entrada: {e}")
+    encolado = encolar_evento((
+        usuario, datetime.now(timezone.utc), navegador, ip, nombre_maquina, tabla, accion, descripcion
+    ))
+    if not encolado:
+        print(f"⚠️ Bitácora saturada, se descartó: {usuario} - {accion} en {tabla}")
 
 # 🚪 Registrar salida de sesión en la bitácora
 def registrar_salida(usuario):
@@ -57,13 +50,17 @@ def registrar_salida(usuario):
     Parámetros:
         usuario (str): Nombre del usuario que cierra sesión.
     """
+    # Primero se escriben las entradas pendientes (incluido el LOGIN de esta sesión)
+    vaciar_bitacora()
+
+    conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
 
         # Buscar la última entrada sin hora_salida
         cursor.execute("""
-            SELECT id_bitacora FROM bitacora
+            SELECT id_bitacora, hora_ingreso FROM bitacora
             WHERE usuario = %s AND hora_salida IS NULL
             ORDER BY hora_ingreso DESC
             LIMIT 1
@@ -71,17 +68,19 @@ def registrar_salida(usuario):
         resultado = cursor.fetchone()
 
         if resultado:
-            id_bitacora = resultado[0]
+            id_bitacora, hora_ingreso = resultado
+            # hora_ingreso es la clave de partición: el UPDATE solo toca la del mes
             cursor.execute("""
                 UPDATE bitacora
                 SET hora_salida = current_timestamp
-                WHERE id_bitacora = %s
-            """, (id_bitacora,))
+                WHERE id_bitacora = %s AND hora_ingreso = %s
+            """, (id_bitacora, hora_ingreso))
             conn.commit()
+            invalidar("bitacora")
             print(f"✅ Hora de salida registrada para {usuario}")
         else:
             print("⚠️ No se encontró sesión activa para cerrar.")
     except Exception as e:
         print(f"❌ Error al registrar hora de salida: {e}")
     finally:
-        conn.close()
+        liberar_conexion(conn)
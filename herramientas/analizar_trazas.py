@@ -0,0 +1,128 @@
+import sys
+import json
+import argparse
+from collections import defaultdict
+from core.trazas import ARCHIVO
+
+# 🔥 Dónde se va el tiempo de cada pantalla, según las trazas de core/trazas.py
+# Lee trazas.jsonl (y sus rotaciones), arma el árbol de tramos de cada ejecución y
+# lo suma por pantalla y por camino (pantalla > importar, pantalla > consulta, ...):
+# tiempo total, propio (sin contar los hijos), por ejecución y % de la pantalla.
+# Uso:
+#     python -m herramientas.analizar_trazas
+#     python -m herramientas.analizar_trazas --pantalla Estadísticas --lentas 5
+#     python -m herramientas.analizar_trazas --archivo /ruta/a/trazas.jsonl --min-pct 2
+
+ANCHO_BARRA = 30
+
+
+def leer(archivos):
+    """Tramos de todos los archivos (los rotados primero, que son los más viejos)."""
+    tramos = []
+    for ruta in archivos:
+        try:
+            with open(ruta, encoding="utf-8") as archivo:
+                for linea in archivo:
+                    try:
+                        tramos.append(json.loads(linea))
+                    except ValueError:
+                        pass   # línea cortada por una rotación o un corte del proceso
+        except OSError:
+            continue
+    return tramos
+
+
+def archivos_por_defecto():
+    rotados = sorted(ARCHIVO.parent.glob(ARCHIVO.name + ".*"), key=lambda r: -int(r.suffix[1:]))
+    return rotados + [ARCHIVO]
+
+
+def agrupar(tramos):
+    """{traza: (raíz, {id tramo: [hijos]})} solo de las trazas completas (con su raíz escrita)."""
+    por_traza = defaultdict(list)
+    for t in tramos:
+        por_traza[t["traza"]].append(t)
+    trazas = {}
+    for id_traza, lista in por_traza.items():
+        raices = [t for t in lista if t["padre"] is None]
+        if not raices:
+            continue
+        hijos = defaultdict(list)
+        for t in lista:
+            if t["padre"] is not None:
+                hijos[t["padre"]].append(t)
+        trazas[id_traza] = (raices[0], hijos)
+    return trazas
+
+
+def llama(trazas):
+    """
+    {pantalla: {camino: [veces, ms totales, ms propios]}} y {pantalla: ejecuciones}.
+    El camino es la tupla de nombres desde la raíz; las consultas se separan por sentencia
+    solo en el detalle de --lentas, para que el árbol no se abra en cientos de ramas.
+    """
+    caminos = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0.0]))
+    ejecuciones = defaultdict(int)
+
+    def recorrer(pantalla, tramo, hijos, camino):
+        detalle = tramo.get("tipo") or tramo.get("modulo")   # grafico:plotly.bar, importar:plotly.express
+        camino = camino + (f"{tramo['nombre']}:{detalle}" if detalle else tramo["nombre"],)
+        propios = tramo["ms"] - sum(h["ms"] for h in hijos[tramo["tramo"]])
+        datos = caminos[pantalla][camino]
+        datos[0] += 1
+        datos[1] += tramo["ms"]
+        datos[2] += max(propios, 0.0)
+        for hijo in hijos[tramo["tramo"]]:
+            recorrer(pantalla, hijo, hijos, camino)
+
+    for raiz, hijos in trazas.values():
+        pantalla = raiz.get("pantalla") or raiz["nombre"]
+        ejecuciones[pantalla] += 1
+        recorrer(pantalla, raiz, hijos, ())
+    return caminos, ejecuciones
+
+
+def imprimir_llama(pantalla, caminos, ejecuciones, min_pct):
+    total = sum(datos[1] for camino, datos in caminos.items() if len(camino) == 1)
+    print(f"\n🖥️ {pantalla}: {ejecuciones} ejecuciones, {total / ejecuciones:.1f} ms por ejecución")
+    for camino in sorted(caminos):
+        veces, ms, propios = caminos[camino]
+        pct = 100 * ms / total if total else 0
+        if pct < min_pct:
+            continue
+        barra = "█" * max(1, round(ANCHO_BARRA * pct / 100))
+        nombre = "  " * (len(camino) - 1) + camino[-1]
+        print(f"   {nombre:38} {barra:{ANCHO_BARRA}} {pct:5.1f}%  {ms / ejecuciones:8.1f} ms/ej"
+              f"  propio {propios / ejecuciones:7.1f} ms  ×{veces / ejecuciones:.1f}")
+
+
+def imprimir_lentas(pantalla, trazas, cantidad):
+    """Las `cantidad` ejecuciones más lentas de la pantalla, con sus consultas más caras."""
+    propias = [(raiz, hijos) for raiz, hijos in trazas.values() if (raiz.get("pantalla") or raiz["nombre"]) == pantalla]
+    for raiz, hijos in sorted(propias, key=lambda r: -r[0]["ms"])[:cantidad]:
+        print(f"   🐢 {raiz['ms']:.1f} ms · sesión {raiz.get('sesion')} · traza {raiz['traza']}")
+        consultas = [t for lista in hijos.values() for t in lista if t["nombre"] == "consulta"]
+        for consulta in sorted(consultas, key=lambda t: -t["ms"])[:3]:
+            print(f"        {consulta['ms']:8.1f} ms  {consulta.get('sql', '')[:100]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Desglose de las trazas por pantalla")
+    parser.add_argument("--archivo", nargs="+", help=f"Por defecto {ARCHIVO} y sus rotaciones")
+    parser.add_argument("--pantalla", help="Solo esta pantalla (entrada del menú)")
+    parser.add_argument("--min-pct", type=float, default=1.0, help="Oculta los caminos con menos %% del total")
+    parser.add_argument("--lentas", type=int, default=3, help="Ejecuciones más lentas a detallar por pantalla")
+    args = parser.parse_args()
+
+    trazas = agrupar(leer(args.archivo or archivos_por_defecto()))
+    if not trazas:
+        print("ℹ️ No hay trazas: abre algunas pantallas con la app (TRAZAS=1) y vuelve a correr esto.")
+        sys.exit(0)
+    caminos, ejecuciones = llama(trazas)
+    for pantalla in sorted(caminos, key=lambda p: -ejecuciones[p]):
+        if args.pantalla and pantalla != args.pantalla:
+            continue
+        imprimir_llama(pantalla, caminos[pantalla], ejecuciones[pantalla], args.min_pct)
+        if args.lentas:
+            imprimir_lentas(pantalla, trazas, args.lentas)
+    sys.exit(0)
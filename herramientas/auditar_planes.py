@@ -0,0 +1,119 @@
+import re
+import sys
+import argparse
+from core.db import conexion, observar_consultas
+from herramientas.benchmark import PANTALLAS, correr_escenario
+
+# 🔬 Auditoría de planes de consulta
+# Recorre las pantallas e interacciones del benchmark capturando cada sentencia
+# que la aplicación manda a la base de datos (ya con sus parámetros), corre
+# EXPLAIN sobre cada una y falla si alguna recorre secuencialmente una tabla
+# grande para quedarse con unas pocas filas: con un filtro (faltaría un índice)
+# o debajo de un LIMIT (una página que lee la tabla entera). Las lecturas
+# completas sin filtro ni LIMIT solo se avisan: ahí el recorrido secuencial es
+# lo correcto y el problema, si lo hay, es traer la tabla entera.
+# Pensado para una base llena con herramientas/generar_datos.py.
+# Uso:
+#     python -m herramientas.auditar_planes
+#     python -m herramientas.auditar_planes --filas-min 5000 --pantallas partidos estadisticas
+
+# Recorridos secuenciales aceptados a propósito: (patrón en la sentencia, tabla, motivo)
+PERMITIDOS = [
+]
+
+_EXPLICABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE|INSERT)\b", re.IGNORECASE)
+
+
+def capturar(pantallas=None, progreso=print):
+    """Corre cada escenario del benchmark y devuelve {sentencia: {escenarios}}."""
+    sentencias, actual = {}, [None]
+
+    def observar(sql):
+        texto = sql.decode("utf-8") if isinstance(sql, bytes) else sql
+        if _EXPLICABLE.match(texto):
+            sentencias.setdefault(texto, set()).add(actual[0])
+
+    observar_consultas(observar)
+    try:
+        for nombre in pantallas or PANTALLAS:
+            modulo, funcion, interacciones = PANTALLAS[nombre]
+            for escenario, accion in [("render", None)] + list(interacciones.items()):
+                actual[0] = f"{nombre}/{escenario}"
+                try:
+                    correr_escenario(modulo, funcion, accion)
+                except Exception as e:
+                    progreso(f"⚠️ {actual[0]}: {e}")
+    finally:
+        observar_consultas(None)
+    return sentencias
+
+
+def _recorridos(plan, con_limite=False):
+    """Nodos Seq Scan de un plan en JSON: [(tabla, tiene filtro, hay un LIMIT encima)]."""
+    con_limite = con_limite or plan.get("Node Type") == "Limit"
+    encontrados = []
+    if plan.get("Node Type") == "Seq Scan":
+        encontrados.append((plan["Relation Name"], "Filter" in plan, con_limite))
+    for hijo in plan.get("Plans", []):
+        encontrados.extend(_recorridos(hijo, con_limite))
+    return encontrados
+
+
+def _permitido(sql, tabla):
+    return any(re.search(patron, sql, re.IGNORECASE | re.DOTALL) and t == tabla for patron, t, _ in PERMITIDOS)
+
+
+def auditar(sentencias, filas_min=10_000):
+    """
+    EXPLAIN de cada sentencia sobre tablas con más de `filas_min` filas.
+    Devuelve (fallas, lecturas completas), ambas como [(sentencia, escenarios, tabla, filas, motivo)].
+    """
+    fallas, completas = [], []
+    with conexion() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT c.relname, GREATEST(c.reltuples, 0)::bigint
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')
+        """)
+        tamanos = dict(cur.fetchall())
+        for sql, escenarios in sentencias.items():
+            try:
+                cur.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                plan = cur.fetchone()[0][0]["Plan"]
+            except Exception as e:
+                print(f"⚠️ No se pudo explicar ({e.__class__.__name__}): {_resumen(sql, 80)}")
+                continue
+            finally:
+                conn.rollback()
+            for tabla, filtrado, con_limite in _recorridos(plan):
+                if tamanos.get(tabla, 0) <= filas_min or _permitido(sql, tabla):
+                    continue
+                motivo = "con filtro" if filtrado else "bajo un LIMIT" if con_limite else "tabla completa"
+                destino = completas if motivo == "tabla completa" else fallas
+                destino.append((sql, sorted(escenarios), tabla, tamanos[tabla], motivo))
+    return fallas, completas
+
+
+def _resumen(sql, largo=160):
+    return " ".join(sql.split())[:largo]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Falla si alguna consulta de la app recorre entera una tabla grande")
+    parser.add_argument("--filas-min", type=int, default=10_000, help="Tamaño desde el que una tabla es grande")
+    parser.add_argument("--pantallas", nargs="+", choices=list(PANTALLAS), help="Por defecto todas")
+    args = parser.parse_args()
+
+    sentencias = capturar(args.pantallas)
+    print(f"🔎 {len(sentencias)} sentencias distintas capturadas")
+    fallas, completas = auditar(sentencias, args.filas_min)
+    for sql, escenarios, tabla, filas, motivo in completas:
+        print(f"🟠 Lectura completa de {tabla} (~{filas:,} filas) desde {', '.join(escenarios)}")
+        print(f"   {_resumen(sql)}")
+    for sql, escenarios, tabla, filas, motivo in fallas:
+        print(f"❌ Seq Scan {motivo} en {tabla} (~{filas:,} filas) desde {', '.join(escenarios)}")
+        print(f"   {_resumen(sql)}")
+    print("✅ Ningún recorrido secuencial evitable sobre tablas grandes" if not fallas
+          else f"⚠️ {len(fallas)} recorridos secuenciales evitables sobre tablas grandes")
+    sys.exit(1 if fallas else 0)
@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+from datetime import datetime
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from core.db import metricas_consultas
+from core.cache import limpiar_cache
+from core.auditoria import vaciar_bitacora
+
+# ⏱️ Benchmark de las pantallas del menú
+# Renderiza cada pantalla que enruta main.main con la API de pruebas de Streamlit
+# (sin navegador) y mide el tiempo, las consultas, las filas leídas y el pico de
+# memoria de Python, tanto del primer render como de cada interacción
+# (filtrar, pasar de página, guardar). Pensado para una base de datos llena con
+# herramientas/generar_datos.py.
+# Uso:
+#     python -m herramientas.benchmark correr --salida base.json
+#     python -m herramientas.benchmark correr --salida nuevo.json --pantallas jugadores bitacora
+#     python -m herramientas.benchmark comparar base.json nuevo.json --umbral 0.2
+# (Streamlit escribe sus avisos de "bare mode" por stderr; los resultados van por stdout.)
+# Ojo: "guardar" reenvía el formulario de edición sin cambios, pero igual escribe
+# en la base (UPDATE + bitácora); no correrlo contra producción.
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Acciones de una interacción:
+#     ("texto", etiqueta, valor)   escribe en un text_input
+#     ("elegir", etiqueta, indice) elige la opción `indice` de un selectbox
+#     ("numero", etiqueta, valor)  cambia un number_input
+#     ("clic", etiqueta)           pulsa un botón (o el submit de un formulario)
+PANTALLAS = {
+    "jugadores": ("views.crud_jugadores", "crud_jugadores", {
+        "filtrar": ("texto", "🔍 Buscar por nombre", "Valencia"),
+        "pagina": ("clic", "➡️ Siguiente"),
+        "guardar": ("clic", "💾 Guardar cambios"),
+    }),
+    "equipos": ("views.crud_equipos", "crud_equipos", {
+        "filtrar": ("texto", "🔍 Buscar por nombre del equipo", "Quito"),
+        "pagina": ("clic", "➡️ Siguiente"),
+        "guardar": ("clic", "💾 Guardar cambios"),
+    }),
+    "partidos": ("views.crud_partidos", "crud_partidos", {
+        "filtrar": ("texto", "🔎 Filtrar por nombre de equipo", "Quito"),
+        "pagina": ("clic", "➡️ Siguiente"),
+        "guardar": ("clic", "💾 Guardar cambios"),
+    }),
+    "estadisticas": ("views.crud_estadisticas", "crud_estadisticas", {
+        "filtrar": ("texto", "🔎 Filtrar por jugador o fecha", "Caicedo"),
+        "pagina": ("clic", "➡️ Siguiente"),
+        "guardar": ("clic", "💾 Guardar cambios"),
+    }),
+    "entrenadores": ("features.entrenadores", "mostrar_pantalla_entrenadores", {
+        "pagina": ("clic", "➡️ Siguiente"),
+    }),
+    "sanciones": ("features.sanciones", "mostrar_pantalla_sanciones", {
+        "pagina": ("numero", "📄 Página", 2),
+    }),
+    "asistencias": ("features.asistencias", "mostrar_pantalla_asistencias", {
+        "filtrar": ("elegir", "🔍 Filtrar por equipo local", 1),
+        "pagina": ("numero", "📄 Página", 2),
+    }),
+    "reportes": ("views.reportes", "reportes", {
+        "filtrar": ("elegir", "🏳️ Filtrar por equipo", 1),
+        "pagina": ("numero", "📄 Página", 2),
+    }),
+    "vistas": ("views.vistas", "mostrar_vistas", {
+        "filtrar": ("elegir", "🔎 Selecciona una vista para mostrar:", 1),
+        "pagina": ("numero", "📍 Página:", 2),
+    }),
+    "graficos": ("views.graficos", "graficos", {}),
+    "usuarios": ("auth.usuarios_admin", "gestion_usuarios", {}),
+    "bitacora": ("features.bitacora", "mostrar_bitacora", {
+        "filtrar": ("elegir", "⚙️ Tipo de acción", 1),
+        "pagina": ("clic", "➡️ Siguiente"),
+    }),
+}
+
+# Métricas que se comparan entre corridas (el tiempo es ruidoso: además del
+# porcentaje exige una diferencia mínima absoluta)
+METRICAS = {
+    "segundos": 0.05,
+    "consultas": 0,
+    "filas": 0,
+    "memoria_pico_kb": 256,
+}
+
+
+def _script(modulo, funcion):
+    return f"""
+import sys
+sys.path.insert(0, {ROOT!r})
+import streamlit as st
+st.session_state.setdefault("logueado", True)
+st.session_state.setdefault("usuario", "benchmark")
+st.session_state.setdefault("rol", "admin")
+from {modulo} import {funcion}
+{funcion}()
+"""
+
+
+def _widget(at, accion):
+    tipo, etiqueta = accion[0], accion[1]
+    grupo = {"texto": at.text_input, "elegir": at.selectbox, "numero": at.number_input, "clic": at.button}[tipo]
+    for w in grupo:
+        if w.label == etiqueta and not getattr(w, "disabled", False):
+            return w
+    raise LookupError(f"No se encontró el widget habilitado {tipo} «{etiqueta}»")
+
+
+def _aplicar(at, accion):
+    w = _widget(at, accion)
+    if accion[0] == "clic":
+        w.click()
+    elif accion[0] == "elegir":
+        w.select(w.options[accion[2]])
+    else:
+        w.set_value(accion[2])
+
+
+def _errores(at):
+    return [e.message for e in at.exception] + [e.value for e in at.error]
+
+
+def _medir(ejecutar, memoria):
+    """Corre `ejecutar()` y devuelve tiempo, consultas, filas y (si se pide) pico de memoria."""
+    vaciar_bitacora()
+    antes = metricas_consultas()
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        ejecutar()
+        segundos = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1] if memoria else None
+    finally:
+        if memoria:
+            tracemalloc.stop()
+    vaciar_bitacora()   # lo que la interacción dejó en la bitácora también cuenta
+    despues = metricas_consultas()
+    return {
+        "segundos": segundos,
+        "consultas": despues["consultas"] - antes["consultas"],
+        "filas": despues["filas"] - antes["filas"],
+        "segundos_bd": despues["segundos"] - antes["segundos"],
+        "memoria_pico_kb": round(pico / 1024) if pico is not None else None,
+    }
+
+
+def correr_escenario(modulo, funcion, accion=None, memoria=False, timeout=120):
+    """
+    Un render en frío de la pantalla y, si hay `accion`, la interacción sobre ese render.
+    Se mide solo el paso final (el render o el rerun que provoca la interacción).
+    """
+    limpiar_cache()
+    st.cache_data.clear()
+    at = AppTest.from_string(_script(modulo, funcion), default_timeout=timeout)
+    if accion is None:
+        medida = _medir(at.run, memoria)
+    else:
+        at.run()
+        if _errores(at):
+            raise RuntimeError(f"La pantalla falló antes de la interacción: {_errores(at)[0]}")
+        _aplicar(at, accion)
+        medida = _medir(at.run, memoria)
+    medida["errores"] = _errores(at)
+    return medida
+
+
+def correr(pantallas=None, repeticiones=3, timeout=120, progreso=print):
+    """
+    Mide cada escenario `repeticiones` veces (se informa la mediana del tiempo) y una
+    vez más con tracemalloc para el pico de memoria, que así no infla los tiempos.
+    """
+    resultados = {}
+    for nombre in pantallas or PANTALLAS:
+        modulo, funcion, interacciones = PANTALLAS[nombre]
+        escenarios = [("render", None)] + list(interacciones.items())
+        for escenario, accion in escenarios:
+            clave = f"{nombre}/{escenario}"
+            try:
+                medidas = [correr_escenario(modulo, funcion, accion, timeout=timeout) for _ in range(repeticiones)]
+                memoria = correr_escenario(modulo, funcion, accion, memoria=True, timeout=timeout)
+            except Exception as e:
+                resultados[clave] = {"error": str(e)}
+                progreso(f"❌ {clave:28} {e}")
+                continue
+            tiempos = [m["segundos"] for m in medidas]
+            ultima = medidas[-1]
+            resultados[clave] = {
+                "segundos": round(statistics.median(tiempos), 4),
+                "segundos_min": round(min(tiempos), 4),
+                "segundos_max": round(max(tiempos), 4),
+                "segundos_bd": round(statistics.median(m["segundos_bd"] for m in medidas), 4),
+                "consultas": ultima["consultas"],
+                "filas": ultima["filas"],
+                "memoria_pico_kb": memoria["memoria_pico_kb"],
+                "errores": ultima["errores"],
+            }
+            r = resultados[clave]
+            aviso = f"  ⚠️ {r['errores'][0]}" if r["errores"] else ""
+            progreso(f"{'🟢' if not aviso else '🟠'} {clave:28} {r['segundos']:8.3f}s {r['consultas']:5} consultas "
+                     f"{r['filas']:8} filas {r['memoria_pico_kb']:8} KB{aviso}")
+    return resultados
+
+
+def comparar(base, nuevo, umbral=0.2):
+    """
+    Devuelve [(escenario, métrica, antes, después, cambio relativo)] de los escenarios que
+    empeoraron más de `umbral` (y más que el mínimo absoluto de METRICAS), más los que
+    antes funcionaban y ahora fallan.
+    """
+    regresiones = []
+    for clave, despues in nuevo["resultados"].items():
+        antes = base["resultados"].get(clave)
+        if antes is None or "error" in antes:
+            continue
+        if "error" in despues or (despues["errores"] and not antes["errores"]):
+            regresiones.append((clave, "error", None, despues.get("error") or despues["errores"][0], None))
+            continue
+        for metrica, minimo in METRICAS.items():
+            a, d = antes.get(metrica), despues.get(metrica)
+            if a is None or d is None or d - a <= minimo:
+                continue
+            cambio = (d - a) / a if a else float("inf")
+            if cambio > umbral:
+                regresiones.append((clave, metrica, a, d, cambio))
+    return regresiones
+
+
+def _cargar(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de las pantallas del menú")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_correr = sub.add_parser("correr", help="Mide las pantallas y guarda los resultados en JSON")
+    p_correr.add_argument("--salida", default="benchmark.json")
+    p_correr.add_argument("--pantallas", nargs="+", choices=list(PANTALLAS), help="Por defecto todas")
+    p_correr.add_argument("--repeticiones", type=int, default=3)
+    p_correr.add_argument("--timeout", type=float, default=120, help="Segundos máximos por render")
+    p_comp = sub.add_parser("comparar", help="Marca las regresiones entre dos corridas")
+    p_comp.add_argument("base")
+    p_comp.add_argument("nuevo")
+    p_comp.add_argument("--umbral", type=float, default=0.2, help="Empeoramiento relativo tolerado (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.comando == "correr":
+        resultados = correr(args.pantallas, args.repeticiones, args.timeout)
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "streamlit": st.__version__,
+                "repeticiones": args.repeticiones,
+                "resultados": resultados,
+            }, archivo, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados en {args.salida}")
+        sys.exit(1 if any("error" in r for r in resultados.values()) else 0)
+
+    base, nuevo = _cargar(args.base), _cargar(args.nuevo)
+    regresiones = comparar(base, nuevo, args.umbral)
+    for clave, despues in nuevo["resultados"].items():
+        antes = base["resultados"].get(clave, {})
+        if "segundos" in antes and "segundos" in despues:
+            print(f"   {clave:28} {antes['segundos']:8.3f}s → {despues['segundos']:8.3f}s  "
+                  f"{antes['consultas']:5} → {despues['consultas']:5} consultas")
+    for clave, metrica, a, d, cambio in regresiones:
+        if metrica == "error":
+            print(f"❌ {clave}: ahora falla ({d})")
+        else:
+            print(f"🔺 {clave}: {metrica} {a} → {d} (+{cambio:.0%})")
+    print("✅ Sin regresiones" if not regresiones else f"⚠️ {len(regresiones)} regresiones")
+    sys.exit(1 if regresiones else 0)
@@ -0,0 +1,351 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from collections import defaultdict
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from streamlit.runtime import Runtime
+from core.db import nueva_conexion, estadisticas_pool
+from core.exportacion import exportar_cacheado
+from herramientas.benchmark import ROOT, _aplicar, _errores
+
+# 🏋️ Prueba de carga con varias sesiones a la vez
+# Cada usuario virtual es una sesión de main.py (API de pruebas de Streamlit, sin
+# navegador) en su propio hilo, así que todas comparten el proceso, el pool de
+# conexiones y las cachés igual que en el servidor real. Cada usuario inicia sesión
+# con el formulario de auth.auth.login y repite el recorrido de FLUJO con una pausa
+# entre pasos. La concurrencia sube por niveles (1, 2, 4...) y de cada nivel se
+# informa el rendimiento (pasos por segundo), los percentiles de latencia, la tasa
+# de errores y el pico de conexiones (en uso del pool y abiertas en el servidor).
+# El codo de la curva es el último nivel en que más usuarios todavía dan bastante
+# más rendimiento: a partir de ahí solo alargan las esperas.
+# Uso:
+#     python -m herramientas.carga --usuario Admin --contrasena admin123
+#     python -m herramientas.carga --usuario Admin --niveles 1 2 4 8 16 --duracion 120 --salida carga.json
+# (la contraseña también puede ir en CARGA_CONTRASENA)
+# Con muchos hilos, la API de pruebas a veces falla por su cuenta (p. ej. CPython 3.11
+# compilando main.py en paralelo: "AST constructor recursion depth mismatch"); salen
+# como errores sueltos en el detalle de cada nivel.
+# Ojo: el paso "guardar" inserta estadísticas de verdad; no correrlo contra producción.
+
+INTERVALO_MONITOR = 0.2     # segundos entre muestras de conexiones
+GANANCIA_MINIMA = 0.10      # menos de +10 % de rendimiento al subir de nivel = saturado
+
+# La descarga de "📥 Descargar rendimiento" de views/reportes.py sin filtros. La API
+# de pruebas no ejecuta el callable de st.download_button, así que el paso "exportar"
+# hace lo mismo que hace Streamlit al pulsarlo: llamar a exportar_cacheado.
+EXPORTACION = ("""
+    SELECT * FROM (
+        SELECT j.nombre AS jugador, e.nombre_equipo AS equipo, p.fecha AS fecha_partido,
+               est.goles, est.asistencias, est.minutos_jugados
+        FROM estadisticas est
+        JOIN jugadores j ON est.id_jugador = j.id_jugador
+        LEFT JOIN equipos e ON j.id_equipo = e.id_equipo
+        JOIN partidos p ON est.id_partido = p.id_partido
+    ) AS r
+    WHERE (%(jugador)s IS NULL OR r.jugador = %(jugador)s)
+      AND (%(equipo)s IS NULL OR r.equipo = %(equipo)s)
+    ORDER BY r.fecha_partido DESC
+""", {"jugador": None, "equipo": None}, ("estadisticas", "jugadores", "equipos", "partidos"))
+
+
+class ErrorPaso(Exception):
+    """El paso terminó, pero la pantalla no quedó como se esperaba."""
+
+
+@contextmanager
+def runtime_compartido():
+    """
+    AppTest crea un Runtime de prueba en cada rerun y al terminar lo deja en None; con
+    varias sesiones en hilos, el rerun que termina primero le quita el Runtime a los
+    que siguen corriendo ("Runtime hasn't been created!"). Mientras dure el bloque,
+    Runtime.instance() y Runtime.exists() usan el último Runtime de prueba creado.
+    """
+    originales = Runtime.__dict__["instance"], Runtime.__dict__["exists"]
+    ultimo = [None]
+
+    def actual(cls):
+        if cls._instance is not None:
+            ultimo[0] = cls._instance
+        return ultimo[0]
+
+    def instance(cls):
+        runtime = actual(cls)
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return runtime
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: actual(cls) is not None)
+    try:
+        yield
+    finally:
+        Runtime.instance, Runtime.exists = originales
+
+
+# 🧭 Pasos del recorrido
+def _rerun(at, entrada):
+    """
+    Rerun sobre la pantalla `entrada`. La API de pruebas no conserva el valor del
+    option_menu entre reruns (es un componente), así que cada rerun vuelve a elegirla.
+    """
+    at.session_state["ir_a"] = entrada
+    at.run()
+    _sin_errores(at)
+
+
+def _ir(at, entrada, tipo, etiqueta):
+    """Abre `entrada` del menú y comprueba que se dibujó buscando el widget `tipo` con esa `etiqueta`."""
+    _rerun(at, entrada)
+    if not any(w.label == etiqueta for w in at.get(tipo)):
+        raise ErrorPaso(f"No se llegó a {entrada}")
+
+
+def _sin_errores(at):
+    errores = _errores(at)
+    if errores:
+        raise ErrorPaso(errores[0])
+
+
+def iniciar_sesion(at, usuario, contrasena):
+    at.run()
+    _aplicar(at, ("texto", "👤 Usuario", usuario))
+    _aplicar(at, ("texto", "🔒 Contraseña", contrasena))
+    _aplicar(at, ("clic", "🔓 Iniciar Sesión"))
+    at.run()
+    _sin_errores(at)
+    if not at.session_state["logueado"]:
+        raise ErrorPaso("Usuario o contraseña rechazados")
+
+
+def guardar_estadistica(at):
+    """Envía el formulario "➕ Agregar nueva estadística" con el primer partido y jugador que ofrece."""
+    if not any(w.label == "👤 Jugador" for w in at.selectbox):
+        # Nadie de los dos planteles: busca entre todos los jugadores
+        for casilla in at.checkbox:
+            if casilla.label == "Solo de estos equipos":
+                casilla.uncheck()
+        _rerun(at, "Estadísticas")
+    _aplicar(at, ("numero", "⚽ Goles", random.randint(0, 2)))
+    _aplicar(at, ("numero", "⏱️ Minutos jugados", random.randint(1, 90)))
+    _aplicar(at, ("clic", "💾 Guardar"))
+    _rerun(at, "Estadísticas")
+    avisos = [w.value for w in at.warning if "Selecciona" in w.value]
+    if avisos:
+        raise ErrorPaso(avisos[0])
+
+
+def pasar_pagina(at):
+    """Siguiente página de la grilla; en la última, vuelve una atrás."""
+    for etiqueta in ("➡️ Siguiente", "⬅️ Anterior"):
+        if any(w.label == etiqueta and not w.disabled for w in at.button):
+            _aplicar(at, ("clic", etiqueta))
+            break
+    _rerun(at, "Partidos")
+
+
+def exportar(at):
+    sql, params, tablas = EXPORTACION
+    with exportar_cacheado(sql, params, "xlsx", tablas) as archivo:
+        archivo.read()   # lo que hace Streamlit con el archivo que recibe
+
+
+# (nombre del paso, función que recibe el AppTest)
+FLUJO = [
+    ("partidos", lambda at: _ir(at, "Partidos", "text_input", "🔎 Filtrar por nombre de equipo")),
+    ("partidos/pagina", pasar_pagina),
+    ("estadisticas", lambda at: _ir(at, "Estadísticas", "button", "💾 Guardar")),
+    ("estadisticas/guardar", guardar_estadistica),
+    ("reportes", lambda at: _ir(at, "Reportes", "download_button", "📥 Descargar rendimiento")),
+    ("exportar", exportar),
+]
+
+
+# 👤 Un usuario virtual
+def _medir_paso(nombre, paso, at, registro):
+    inicio = time.perf_counter()
+    error = None
+    try:
+        paso(at)
+        errores = _errores(at)
+        if errores:
+            error = errores[0]
+    except Exception as e:
+        error = f"{e.__class__.__name__}: {e}"
+    registro.append({"paso": nombre, "segundos": time.perf_counter() - inicio, "error": error})
+    return error is None
+
+
+def usuario_virtual(usuario, contrasena, fin, pausa, timeout, registro, vueltas=None):
+    """
+    Inicia sesión y repite FLUJO hasta `fin` (time.monotonic()) o hasta completar
+    `vueltas` recorridos; cada paso va a `registro`. Tras un error sigue con el paso
+    siguiente en una sesión nueva, como quien recarga la página; si no puede iniciar
+    sesión, se retira.
+    """
+    at = None
+    while time.monotonic() < fin and vueltas != 0:
+        vueltas = None if vueltas is None else vueltas - 1
+        for nombre, paso in FLUJO:
+            if time.monotonic() >= fin:
+                return
+            if at is None:
+                at = AppTest.from_file(f"{ROOT}/main.py", default_timeout=timeout)
+                if not _medir_paso("login", lambda a: iniciar_sesion(a, usuario, contrasena), at, registro):
+                    return
+            if not _medir_paso(nombre, paso, at, registro):
+                at = None
+            time.sleep(random.uniform(0.5, 1.5) * pausa)
+
+
+# 📡 Conexiones durante el nivel
+def monitorear(detener, muestras):
+    """Cada INTERVALO_MONITOR anota (en uso en el pool, conexiones del servidor a esta base)."""
+    conn = nueva_conexion()   # fuera del pool: no tiene que contar como una sesión más
+    try:
+        cur = conn.cursor()
+        while not detener.is_set():
+            cur.execute("SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()")
+            muestras.append((estadisticas_pool()["en_uso"], cur.fetchone()[0]))
+            conn.rollback()
+            detener.wait(INTERVALO_MONITOR)
+    finally:
+        conn.close()
+
+
+# 📊 Resultados
+def percentil(valores, p):
+    """Percentil `p` (0-100) por rango más cercano; None si no hay valores."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))]
+
+
+def _latencias(registros):
+    ms = [r["segundos"] * 1000 for r in registros if r["error"] is None]
+    return {f"p{p}_ms": round(percentil(ms, p), 1) if ms else None for p in (50, 95, 99)}
+
+
+def correr_nivel(usuarios, duracion, credenciales, pausa, timeout):
+    registro, muestras = [], []
+    detener = threading.Event()
+    monitor = threading.Thread(target=monitorear, args=(detener, muestras), daemon=True)
+    monitor.start()
+    pool_antes = estadisticas_pool()
+
+    inicio = time.monotonic()
+    hilos = [threading.Thread(target=usuario_virtual, args=(*credenciales, inicio + duracion, pausa, timeout, registro),
+                              daemon=True) for _ in range(usuarios)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.monotonic() - inicio
+    detener.set()
+    monitor.join()
+    pool_despues = estadisticas_pool()
+
+    pasos = [r for r in registro if r["paso"] != "login"]
+    fallidos = [r for r in registro if r["error"]]
+    por_paso = defaultdict(list)
+    for r in registro:
+        por_paso[r["paso"]].append(r)
+    errores = defaultdict(int)
+    for r in fallidos:
+        errores[f"{r['paso']}: {' '.join(r['error'].split())[:120]}"] += 1
+    return {
+        "usuarios": usuarios,
+        "segundos": round(segundos, 1),
+        "pasos": len(pasos),
+        "pasos_por_segundo": round(sum(1 for r in pasos if r["error"] is None) / segundos, 3),
+        "recorridos_por_minuto": round(sum(1 for r in pasos if r["paso"] == FLUJO[-1][0] and r["error"] is None) / segundos * 60, 2),
+        **_latencias(pasos),
+        "tasa_errores": round(len(fallidos) / len(registro), 4) if registro else 0.0,
+        "pico_pool_en_uso": max((m[0] for m in muestras), default=0),
+        "pico_conexiones_servidor": max((m[1] for m in muestras), default=0),
+        "esperas_pool": pool_despues["esperas"] - pool_antes["esperas"],
+        "pool_agotado": pool_despues["agotado"] - pool_antes["agotado"],
+        "por_paso": {paso: {"veces": len(lista), "errores": sum(1 for r in lista if r["error"]), **_latencias(lista)}
+                     for paso, lista in por_paso.items()},
+        "errores": dict(sorted(errores.items(), key=lambda e: -e[1])[:10]),
+    }
+
+
+def codo(niveles):
+    """
+    El codo es el último nivel en que subir de usuarios todavía rinde al menos
+    GANANCIA_MINIMA más pasos por segundo que el nivel anterior; los siguientes
+    están saturados (más usuarios solo alargan las esperas).
+    Devuelve (usuarios del codo, [usuarios de los niveles saturados]).
+    """
+    if not niveles:
+        return None, []
+    mejor = niveles[0]["usuarios"]
+    saturados = []
+    for anterior, nivel in zip(niveles, niveles[1:]):
+        if nivel["pasos_por_segundo"] >= anterior["pasos_por_segundo"] * (1 + GANANCIA_MINIMA) and not saturados:
+            mejor = nivel["usuarios"]
+        else:
+            saturados.append(nivel["usuarios"])
+    return mejor, saturados
+
+
+def correr(niveles, duracion, credenciales, pausa=1.0, timeout=120, progreso=print):
+    # Un recorrido suelto antes de medir: importa las pantallas y llena las cachés frías
+    calentamiento = []
+    usuario_virtual(*credenciales, float("inf"), 0, timeout, calentamiento, vueltas=1)
+    if calentamiento[0]["error"]:
+        raise ErrorPaso(f"No se pudo iniciar sesión: {calentamiento[0]['error']}")
+
+    resultados = []
+    progreso(f"   {'usuarios':>8} {'pasos/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+             f"{'errores':>8} {'pool':>5} {'servidor':>8} {'esperas':>8}")
+    with runtime_compartido():
+        for usuarios in niveles:
+            r = correr_nivel(usuarios, duracion, credenciales, pausa, timeout)
+            resultados.append(r)
+            progreso(f"{'🟢' if not r['tasa_errores'] else '🟠'} {usuarios:8} {r['pasos_por_segundo']:8.2f} "
+                     f"{r['p50_ms'] or 0:8.0f} {r['p95_ms'] or 0:8.0f} {r['p99_ms'] or 0:8.0f} "
+                     f"{r['tasa_errores']:8.1%} {r['pico_pool_en_uso']:5} {r['pico_conexiones_servidor']:8} {r['esperas_pool']:8}")
+            for error, veces in r["errores"].items():
+                progreso(f"      ⚠️ ×{veces} {error}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones concurrentes")
+    parser.add_argument("--usuario", required=True, help="Usuario de la tabla usuarios con el que entra cada sesión")
+    parser.add_argument("--contrasena", default=None, help="Por defecto la variable CARGA_CONTRASENA")
+    parser.add_argument("--niveles", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Sesiones concurrentes de cada nivel")
+    parser.add_argument("--duracion", type=float, default=60, help="Segundos por nivel")
+    parser.add_argument("--pausa", type=float, default=1.0, help="Segundos de pausa media entre pasos (tiempo de lectura)")
+    parser.add_argument("--timeout", type=float, default=120, help="Segundos máximos por rerun")
+    parser.add_argument("--salida", help="Guarda los resultados en este JSON")
+    args = parser.parse_args()
+
+    contrasena = args.contrasena if args.contrasena is not None else os.getenv("CARGA_CONTRASENA", "")
+    resultados = correr(sorted(set(args.niveles)), args.duracion, (args.usuario, contrasena), args.pausa, args.timeout)
+    mejor, saturados = codo(resultados)
+    print(f"📈 Codo de la curva: {mejor} usuarios")
+    if saturados:
+        print(f"🧱 Saturado desde {saturados[0]} usuarios: menos de {GANANCIA_MINIMA:.0%} más de rendimiento por nivel")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "streamlit": st.__version__,
+                "duracion": args.duracion,
+                "pausa": args.pausa,
+                "codo": mejor,
+                "saturados": saturados,
+                "niveles": resultados,
+            }, archivo, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados en {args.salida}")
+    sys.exit(1 if any(r["tasa_errores"] for r in resultados) else 0)
@@ -0,0 +1,406 @@
+import sys
+import math
+import time
+import random
+import argparse
+from datetime import date, datetime, timedelta
+from core.db import nueva_conexion
+
+# 🏟️ Generador de una liga sintética para pruebas de volumen
+# Llena el esquema existente (equipos, jugadores, torneos, partidos, estadísticas,
+# sanciones, asistencias, entrenadores y bitácora) con datos realistas y
+# reproducibles a partir de una semilla. Todo se carga con COPY en una sola
+# transacción, respetando los CHECK y los triggers de validación del esquema.
+# Uso:
+#     python -m herramientas.generar_datos --equipos 40 --temporadas 20 --semilla 7
+#     python -m herramientas.generar_datos --vaciar        (borra la liga actual antes)
+
+NOMBRES = [
+    "Carlos", "José", "Luis", "Juan", "Miguel", "Jorge", "Andrés", "Diego", "Kevin", "Byron",
+    "Jefferson", "Ángel", "Pedro", "Édison", "Felipe", "Cristian", "Jhon", "Moisés", "Piero", "Alan",
+    "Gonzalo", "Renato", "Segundo", "Washington", "Ulises", "Énner", "Romario", "Joao", "Félix", "Walter",
+]
+APELLIDOS = [
+    "Valencia", "Caicedo", "Estupiñán", "Hincapié", "Plata", "Preciado", "Méndez", "Arboleda", "Ibarra",
+    "Mena", "Quiñónez", "Cortez", "Castillo", "Domínguez", "Guerra", "Tenorio", "Montero", "Ayoví",
+    "Cevallos", "Paredes", "Rodríguez", "Sornoza", "Angulo", "Corozo", "Minda", "Pacheco", "Reasco",
+    "Chalá", "Noboa", "Folleco", "Bolaños", "Franco", "Vera", "León", "Salazar", "Torres",
+]
+CIUDADES = [
+    "Guayaquil", "Quito", "Cuenca", "Manta", "Ambato", "Loja", "Machala", "Esmeraldas", "Portoviejo",
+    "Riobamba", "Ibarra", "Latacunga", "Babahoyo", "Quevedo", "Santo Domingo", "Milagro", "Tulcán",
+]
+SUFIJOS_EQUIPO = ["SC", "FC", "Club", "Deportivo", "Atlético", "Sporting", "Unión", "Real"]
+NACIONALIDADES = ["Ecuador"] * 14 + ["Colombia", "Argentina", "Uruguay", "Venezuela", "Brasil", "Paraguay", "Perú"]
+NAVEGADORES = ["Chrome", "Firefox", "Edge", "Safari", "Opera"]
+USUARIOS = ["admin", "admin1", "usuario1", "usuario2", "entrenador", "invitado"]
+
+# (posición, jugadores por plantel, peso para marcar, peso para asistir)
+POSICIONES = [
+    ("Portero", 3, 0.0, 0.1),
+    ("Defensa", 8, 0.4, 0.6),
+    ("Mediocampista", 8, 1.0, 1.6),
+    ("Delantero", 6, 2.6, 1.0),
+]
+TITULARES = {"Portero": 1, "Defensa": 4, "Mediocampista": 4, "Delantero": 2}
+
+TABLAS_LIGA = ("equipos", "jugadores", "torneos", "partidos", "estadisticas",
+               "sanciones", "asistencias_partido", "entrenadores")
+
+# Triggers que solo escriben en la bitácora: se desactivan durante la carga
+# (salvo --con-auditoria) porque duplican cada fila cargada. Los de validación siguen activos.
+TRIGGERS_AUDITORIA = {
+    "equipos": ("trigger_equipos",),
+    "jugadores": ("trigger_jugadores", "trg_insert_jugador"),
+    "estadisticas": ("trigger_estadisticas",),
+}
+
+
+def _escapar(valor):
+    if valor is None:
+        return "\\N"
+    texto = str(valor)
+    if "\\" in texto or "\t" in texto or "\n" in texto or "\r" in texto:
+        texto = texto.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return texto
+
+
+class _FlujoCopy:
+    """Objeto tipo archivo que produce las líneas de COPY a medida que psycopg2 las lee."""
+
+    def __init__(self, filas):
+        self._filas = iter(filas)
+        self._resto = ""
+        self.total = 0
+
+    def read(self, tamano=65536):
+        partes, largo = [self._resto], len(self._resto)
+        while largo < tamano:
+            fila = next(self._filas, None)
+            if fila is None:
+                break
+            linea = "\t".join(_escapar(v) for v in fila) + "\n"
+            partes.append(linea)
+            largo += len(linea)
+            self.total += 1
+        bloque = "".join(partes)
+        self._resto = bloque[tamano:]
+        return bloque[:tamano]
+
+
+def _copiar(cur, tabla, columnas, filas):
+    flujo = _FlujoCopy(filas)
+    cur.copy_expert(f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN", flujo, size=1 << 16)
+    return flujo.total
+
+
+def _siguiente_id(cur, tabla, columna):
+    cur.execute(f"SELECT COALESCE(MAX({columna}), 0) + 1 FROM {tabla}")
+    return cur.fetchone()[0]
+
+
+def _ajustar_secuencia(cur, tabla, columna):
+    cur.execute(f"""
+        SELECT setval(pg_get_serial_sequence(%s, %s), (SELECT COALESCE(MAX({columna}), 1) FROM {tabla}))
+    """, (tabla, columna))
+
+
+def _calendario(ids_equipos):
+    """Todos contra todos, ida y vuelta (método del círculo). Devuelve [[(local, visitante)]] por jornada."""
+    equipos = list(ids_equipos)
+    if len(equipos) % 2:
+        equipos.append(None)
+    n = len(equipos)
+    jornadas = []
+    for ronda in range(n - 1):
+        cruces = []
+        for i in range(n // 2):
+            a, b = equipos[i], equipos[n - 1 - i]
+            if a is not None and b is not None:
+                cruces.append((a, b) if ronda % 2 == 0 else (b, a))
+        jornadas.append(cruces)
+        equipos = [equipos[0], equipos[-1]] + equipos[1:-1]
+    return jornadas + [[(v, l) for l, v in cruces] for cruces in jornadas]
+
+
+class GeneradorLiga:
+    """
+    Genera la liga en memoria por partes (los partidos y sus estadísticas se
+    producen al vuelo mientras COPY los consume).
+
+    Parámetros:
+        semilla (int): Misma semilla y mismos ids iniciales => mismos datos.
+        equipos (int): Número de equipos.
+        temporadas (int): Torneos (uno por año, terminando en el año actual).
+        bitacora (int): Filas de bitácora sintéticas.
+    """
+
+    def __init__(self, semilla=42, equipos=20, temporadas=5, bitacora=50_000):
+        self.rnd = random.Random(semilla)
+        self.n_equipos = equipos
+        self.temporadas = temporadas
+        self.n_bitacora = bitacora
+        self.equipos, self.jugadores, self.por_posicion, self.partidos = [], {}, {}, []
+
+    def _nombre(self):
+        return f"{self.rnd.choice(NOMBRES)} {self.rnd.choice(APELLIDOS)} {self.rnd.choice(APELLIDOS)}"
+
+    def filas_equipos(self, primer_id):
+        nombres = [f"{sufijo} {ciudad}" for ciudad in CIUDADES for sufijo in SUFIJOS_EQUIPO]
+        self.rnd.shuffle(nombres)
+        for i in range(self.n_equipos):
+            nombre = nombres[i % len(nombres)]
+            if i >= len(nombres):
+                nombre = f"{nombre} {i // len(nombres) + 1}"
+            capacidad = self.rnd.randrange(8_000, 60_001, 500)
+            id_equipo = primer_id + i
+            self.equipos.append((id_equipo, capacidad))
+            yield id_equipo, nombre, "Ecuador", f"Estadio {nombre.split(' ', 1)[1]}"
+
+    def filas_jugadores(self, primer_id):
+        id_jugador = primer_id
+        for id_equipo, _ in self.equipos:
+            plantel = []
+            for posicion, cantidad, peso_gol, peso_asistencia in POSICIONES:
+                for _ in range(cantidad):
+                    plantel.append((id_jugador, posicion, peso_gol, peso_asistencia))
+                    yield (id_jugador, self._nombre(), self.rnd.randint(17, 38),
+                           self.rnd.choice(NACIONALIDADES), posicion, id_equipo)
+                    id_jugador += 1
+            self.jugadores[id_equipo] = plantel
+            self.por_posicion[id_equipo] = {
+                posicion: [j for j in plantel if j[1] == posicion] for posicion, *_ in POSICIONES
+            }
+
+    def filas_entrenadores(self, primer_id):
+        for i, (id_equipo, _) in enumerate(self.equipos):
+            yield primer_id + i, self._nombre(), self.rnd.choice(NACIONALIDADES), self.rnd.randint(35, 68), id_equipo
+
+    def filas_torneos(self, primer_id):
+        ultimo_año = date.today().year
+        self.torneos = []
+        for i in range(self.temporadas):
+            año = ultimo_año - self.temporadas + 1 + i
+            self.torneos.append((primer_id + i, año))
+            yield primer_id + i, f"LigaPro {año}", año, "Serie A"
+
+    def filas_partidos(self, primer_id):
+        """Calendario de cada torneo; el marcador se decide aquí para que cuadre con los goles."""
+        id_partido = primer_id
+        ids = [e[0] for e in self.equipos]
+        for id_torneo, año in self.torneos:
+            self.rnd.shuffle(ids)
+            jornadas = _calendario(ids)
+            inicio = date(año, 2, 1)
+            dias = max((min(date(año, 11, 30), date.today()) - inicio).days, len(jornadas))
+            paso = dias / len(jornadas)
+            for j, cruces in enumerate(jornadas):
+                fecha = inicio + timedelta(days=int(j * paso))
+                if fecha > date.today():
+                    break
+                for local, visitante in cruces:
+                    goles_local = self._poisson(1.45)
+                    goles_visitante = self._poisson(1.1)
+                    self.partidos.append((id_partido, fecha, local, visitante, goles_local, goles_visitante))
+                    yield id_partido, fecha, local, visitante, goles_local, goles_visitante, id_torneo
+                    id_partido += 1
+
+    def _poisson(self, media):
+        # Knuth: suficiente para medias pequeñas como las de goles o tarjetas
+        limite, k, p = math.exp(-media), 0, 1.0
+        while True:
+            p *= self.rnd.random()
+            if p <= limite:
+                return k
+            k += 1
+
+    def _alineacion(self, id_equipo):
+        """11 titulares y hasta 3 cambios: [(jugador, peso_gol, peso_asistencia, minutos)]."""
+        por_posicion = self.por_posicion[id_equipo]
+        titulares = []
+        for posicion, cantidad in TITULARES.items():
+            titulares += self.rnd.sample(por_posicion[posicion], cantidad)
+        suplentes = self.rnd.sample([j for j in self.jugadores[id_equipo] if j not in titulares and j[1] != "Portero"], 3)
+
+        en_cancha = []
+        cambios = self.rnd.randint(0, 3)
+        salen = self.rnd.sample([j for j in titulares if j[1] != "Portero"], cambios)
+        for jugador in titulares:
+            if jugador in salen:
+                minuto = self.rnd.randint(46, 85)
+                en_cancha.append((jugador[0], jugador[2], jugador[3], minuto))
+                entra = suplentes[salen.index(jugador)]
+                en_cancha.append((entra[0], entra[2], entra[3], 90 - minuto))
+            else:
+                en_cancha.append((jugador[0], jugador[2], jugador[3], 90))
+        return en_cancha
+
+    def filas_estadisticas_y_sanciones(self, primer_id):
+        """Estadísticas por jugador y partido; las sanciones se acumulan para cargarlas después."""
+        id_estadistica = primer_id
+        self.sanciones = []
+        for id_partido, _, local, visitante, goles_local, goles_visitante in self.partidos:
+            for id_equipo, goles in ((local, goles_local), (visitante, goles_visitante)):
+                alineacion = self._alineacion(id_equipo)
+                marcados = dict.fromkeys((j[0] for j in alineacion), 0)
+                asistidos = dict.fromkeys(marcados, 0)
+                for _ in range(goles):
+                    autor = self.rnd.choices(alineacion, weights=[j[1] * j[3] + 0.01 for j in alineacion])[0]
+                    marcados[autor[0]] += 1
+                    if self.rnd.random() < 0.7:
+                        otros = [j for j in alineacion if j[0] != autor[0]]
+                        asistente = self.rnd.choices(otros, weights=[j[2] * j[3] + 0.01 for j in otros])[0]
+                        asistidos[asistente[0]] += 1
+                for id_jugador, _, _, minutos in alineacion:
+                    yield id_estadistica, id_jugador, id_partido, marcados[id_jugador], asistidos[id_jugador], minutos
+                    id_estadistica += 1
+                self._sancionar(id_partido, alineacion)
+
+    def _sancionar(self, id_partido, alineacion):
+        # Una sanción de cada tipo como máximo por jugador y partido (restricción única de sanciones)
+        ya = set()
+        for tipo, media in (("Amarilla", 1.8), ("Roja", 0.1), ("Suspensión", 0.02)):
+            for _ in range(self._poisson(media)):
+                jugador = self.rnd.choice(alineacion)[0]
+                if (jugador, tipo) not in ya:
+                    ya.add((jugador, tipo))
+                    minuto = self.rnd.randint(1, 90) if tipo != "Suspensión" else 90
+                    self.sanciones.append((jugador, id_partido, tipo, minuto, f"{tipo} generada"))
+
+    def filas_sanciones(self, primer_id):
+        for i, (jugador, id_partido, tipo, minuto, observacion) in enumerate(self.sanciones):
+            yield primer_id + i, jugador, id_partido, tipo, minuto, observacion
+
+    def filas_asistencias(self, primer_id):
+        capacidades = dict(self.equipos)
+        for i, (id_partido, _, local, _, _, _) in enumerate(self.partidos):
+            capacidad = capacidades[local]
+            espectadores = int(capacidad * min(1.0, max(0.05, self.rnd.gauss(0.62, 0.2))))
+            yield primer_id + i, id_partido, espectadores, capacidad
+
+    def filas_bitacora(self, primer_id, desde):
+        tablas = ("jugadores", "equipos", "partidos", "estadisticas", "sanciones", "usuarios")
+        acciones = ("INSERT", "UPDATE", "DELETE", "LOGIN")
+        segundos = max(int((datetime.now() - datetime.combine(desde, datetime.min.time())).total_seconds()), 1)
+        inicio = datetime.combine(desde, datetime.min.time())
+        for i in range(self.n_bitacora):
+            ingreso = inicio + timedelta(seconds=self.rnd.randrange(segundos))
+            salida = ingreso + timedelta(minutes=self.rnd.randint(1, 180)) if self.rnd.random() < 0.8 else None
+            accion = self.rnd.choice(acciones)
+            tabla = "usuarios" if accion == "LOGIN" else self.rnd.choice(tablas)
+            yield (primer_id + i, self.rnd.choice(USUARIOS), ingreso, salida, self.rnd.choice(NAVEGADORES),
+                   f"192.168.{self.rnd.randint(0, 20)}.{self.rnd.randint(2, 254)}",
+                   f"PC-{self.rnd.randint(1, 40):02d}", tabla, accion, f"{accion} sintético sobre {tabla}")
+
+
+def _triggers_existentes(cur):
+    cur.execute("SELECT tgrelid::regclass::text, tgname FROM pg_trigger WHERE NOT tgisinternal")
+    return set(cur.fetchall())
+
+
+def generar(semilla=42, equipos=20, temporadas=5, bitacora=50_000, vaciar=False,
+            con_auditoria=False, progreso=print):
+    """Carga la liga sintética. Devuelve {tabla: filas insertadas}."""
+    gen = GeneradorLiga(semilla, equipos, temporadas, bitacora)
+    conn = nueva_conexion()
+    cargadas = {}
+    try:
+        cur = conn.cursor()
+        if vaciar:
+            cur.execute(f"TRUNCATE {', '.join(TABLAS_LIGA)} RESTART IDENTITY CASCADE")
+            progreso("🧹 Liga anterior eliminada")
+
+        desactivados = []
+        if not con_auditoria:
+            existentes = _triggers_existentes(cur)
+            for tabla, nombres in TRIGGERS_AUDITORIA.items():
+                for nombre in nombres:
+                    if (tabla, nombre) in existentes:
+                        cur.execute(f"ALTER TABLE {tabla} DISABLE TRIGGER {nombre}")
+                        desactivados.append((tabla, nombre))
+
+        pasos = [
+            ("equipos", "id_equipo", ("id_equipo", "nombre_equipo", "pais", "estadio"), gen.filas_equipos),
+            ("jugadores", "id_jugador", ("id_jugador", "nombre", "edad", "nacionalidad", "posicion", "id_equipo"),
+             gen.filas_jugadores),
+            ("entrenadores", "id_entrenador", ("id_entrenador", "nombre", "nacionalidad", "edad", "id_equipo"),
+             gen.filas_entrenadores),
+            ("torneos", "id_torneo", ("id_torneo", "nombre", "año", "categoria"), gen.filas_torneos),
+            ("partidos", "id_partido", ("id_partido", "fecha", "equipo_local", "equipo_visitante",
+                                        "marcador_local", "marcador_visitante", "id_torneo"), gen.filas_partidos),
+            ("estadisticas", "id_estadistica", ("id_estadistica", "id_jugador", "id_partido", "goles",
+                                                "asistencias", "minutos_jugados"), gen.filas_estadisticas_y_sanciones),
+            ("sanciones", "id_sancion", ("id_sancion", "id_jugador", "id_partido", "tipo", "minuto", "observacion"),
+             gen.filas_sanciones),
+            ("asistencias_partido", "id_asistencia", ("id_asistencia", "id_partido", "espectadores",
+                                                      "capacidad_estadio"), gen.filas_asistencias),
+        ]
+        # Sin la migración 003, trg_sancion_duplicada busca por (jugador, partido, tipo) en cada
+        # fila y sin un índice cada inserción recorre toda la tabla: se crea uno solo para la carga.
+        cur.execute("""
+            SELECT 1 FROM pg_index i
+            WHERE i.indrelid = 'sanciones'::regclass
+              AND i.indkey[0] = (SELECT attnum FROM pg_attribute
+                                 WHERE attrelid = 'sanciones'::regclass AND attname = 'id_jugador')
+        """)
+        indice_temporal = cur.fetchone() is None
+        if indice_temporal:
+            cur.execute("CREATE INDEX generador_sanciones_tmp ON sanciones (id_jugador, id_partido)")
+
+        for tabla, columna_id, columnas, filas in pasos:
+            inicio = time.perf_counter()
+            cargadas[tabla] = _copiar(cur, tabla, columnas, filas(_siguiente_id(cur, tabla, columna_id)))
+            _ajustar_secuencia(cur, tabla, columna_id)
+            progreso(f"✅ {tabla:20} {cargadas[tabla]:>10,} filas en {time.perf_counter() - inicio:6.2f}s")
+
+        if bitacora:
+            inicio = time.perf_counter()
+            desde = date(date.today().year - temporadas + 1, 1, 1)
+            cur.execute("SELECT to_regproc('crear_particiones_bitacora') IS NOT NULL")
+            if cur.fetchone()[0]:
+                cur.execute("SELECT crear_particiones_bitacora(3, %s)", (desde,))
+            columnas = ("id_bitacora", "usuario", "hora_ingreso", "hora_salida", "navegador", "ip",
+                        "nombre_maquina", "tabla_afectada", "tipo_accion", "descripcion")
+            cargadas["bitacora"] = _copiar(cur, "bitacora", columnas,
+                                           gen.filas_bitacora(_siguiente_id(cur, "bitacora", "id_bitacora"), desde))
+            _ajustar_secuencia(cur, "bitacora", "id_bitacora")
+            progreso(f"✅ {'bitacora':20} {cargadas['bitacora']:>10,} filas en {time.perf_counter() - inicio:6.2f}s")
+
+        if indice_temporal:
+            cur.execute("DROP INDEX generador_sanciones_tmp")
+        for tabla, nombre in desactivados:
+            cur.execute(f"ALTER TABLE {tabla} ENABLE TRIGGER {nombre}")
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        conn.close()
+        raise
+
+    # La carga ya está confirmada: un error de ANALYZE se informa tal cual, sin rollback
+    try:
+        progreso("📊 Actualizando estadísticas del planificador...")
+        conn.autocommit = True
+        cur = conn.cursor()
+        for tabla in TABLAS_LIGA + ("bitacora",):
+            cur.execute(f"ANALYZE {tabla}")
+    finally:
+        conn.close()
+    return cargadas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera una liga sintética para pruebas de volumen")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--equipos", type=int, default=20)
+    parser.add_argument("--temporadas", type=int, default=5, help="Torneos, uno por año")
+    parser.add_argument("--bitacora", type=int, default=50_000, help="Filas sintéticas de bitácora")
+    parser.add_argument("--vaciar", action="store_true", help="Borra equipos, jugadores, partidos... antes de generar")
+    parser.add_argument("--con-auditoria", action="store_true",
+                        help="Mantiene los triggers de bitácora durante la carga (mucho más lento)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    total = generar(args.semilla, args.equipos, args.temporadas, args.bitacora, args.vaciar, args.con_auditoria)
+    print(f"🏁 {sum(total.values()):,} filas en {time.perf_counter() - inicio:.1f}s")
+    sys.exit(0)
@@ -0,0 +1,105 @@
+import os
+import re
+import sys
+import ast
+import argparse
+import subprocess
+from collections import defaultdict
+
+# 🚀 Dónde se va el tiempo de importación
+# Importa cada módulo en un intérprete nuevo con `python -X importtime` y muestra
+# lo que paga el primer request (main.py), lo que suma cada pantalla de RUTAS
+# la primera vez que se abre y lo que cuestan las librerías que se cargan tarde.
+# Uso:
+#     python -m herramientas.tiempos_arranque
+#     python -m herramientas.tiempos_arranque --repeticiones 5 --top 20
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Librerías que las pantallas importan recién al usarlas
+DIFERIDAS = {
+    "plotly.express": "Gráficos",
+    "matplotlib.pyplot": "Reportes y Vistas, al dibujar",
+    "openpyxl": "exportaciones a xlsx",
+}
+
+# Lo que comparten todas las pantallas (pandas, el pool, la caché): lo paga la primera que se abre
+COMUN = "views.componentes"
+
+_LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def rutas():
+    """RUTAS de main.py, leída sin ejecutar el script de Streamlit."""
+    with open(os.path.join(ROOT, "main.py"), encoding="utf-8") as archivo:
+        arbol = ast.parse(archivo.read())
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Assign) and any(getattr(t, "id", None) == "RUTAS" for t in nodo.targets):
+            return ast.literal_eval(nodo.value)
+    raise LookupError("main.py no define RUTAS")
+
+
+def medir(modulo, previos=()):
+    """
+    Importa `previos` y luego `modulo` en un intérprete nuevo.
+    Devuelve (microsegundos que suma `modulo`, {paquete: microsegundos propios}).
+    """
+    codigo = "".join(f"import {m}\n" for m in previos) + f"import {modulo}\n"
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}: {proceso.stderr.strip().splitlines()[-1]}")
+
+    lineas = [m.groups() for m in map(_LINEA.match, proceso.stderr.splitlines()) if m]
+    # Las líneas de `modulo` son las que siguen a la última de `previos` en el nivel superior
+    inicio = 0
+    for i, (_, _, sangria, nombre) in enumerate(lineas):
+        if not sangria and nombre in previos:
+            inicio = i + 1
+    total, paquetes = 0, defaultdict(int)
+    for propio, acumulado, sangria, nombre in lineas[inicio:]:
+        paquetes[nombre.split(".")[0]] += int(propio)
+        if not sangria and nombre == modulo:
+            total = int(acumulado)
+    return total, paquetes
+
+
+def medir_min(modulo, previos=(), repeticiones=3):
+    """El mínimo de varias corridas: el primer intento suele pagar la caché del disco."""
+    corridas = [medir(modulo, previos) for _ in range(repeticiones)]
+    return min(corridas, key=lambda c: c[0])
+
+
+def _ms(us):
+    return f"{us / 1000:8.1f} ms"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reporte de tiempos de importación de la app")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Paquetes más pesados a mostrar")
+    args = parser.parse_args()
+
+    total, paquetes = medir_min("main", repeticiones=args.repeticiones)
+    print(f"🚀 Arranque de main.py: {_ms(total)}")
+    for paquete, us in sorted(paquetes.items(), key=lambda p: -p[1])[:args.top]:
+        print(f"   {paquete:30} {_ms(us)}")
+
+    total, paquetes = medir_min(COMUN, ("main",), args.repeticiones)
+    pesados = ", ".join(f"{p} {us / 1000:.0f} ms" for p, us in sorted(paquetes.items(), key=lambda p: -p[1])[:3])
+    print(f"\n📦 Común a todas las pantallas ({COMUN}): {_ms(total)}   {pesados}")
+
+    print("\n📂 Primera apertura de cada pantalla (además de lo anterior):")
+    for entrada, (modulo, *_) in rutas().items():
+        total, paquetes = medir_min(modulo, ("main", COMUN), args.repeticiones)
+        pesados = ", ".join(f"{p} {us / 1000:.0f} ms" for p, us in sorted(paquetes.items(), key=lambda p: -p[1])[:3])
+        print(f"   {entrada:14} {modulo:30} {_ms(total)}   {pesados}")
+
+    print("\n💤 Librerías diferidas (se pagan recién al usarlas):")
+    for modulo, donde in DIFERIDAS.items():
+        total, _ = medir_min(modulo, ("main",), args.repeticiones)
+        print(f"   {modulo:30} {_ms(total)}   {donde}")
+    sys.exit(0)
@@ -1,6 +1,7 @@
 # futbol_app/main.py
 import os
-import json
+import uuid
+import importlib
 import streamlit as st
 from dotenv import load_dotenv
 from streamlit_option_menu import option_menu
@@ -12,42 +13,58 @@ env_file = ".env" if os.getenv("ENV", "local") == "local" else ".env.prod"
 load_dotenv(os.path.join(ROOT, env_file))
 
 # 📌 IMPORTS SEGÚN TU NUEVA ESTRUCTURA
-from views.crud_jugadores import crud_jugadores
-from views.crud_equipos import crud_equipos
-from views.crud_partidos import crud_partidos
-from views.crud_estadisticas import crud_estadisticas
-from views.reportes import reportes
-from views.graficos import graficos
-from views.vistas import mostrar_vistas
-
-from auth.auth import login
-from auth.register import register
-from auth.usuarios_admin import gestion_usuarios
-
-from features.entrenadores import mostrar_pantalla_entrenadores
-from features.sanciones import mostrar_pantalla_sanciones
-from features.asistencias import mostrar_pantalla_asistencias
-from features.bitacora import mostrar_bitacora
-
-from core.paths import css_path, anim_path
-from features.utils import registrar_salida  # 📌 Ahora en features/utils.py
+# Las pantallas no se importan aquí: cada una se carga la primera vez que se abre
+# (ver RUTAS), así el primer request no paga plotly, matplotlib, etc.
+from core.paths import css_path
+from core.animaciones import cargar_animacion
+from core.db import en_pantalla, solo_lectura
+from core.trazas import tramo
+
+# 🧭 RUTAS DEL MENÚ: entrada -> (módulo, función, ícono, aviso si no es admin)
+# Con aviso, la pantalla es solo para administradores.
+RUTAS = {
+    "Jugadores": ("views.crud_jugadores", "crud_jugadores", "person-lines-fill", None),
+    "Equipos": ("views.crud_equipos", "crud_equipos", "building", None),
+    "Partidos": ("views.crud_partidos", "crud_partidos", "calendar2-event", None),
+    "Estadísticas": ("views.crud_estadisticas", "crud_estadisticas", "bar-chart-line", None),
+    "Entrenadores": ("features.entrenadores", "mostrar_pantalla_entrenadores", "person-video2", None),
+    "Sanciones": ("features.sanciones", "mostrar_pantalla_sanciones", "exclamation-circle", None),
+    "Asistencias": ("features.asistencias", "mostrar_pantalla_asistencias", "ticket-perforated", None),
+    "Reportes": ("views.reportes", "reportes", "clipboard-data", None),
+    "Vistas": ("views.vistas", "mostrar_vistas", "eye", None),
+    "Gráficos": ("views.graficos", "graficos", "graph-up", None),
+    "Usuarios": ("auth.usuarios_admin", "gestion_usuarios", "people",
+                 "⚠️ Solo los administradores pueden ver esta sección."),
+    "Bitácora": ("features.bitacora", "mostrar_bitacora", "journal-text",
+                 "⚠️ Acceso restringido a administradores."),
+    "Rendimiento": ("views.rendimiento", "mostrar_rendimiento", "speedometer2",
+                    "⚠️ Acceso restringido a administradores."),
+}
+
+# Pantallas que solo leen: sus consultas pueden ir a la réplica (core/db.solo_lectura)
+SOLO_LECTURA = {"Reportes", "Gráficos", "Vistas", "Bitácora"}
+
+
+def cargar(modulo, funcion):
+    """Importa `modulo` (solo la primera vez, luego sale de sys.modules) y devuelve `funcion`."""
+    return getattr(importlib.import_module(modulo), funcion)
+
 
 # 📌 CONFIGURACIÓN DE PÁGINA
 st.set_page_config(page_title="Sistema de Gestión Futbolística", layout="wide", page_icon="⚽")
 
-# 📌 CARGA CSS
-css_file = css_path("styles.css")
-if css_file.exists():
-    st.markdown(f"<style>{css_file.read_text(encoding='utf-8', errors='ignore')}</style>", unsafe_allow_html=True)
+# 📌 CARGA CSS (se lee del disco una sola vez por proceso)
+@st.cache_resource(show_spinner=False)
+def leer_css():
+    css_file = css_path("styles.css")
+    return css_file.read_text(encoding="utf-8", errors="ignore") if css_file.exists() else None
+
+css = leer_css()
+if css is not None:
+    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 else:
     st.warning("No se encontró assets/css/styles.css")
 
-# 📌 FUNCIÓN PARA CARGAR LOTTIE
-def load_lottiefile(path):
-    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
-
-LOTTIE_BIENVENIDA = load_lottiefile(anim_path("lottie_futbol.json"))
-
 # 📌 FUNCIÓN PRINCIPAL
 def main():
     # Estado inicial de sesión
@@ -58,18 +75,19 @@ def main():
     if not st.session_state["logueado"]:
         if st.session_state["registro_ok"]:
             st.session_state["registro_ok"] = False
-            login()
+            cargar("auth.auth", "login")()
         elif st.session_state["ir_a_registro"]:
-            register()
+            cargar("auth.register", "register")()
         else:
-            login()
+            cargar("auth.auth", "login")()
         return
 
     # Bienvenida
     col1, col2 = st.columns([1, 3])
     with col1:
-        if LOTTIE_BIENVENIDA:
-            st_lottie(LOTTIE_BIENVENIDA, height=180, key="bienvenida")
+        lottie_bienvenida = cargar_animacion("bienvenida")
+        if lottie_bienvenida:
+            st_lottie(lottie_bienvenida, height=180, key="bienvenida")
         else:
             st.info("🟢 Bienvenido/a")
 
@@ -82,46 +100,44 @@ def main():
         """, unsafe_allow_html=True)
 
     # Menú lateral
+    opciones = ["Inicio"] + list(RUTAS) + ["Cerrar sesión"]
+    ir_a = st.session_state.pop("ir_a", None)   # lo deja un resultado de la búsqueda global
     with st.sidebar:
         menu = option_menu(
             "Menú principal",
-            ["Inicio", "Jugadores", "Equipos", "Partidos", "Estadísticas",
-             "Entrenadores", "Sanciones", "Asistencias", "Reportes", "Vistas",
-             "Gráficos", "Usuarios", "Bitácora", "Cerrar sesión"],
-            icons=["house", "person-lines-fill", "building", "calendar2-event", "bar-chart-line",
-                   "person-video2", "exclamation-circle", "ticket-perforated", "clipboard-data", "eye",
-                   "graph-up", "people", "journal-text", "box-arrow-right"],
-            default_index=0
+            opciones,
+            icons=["house"] + [ruta[2] for ruta in RUTAS.values()] + ["box-arrow-right"],
+            default_index=0,
+            manual_select=opciones.index(ir_a) if ir_a in opciones else None,
+            key="menu_principal",
         )
 
+        # 🔎 Búsqueda global (el servicio se importa recién cuando hay algo que buscar)
+        texto = st.text_input("🔎 Búsqueda global", key="busqueda_global",
+                              placeholder="Jugador, equipo, DT, torneo o fecha")
+        if texto.strip():
+            cargar("views.componentes", "resultados_busqueda")(texto)
+
     # Lógica de navegación
     if menu == "Inicio":
         st.success("Selecciona una opción en el menú lateral para comenzar.")
-    elif menu == "Jugadores": crud_jugadores()
-    elif menu == "Equipos": crud_equipos()
-    elif menu == "Partidos": crud_partidos()
-    elif menu == "Estadísticas": crud_estadisticas()
-    elif menu == "Entrenadores": mostrar_pantalla_entrenadores()
-    elif menu == "Sanciones": mostrar_pantalla_sanciones()
-    elif menu == "Asistencias": mostrar_pantalla_asistencias()
-    elif menu == "Reportes": reportes()
-    elif menu == "Vistas": mostrar_vistas()
-    elif menu == "Gráficos": graficos()
-    elif menu == "Usuarios":
-        if st.session_state["rol"] == "admin":
-            gestion_usuarios()
-        else:
-            st.warning("⚠️ Solo los administradores pueden ver esta sección.")
-    elif menu == "Bitácora":
-        if st.session_state["rol"] == "admin":
-            mostrar_bitacora()
-        else:
-            st.warning("⚠️ Acceso restringido a administradores.")
     elif menu == "Cerrar sesión":
         usuario = st.session_state.get("usuario", "desconocido")
-        registrar_salida(usuario)
+        cargar("features.utils", "registrar_salida")(usuario)
         st.session_state.clear()
         st.rerun()
+    else:
+        modulo, funcion, _, aviso_no_admin = RUTAS[menu]
+        if aviso_no_admin and st.session_state["rol"] != "admin":
+            st.warning(aviso_no_admin)
+        else:
+            # Las sentencias de esta ejecución quedan a nombre de la pantalla (panel de
+            # Rendimiento) y todo lo que hace queda en una traza (core/trazas.py)
+            sesion = st.session_state.setdefault("id_sesion", uuid.uuid4().hex[:8])
+            with en_pantalla(menu), solo_lectura(menu in SOLO_LECTURA), tramo("pantalla", raiz=True, pantalla=menu, sesion=sesion):
+                with tramo("importar", modulo=modulo):
+                    pantalla = cargar(modulo, funcion)
+                pantalla()
 
 # 📌 EJECUCIÓN
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+-- ================================
+-- 🔹 MIGRACIÓN 001: Bitácora particionada por mes
+-- ================================
+-- La tabla bitacora pasa a estar particionada por rango de hora_ingreso (un mes
+-- por partición), con una partición DEFAULT para que ninguna escritura falle.
+-- Las particiones de meses futuros las crea crear_particiones_bitacora(), que la
+-- app llama al arrancar el escritor de bitácora. Los meses antiguos se archivan
+-- con: python -m core.archivo_bitacora archivar
+
+ALTER TABLE bitacora RENAME TO bitacora_heap;
+ALTER TABLE bitacora_heap RENAME CONSTRAINT bitacora_pkey TO bitacora_heap_pkey;
+
+CREATE TABLE bitacora (
+    id_bitacora INT NOT NULL DEFAULT nextval('bitacora_id_bitacora_seq'),
+    usuario VARCHAR(50),
+    hora_ingreso TIMESTAMP NOT NULL DEFAULT now(),
+    hora_salida TIMESTAMP,
+    navegador VARCHAR(100),
+    ip VARCHAR(50),
+    nombre_maquina VARCHAR(100),
+    tabla_afectada VARCHAR(50),
+    tipo_accion VARCHAR(20),
+    descripcion TEXT,
+    PRIMARY KEY (id_bitacora, hora_ingreso)
+) PARTITION BY RANGE (hora_ingreso);
+
+ALTER SEQUENCE bitacora_id_bitacora_seq OWNED BY bitacora.id_bitacora;
+
+CREATE TABLE bitacora_default PARTITION OF bitacora DEFAULT;
+
+-- Índices (se propagan a cada partición)
+CREATE INDEX idx_bitacora_usuario_hora ON bitacora (usuario, hora_ingreso);
+CREATE INDEX idx_bitacora_tabla_accion ON bitacora (tabla_afectada, tipo_accion);
+CREATE INDEX idx_bitacora_hora_id ON bitacora (hora_ingreso DESC, id_bitacora DESC);
+
+-- Crea las particiones mensuales que falten desde `desde` hasta `meses_adelante`
+-- meses después del actual. Si la partición DEFAULT tiene filas de ese mes, las mueve.
+CREATE OR REPLACE FUNCTION crear_particiones_bitacora(meses_adelante INT DEFAULT 3, desde DATE DEFAULT NULL)
+RETURNS INT AS $$
+DECLARE
+    mes DATE := date_trunc('month', COALESCE(desde, now()))::date;
+    ultimo DATE := (date_trunc('month', now()) + make_interval(months => meses_adelante))::date;
+    siguiente DATE;
+    nombre TEXT;
+    creadas INT := 0;
+BEGIN
+    WHILE mes <= ultimo LOOP
+        siguiente := (mes + INTERVAL '1 month')::date;
+        nombre := format('bitacora_%s', to_char(mes, 'YYYY_MM'));
+        IF to_regclass(nombre) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE bitacora INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', nombre);
+            EXECUTE format(
+                'WITH movidas AS (DELETE FROM bitacora_default WHERE hora_ingreso >= %L AND hora_ingreso < %L RETURNING *)
+                 INSERT INTO %I SELECT * FROM movidas', mes, siguiente, nombre);
+            EXECUTE format('ALTER TABLE bitacora ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', nombre, mes, siguiente);
+            creadas := creadas + 1;
+        END IF;
+        mes := siguiente;
+    END LOOP;
+    RETURN creadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Particiones para los datos existentes y los próximos meses, luego se copian las filas
+SELECT crear_particiones_bitacora(3, (SELECT MIN(hora_ingreso)::date FROM bitacora_heap));
+
+INSERT INTO bitacora (id_bitacora, usuario, hora_ingreso, hora_salida, navegador, ip,
+                      nombre_maquina, tabla_afectada, tipo_accion, descripcion)
+SELECT id_bitacora, usuario, COALESCE(hora_ingreso, hora_salida, now()), hora_salida, navegador, ip,
+       nombre_maquina, tabla_afectada, tipo_accion, descripcion
+FROM bitacora_heap;
+
+DROP TABLE bitacora_heap;
+
+-- Mismos permisos que tenía la tabla original
+REVOKE ALL ON bitacora FROM PUBLIC;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'rol_admin') THEN
+        GRANT ALL ON bitacora TO rol_admin;
+    END IF;
+END;
+$$;
@@ -0,0 +1,183 @@
+-- 📊 Totales por jugador mantenidos de forma incremental
+-- vista_estadisticas_jugadores, el top de goleadores y los reportes dejan de
+-- re-agregar toda la tabla estadisticas: leen una fila por jugador de
+-- totales_jugadores, que los triggers de estadisticas mantienen sumando deltas.
+-- partidos_jugados cuenta las filas de estadisticas del jugador (una por partido).
+-- Verificación/reconstrucción: python -m core.totales_jugadores
+
+-- Que nadie escriba en estadisticas mientras se carga el estado inicial
+LOCK TABLE estadisticas IN SHARE ROW EXCLUSIVE MODE;
+
+CREATE TABLE totales_jugadores (
+    id_jugador INT PRIMARY KEY REFERENCES jugadores(id_jugador) ON DELETE CASCADE,
+    goles BIGINT NOT NULL DEFAULT 0,
+    asistencias BIGINT NOT NULL DEFAULT 0,
+    minutos BIGINT NOT NULL DEFAULT 0,
+    partidos_jugados BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX idx_totales_jugadores_goles ON totales_jugadores (goles DESC);
+
+-- Suma los deltas de una sentencia completa (tablas de transición), así un
+-- INSERT masivo o un COPY hace una sola pasada sobre totales_jugadores.
+-- Los jugadores que ya no existen (borrado en cascada) se ignoran.
+CREATE OR REPLACE FUNCTION actualizar_totales_jugadores()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO totales_jugadores AS t (id_jugador, goles, asistencias, minutos, partidos_jugados)
+        SELECT n.id_jugador, SUM(COALESCE(n.goles, 0)), SUM(COALESCE(n.asistencias, 0)),
+               SUM(COALESCE(n.minutos_jugados, 0)), COUNT(*)
+        FROM nuevas n
+        JOIN jugadores j ON j.id_jugador = n.id_jugador
+        GROUP BY n.id_jugador
+        ON CONFLICT (id_jugador) DO UPDATE SET
+            goles = t.goles + EXCLUDED.goles,
+            asistencias = t.asistencias + EXCLUDED.asistencias,
+            minutos = t.minutos + EXCLUDED.minutos,
+            partidos_jugados = t.partidos_jugados + EXCLUDED.partidos_jugados;
+
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO totales_jugadores AS t (id_jugador, goles, asistencias, minutos, partidos_jugados)
+        SELECT d.id_jugador, SUM(d.goles), SUM(d.asistencias), SUM(d.minutos), SUM(d.partidos)
+        FROM (
+            SELECT id_jugador, COALESCE(goles, 0) AS goles, COALESCE(asistencias, 0) AS asistencias,
+                   COALESCE(minutos_jugados, 0) AS minutos, 1 AS partidos
+            FROM nuevas
+            UNION ALL
+            SELECT id_jugador, -COALESCE(goles, 0), -COALESCE(asistencias, 0),
+                   -COALESCE(minutos_jugados, 0), -1
+            FROM viejas
+        ) d
+        JOIN jugadores j ON j.id_jugador = d.id_jugador
+        GROUP BY d.id_jugador
+        ON CONFLICT (id_jugador) DO UPDATE SET
+            goles = t.goles + EXCLUDED.goles,
+            asistencias = t.asistencias + EXCLUDED.asistencias,
+            minutos = t.minutos + EXCLUDED.minutos,
+            partidos_jugados = t.partidos_jugados + EXCLUDED.partidos_jugados;
+
+        DELETE FROM totales_jugadores t
+        USING (SELECT DISTINCT id_jugador FROM viejas) v
+        WHERE t.id_jugador = v.id_jugador AND t.partidos_jugados <= 0;
+
+    ELSE
+        UPDATE totales_jugadores t SET
+            goles = t.goles - d.goles,
+            asistencias = t.asistencias - d.asistencias,
+            minutos = t.minutos - d.minutos,
+            partidos_jugados = t.partidos_jugados - d.partidos
+        FROM (
+            SELECT id_jugador, SUM(COALESCE(goles, 0)) AS goles, SUM(COALESCE(asistencias, 0)) AS asistencias,
+                   SUM(COALESCE(minutos_jugados, 0)) AS minutos, COUNT(*) AS partidos
+            FROM viejas
+            GROUP BY id_jugador
+        ) d
+        WHERE t.id_jugador = d.id_jugador;
+
+        DELETE FROM totales_jugadores t
+        USING (SELECT DISTINCT id_jugador FROM viejas) v
+        WHERE t.id_jugador = v.id_jugador AND t.partidos_jugados <= 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Las tablas de transición exigen un trigger por evento
+CREATE TRIGGER trigger_totales_insert
+AFTER INSERT ON estadisticas
+REFERENCING NEW TABLE AS nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION actualizar_totales_jugadores();
+
+CREATE TRIGGER trigger_totales_update
+AFTER UPDATE ON estadisticas
+REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas
+FOR EACH STATEMENT EXECUTE FUNCTION actualizar_totales_jugadores();
+
+CREATE TRIGGER trigger_totales_delete
+AFTER DELETE ON estadisticas
+REFERENCING OLD TABLE AS viejas
+FOR EACH STATEMENT EXECUTE FUNCTION actualizar_totales_jugadores();
+
+-- Compara totales_jugadores con la agregación real de estadisticas.
+-- Devuelve las filas con diferencias; con corregir = true reconstruye la tabla.
+CREATE OR REPLACE FUNCTION reconciliar_totales_jugadores(corregir BOOLEAN DEFAULT false)
+RETURNS TABLE (
+    id_jugador INT,
+    goles_tabla BIGINT, goles_real BIGINT,
+    asistencias_tabla BIGINT, asistencias_real BIGINT,
+    minutos_tabla BIGINT, minutos_real BIGINT,
+    partidos_tabla BIGINT, partidos_real BIGINT
+) AS $$
+BEGIN
+    IF corregir THEN
+        LOCK TABLE estadisticas IN SHARE ROW EXCLUSIVE MODE;
+    END IF;
+
+    CREATE TEMP TABLE IF NOT EXISTS _totales_reales ON COMMIT DROP AS
+    SELECT e.id_jugador,
+           SUM(COALESCE(e.goles, 0))::BIGINT AS goles,
+           SUM(COALESCE(e.asistencias, 0))::BIGINT AS asistencias,
+           SUM(COALESCE(e.minutos_jugados, 0))::BIGINT AS minutos,
+           COUNT(*)::BIGINT AS partidos_jugados
+    FROM estadisticas e
+    JOIN jugadores j ON j.id_jugador = e.id_jugador
+    GROUP BY e.id_jugador;
+
+    RETURN QUERY
+    SELECT COALESCE(t.id_jugador, r.id_jugador),
+           t.goles, r.goles, t.asistencias, r.asistencias,
+           t.minutos, r.minutos, t.partidos_jugados, r.partidos_jugados
+    FROM totales_jugadores t
+    FULL JOIN _totales_reales r ON r.id_jugador = t.id_jugador
+    WHERE (t.goles, t.asistencias, t.minutos, t.partidos_jugados)
+          IS DISTINCT FROM (r.goles, r.asistencias, r.minutos, r.partidos_jugados)
+    ORDER BY 1;
+
+    IF corregir THEN
+        DELETE FROM totales_jugadores;
+        INSERT INTO totales_jugadores (id_jugador, goles, asistencias, minutos, partidos_jugados)
+        SELECT r.id_jugador, r.goles, r.asistencias, r.minutos, r.partidos_jugados FROM _totales_reales r;
+    END IF;
+
+    DROP TABLE _totales_reales;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Estado inicial
+INSERT INTO totales_jugadores (id_jugador, goles, asistencias, minutos, partidos_jugados)
+SELECT e.id_jugador, SUM(COALESCE(e.goles, 0)), SUM(COALESCE(e.asistencias, 0)),
+       SUM(COALESCE(e.minutos_jugados, 0)), COUNT(*)
+FROM estadisticas e
+JOIN jugadores j ON j.id_jugador = e.id_jugador
+GROUP BY e.id_jugador;
+
+-- La vista conserva sus columnas y ahora lee una fila por jugador
+CREATE OR REPLACE VIEW vista_estadisticas_jugadores AS
+SELECT
+    j.id_jugador,
+    j.nombre AS jugador,
+    e.nombre_equipo AS equipo,
+    t.goles AS total_goles,
+    t.asistencias AS total_asistencias,
+    t.minutos AS total_minutos,
+    t.partidos_jugados
+FROM jugadores j
+LEFT JOIN equipos e ON j.id_equipo = e.id_equipo
+LEFT JOIN totales_jugadores t ON t.id_jugador = j.id_jugador
+ORDER BY total_goles DESC;
+
+-- Quien puede escribir en estadisticas también mantiene los totales (vía trigger)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'rol_admin') THEN
+        GRANT ALL ON totales_jugadores TO rol_admin;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'rol_usuario') THEN
+        GRANT SELECT, INSERT, UPDATE, DELETE ON totales_jugadores TO rol_usuario;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'rol_invitado') THEN
+        GRANT SELECT ON totales_jugadores TO rol_invitado;
+    END IF;
+END;
+$$;
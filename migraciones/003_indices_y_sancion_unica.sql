@@ -0,0 +1,45 @@
+-- 🗂️ Índices de claves foráneas y sanción única por restricción
+-- Ninguna clave foránea de tablas.sql tenía índice: cada JOIN por equipo, partido o
+-- jugador y cada borrado en cascada recorría la tabla hija completa.
+-- Además trg_sancion_duplicada hacía un EXISTS sin índice por cada sanción insertada
+-- (y dos inserciones simultáneas podían pasar las dos); una restricción UNIQUE hace
+-- lo mismo con un índice y sin carreras.
+-- Auditoría de planes: python -m herramientas.auditar_planes
+
+CREATE INDEX IF NOT EXISTS idx_jugadores_equipo ON jugadores (id_equipo);
+CREATE INDEX IF NOT EXISTS idx_entrenadores_equipo ON entrenadores (id_equipo);
+
+CREATE INDEX IF NOT EXISTS idx_partidos_local ON partidos (equipo_local);
+CREATE INDEX IF NOT EXISTS idx_partidos_visitante ON partidos (equipo_visitante);
+CREATE INDEX IF NOT EXISTS idx_partidos_torneo ON partidos (id_torneo);
+-- Orden de las grillas de partidos, estadísticas y sanciones (más recientes primero)
+CREATE INDEX IF NOT EXISTS idx_partidos_fecha ON partidos (fecha DESC, id_partido DESC);
+
+CREATE INDEX IF NOT EXISTS idx_estadisticas_jugador ON estadisticas (id_jugador);
+CREATE INDEX IF NOT EXISTS idx_estadisticas_partido ON estadisticas (id_partido);
+
+-- id_jugador queda cubierto por la restricción única de abajo
+CREATE INDEX IF NOT EXISTS idx_sanciones_partido ON sanciones (id_partido);
+
+CREATE INDEX IF NOT EXISTS idx_asistencias_partido ON asistencias_partido (id_partido);
+
+-- 🟥 Una sanción de cada tipo por jugador y partido
+DO $$
+DECLARE
+    repetidas INT;
+BEGIN
+    SELECT COUNT(*) INTO repetidas FROM (
+        SELECT 1 FROM sanciones GROUP BY id_jugador, id_partido, tipo HAVING COUNT(*) > 1
+    ) r;
+    IF repetidas > 0 THEN
+        RAISE EXCEPTION 'Hay % combinaciones (jugador, partido, tipo) repetidas en sanciones: corregirlas antes de migrar', repetidas;
+    END IF;
+END $$;
+
+ALTER TABLE sanciones
+    ADD CONSTRAINT sanciones_jugador_partido_tipo_key UNIQUE (id_jugador, id_partido, tipo);
+
+DROP TRIGGER IF EXISTS trg_sancion_duplicada ON sanciones;
+DROP FUNCTION IF EXISTS evitar_sancion_duplicada();
+
+ANALYZE jugadores, entrenadores, partidos, estadisticas, sanciones, asistencias_partido;
@@ -0,0 +1,42 @@
+-- 📝 Bitácora resumida para cargas masivas
+-- registrar_bitacora() escribe una fila de bitácora por cada fila tocada. Una
+-- importación de cientos de estadísticas llenaría la bitácora de "Nuevo registro
+-- insertado." idénticos, así que la transacción que carga puede pedir que se omitan
+--     SET LOCAL futbol.bitacora_resumida = 'on';
+-- y escribir ella misma una sola entrada con el resumen (core/importacion.py).
+-- Fuera de esa transacción el comportamiento es el de siempre.
+
+CREATE OR REPLACE FUNCTION registrar_bitacora()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('futbol.bitacora_resumida', true) = 'on' THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO bitacora (
+        usuario,
+        hora_ingreso,
+        navegador,
+        ip,
+        nombre_maquina,
+        tabla_afectada,
+        tipo_accion,
+        descripcion
+    ) VALUES (
+        current_user,
+        current_timestamp,
+        'Desconocido',  -- Esto se puede llenar desde el frontend
+        inet_client_addr(),
+        inet_client_hostname(),
+        TG_TABLE_NAME,
+        TG_OP,
+        CASE
+            WHEN TG_OP = 'INSERT' THEN 'Nuevo registro insertado.'
+            WHEN TG_OP = 'UPDATE' THEN 'Registro actualizado.'
+            WHEN TG_OP = 'DELETE' THEN 'Registro eliminado.'
+            ELSE 'Acción desconocida.'
+        END
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
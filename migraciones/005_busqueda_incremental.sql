@@ -0,0 +1,22 @@
+-- 🔎 Índices para los buscadores de jugadores y partidos de los formularios
+-- Los selectores buscan mientras se escribe y piden una página corta (LIMIT).
+-- Por prefijo del nombre: lower(nombre) con intercalación "C" sirve tanto para
+-- `LIKE 'abc%'` como para ordenar por nombre, así que cada tecla lee unas pocas
+-- filas del índice en vez de la tabla.
+-- Por cualquier parte del nombre (ILIKE '%abc%'): índice de trigramas de pg_trgm,
+-- solo si la extensión está disponible en el servidor; sin ella el buscador
+-- compara por prefijo (core/catalogo.py lo detecta).
+
+CREATE INDEX IF NOT EXISTS idx_jugadores_nombre_prefijo ON jugadores ((lower(nombre) COLLATE "C"));
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        EXECUTE 'CREATE INDEX IF NOT EXISTS idx_jugadores_nombre_trgm ON jugadores USING gin (nombre gin_trgm_ops)';
+    ELSE
+        RAISE NOTICE 'pg_trgm no está disponible: la búsqueda de jugadores será solo por prefijo';
+    END IF;
+END $$;
+
+ANALYZE jugadores;
@@ -0,0 +1,49 @@
+-- 🔎 Búsqueda global sin acentos y con tolerancia a errores de tipeo
+-- normalizar_busqueda(texto) pasa a minúsculas y quita los acentos, para que
+-- "macara" encuentre "Macará" y "MUSHUC" encuentre "Mushuc Runa". Usa unaccent
+-- si el servidor la tiene; si no, un translate() con las letras acentuadas del
+-- español, que da el mismo resultado para nombres de jugadores y equipos.
+-- Con pg_trgm se indexan los nombres normalizados con trigramas: sirven para
+-- ILIKE '%texto%' y para el operador de similitud % (errores de tipeo), que es lo
+-- que usa core/busqueda.py. Sin pg_trgm la búsqueda es por coincidencia parcial.
+-- La función y el diccionario de unaccent van calificados con su esquema:
+-- pg_dump/pg_restore y autovacuum evalúan los índices con un search_path
+-- restringido y sin esquema no los encontrarían.
+
+DO $$
+DECLARE
+    esquema TEXT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'unaccent') THEN
+        CREATE EXTENSION IF NOT EXISTS unaccent;
+        SELECT quote_ident(n.nspname) INTO esquema
+        FROM pg_extension x JOIN pg_namespace n ON n.oid = x.extnamespace
+        WHERE x.extname = 'unaccent';
+        -- unaccent() es STABLE; con el diccionario explícito se puede declarar IMMUTABLE e indexar
+        EXECUTE format($f$
+            CREATE OR REPLACE FUNCTION normalizar_busqueda(texto TEXT) RETURNS TEXT AS $b$
+                SELECT pg_catalog.lower(%1$s.unaccent('%1$s.unaccent'::regdictionary, texto))
+            $b$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        $f$, esquema);
+    ELSE
+        RAISE NOTICE 'unaccent no está disponible: normalizar_busqueda usa translate()';
+        EXECUTE $f$
+            CREATE OR REPLACE FUNCTION normalizar_busqueda(texto TEXT) RETURNS TEXT AS $b$
+                SELECT pg_catalog.lower(pg_catalog.translate(texto, 'ÁÀÄÂÉÈËÊÍÌÏÎÓÒÖÔÚÙÜÛÑÇáàäâéèëêíìïîóòöôúùüûñç',
+                                                                  'AAAAEEEEIIIIOOOOUUUUNCaaaaeeeeiiiioooouuuunc'))
+            $b$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        $f$;
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        EXECUTE 'CREATE INDEX IF NOT EXISTS idx_busqueda_jugadores ON jugadores USING gin (normalizar_busqueda(nombre) gin_trgm_ops)';
+        EXECUTE 'CREATE INDEX IF NOT EXISTS idx_busqueda_equipos ON equipos USING gin (normalizar_busqueda(nombre_equipo) gin_trgm_ops)';
+        EXECUTE 'CREATE INDEX IF NOT EXISTS idx_busqueda_entrenadores ON entrenadores USING gin (normalizar_busqueda(nombre) gin_trgm_ops)';
+        EXECUTE 'CREATE INDEX IF NOT EXISTS idx_busqueda_torneos ON torneos USING gin (normalizar_busqueda(nombre) gin_trgm_ops)';
+    ELSE
+        RAISE NOTICE 'pg_trgm no está disponible: la búsqueda global no tolerará errores de tipeo';
+    END IF;
+END $$;
+
+ANALYZE jugadores, equipos, entrenadores, torneos;
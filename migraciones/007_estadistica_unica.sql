@@ -0,0 +1,37 @@
+-- 📊 Una estadística por jugador y partido
+-- Nada impedía cargar dos filas del mismo jugador en el mismo partido (el
+-- formulario "Agregar", la planilla y la importación podían insertar a la vez),
+-- y los reportes, exportaciones y totales_jugadores las sumaban. Las repetidas
+-- se funden en la de menor id_estadistica sumando sus valores, así los totales
+-- no cambian, y una restricción UNIQUE permite guardar con
+-- INSERT ... ON CONFLICT (id_jugador, id_partido) DO UPDATE sin carreras.
+
+LOCK TABLE estadisticas IN SHARE ROW EXCLUSIVE MODE;
+
+-- La fusión no deja una entrada de bitácora por cada fila tocada (migraciones/004)
+SET LOCAL futbol.bitacora_resumida = 'on';
+
+WITH repetidas AS (
+    SELECT id_jugador, id_partido, MIN(id_estadistica) AS conservar,
+           SUM(goles) AS goles, SUM(asistencias) AS asistencias, SUM(minutos_jugados) AS minutos
+    FROM estadisticas
+    GROUP BY id_jugador, id_partido
+    HAVING COUNT(*) > 1
+),
+borradas AS (
+    DELETE FROM estadisticas e
+    USING repetidas r
+    WHERE e.id_jugador = r.id_jugador AND e.id_partido = r.id_partido AND e.id_estadistica <> r.conservar
+)
+UPDATE estadisticas e
+SET goles = r.goles, asistencias = r.asistencias, minutos_jugados = r.minutos
+FROM repetidas r
+WHERE e.id_estadistica = r.conservar;
+
+ALTER TABLE estadisticas
+    ADD CONSTRAINT estadisticas_jugador_partido_key UNIQUE (id_jugador, id_partido);
+
+-- id_jugador queda cubierto por la restricción única
+DROP INDEX IF EXISTS idx_estadisticas_jugador;
+
+ANALYZE estadisticas;
@@ -29,7 +29,7 @@ CREATE TABLE partidos (
     marcador_visitante INT DEFAULT 0
 );
 
--- Tabla: estadisticas
+-- Tabla: estadisticas (migraciones/007_estadistica_unica.sql agrega UNIQUE (id_jugador, id_partido))
 CREATE TABLE estadisticas (
     id_estadistica SERIAL PRIMARY KEY,
     id_jugador INT REFERENCES jugadores(id_jugador) ON DELETE CASCADE,
@@ -47,7 +47,7 @@ CREATE TABLE usuarios (
     rol VARCHAR(20) CHECK (rol IN ('admin', 'usuario', 'invitado')) NOT NULL
 );
 
--- Tabla: bitacora
+-- Tabla: bitacora (se particiona por mes con migraciones/001_bitacora_particionada.sql)
 CREATE TABLE bitacora (
     id_bitacora SERIAL PRIMARY KEY,
     usuario VARCHAR(50),
@@ -713,6 +713,8 @@ EXECUTE FUNCTION log_update_marcador();
 -- ================================
 -- 🔹 TRIGGER 4: Evitar sanciones duplicadas en el mismo partido
 -- ================================
+-- (migraciones/003_indices_y_sancion_unica.sql lo reemplaza por una restricción UNIQUE
+--  y agrega los índices de las claves foráneas)
 
 -- Función que verifica si ya existe una sanción similar
 CREATE OR REPLACE FUNCTION evitar_sancion_duplicada()
@@ -767,7 +769,7 @@ VALUES ('Jugador Prohibido', 10, 'Ecuador', 'Delantero', 1);
 
 
 
--- VISTA 1: vista_estadisticas_jugadores
+-- VISTA 1: vista_estadisticas_jugadores (migraciones/002_totales_jugadores.sql la pasa a leer de totales_jugadores)
 
 -- Esta vista muestra un resumen del rendimiento de cada jugador:
 -- incluye su equipo, total de goles, asistencias y minutos jugados.
@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+
+from features.bitacora import construir_filtros, valores_distintos
+
+
+# 🔁 WHERE parametrizado de la Bitácora
+def test_filtros_solo_fechas():
+    where, params = construir_filtros(None, None, None, date(2025, 8, 1), date(2025, 8, 31))
+    assert where == "hora_ingreso >= %s AND hora_ingreso < %s"
+    # la fecha final es inclusiva: se compara contra el día siguiente
+    assert params == [date(2025, 8, 1), date(2025, 9, 1)]
+
+
+def test_filtros_con_todas_las_columnas():
+    where, params = construir_filtros("admin", "jugadores", "UPDATE", date(2025, 1, 1), date(2025, 1, 1))
+    assert where == ("hora_ingreso >= %s AND hora_ingreso < %s AND usuario = %s "
+                     "AND tabla_afectada = %s AND tipo_accion = %s")
+    assert params == [date(2025, 1, 1), date(2025, 1, 2), "admin", "jugadores", "UPDATE"]
+
+
+def test_filtros_los_valores_van_como_parametros():
+    where, params = construir_filtros("x' OR '1'='1", None, None, date(2025, 1, 1), date(2025, 1, 2))
+    assert "'" not in where
+    assert params[-1] == "x' OR '1'='1"
+    assert where.count("%s") == len(params)
+
+
+def test_valores_distintos_rechaza_columnas_fuera_de_la_lista():
+    with pytest.raises(ValueError):
+        valores_distintos("descripcion")
@@ -0,0 +1,57 @@
+from core import cache
+from core.cache import CacheConsultas, DEPENDENCIAS
+
+
+def _llenar(c, sql, tablas):
+    c.obtener(sql, None, tablas, lambda: (["n"], [(1,)]))
+
+
+def _ejecuciones(c, sql, tablas):
+    llamadas = []
+    c.obtener(sql, None, tablas, lambda: llamadas.append(1) or (["n"], [(1,)]))
+    return len(llamadas)
+
+
+# 🔗 Cascada de DEPENDENCIAS en invalidar()
+def test_invalidar_sigue_las_dependencias_transitivas():
+    afectadas = CacheConsultas().invalidar("torneos")
+    # torneos -> partidos -> estadísticas -> totales_jugadores
+    assert afectadas == {"torneos", "partidos", "bitacora", "estadisticas", "sanciones",
+                         "asistencias_partido", "totales_jugadores"}
+
+
+def test_invalidar_tabla_sin_dependencias():
+    assert CacheConsultas().invalidar("entrenadores") == {"entrenadores"}
+
+
+def test_dependencias_cubren_cada_tabla_una_sola_vez():
+    afectadas = CacheConsultas().invalidar(*DEPENDENCIAS)
+    esperadas = set(DEPENDENCIAS).union(*DEPENDENCIAS.values())
+    assert afectadas == esperadas
+
+
+def test_invalidar_quita_solo_las_entradas_afectadas():
+    c = CacheConsultas()
+    _llenar(c, "equipos", ("equipos",))
+    _llenar(c, "totales", ("totales_jugadores",))
+    _llenar(c, "torneos", ("torneos",))
+
+    c.invalidar("estadisticas")
+
+    assert _ejecuciones(c, "totales", ("totales_jugadores",)) == 1
+    assert _ejecuciones(c, "equipos", ("equipos",)) == 0
+    assert _ejecuciones(c, "torneos", ("torneos",)) == 0
+
+
+def test_invalidar_sube_la_version_de_las_dependientes():
+    c = CacheConsultas()
+    antes = c.version(("jugadores", "estadisticas", "torneos"))
+    c.invalidar("jugadores")
+    assert c.version(("jugadores", "estadisticas", "torneos")) == (
+        ("estadisticas", 1), ("jugadores", 1), ("torneos", 0))
+    assert antes == (("estadisticas", 0), ("jugadores", 0), ("torneos", 0))
+
+
+def test_las_vistas_se_versionan_por_sus_tablas():
+    assert cache._tablas_base(("vista_partidos_completos", "sanciones")) == [
+        "partidos", "equipos", "torneos", "sanciones"]
@@ -0,0 +1,29 @@
+from views.componentes import _condicion_keyset
+
+
+# 📄 Condición keyset de grilla_paginada
+def test_keyset_ascendente_usa_comparacion_de_filas():
+    condicion, params = _condicion_keyset([("id_jugador", "ASC")], (8,))
+    assert condicion == "(t.id_jugador) > (%s)"
+    assert params == [8]
+
+
+def test_keyset_misma_direccion_compuesta():
+    condicion, params = _condicion_keyset([("fecha", "desc"), ("id_partido", "DESC")], ("2025-08-01", 40))
+    assert condicion == "(t.fecha, t.id_partido) < (%s, %s)"
+    assert params == ["2025-08-01", 40]
+
+
+def test_keyset_direcciones_mezcladas_se_expande_con_or():
+    condicion, params = _condicion_keyset([("fecha", "DESC"), ("id_partido", "ASC")], ("2025-08-01", 40))
+    assert condicion == "((t.fecha < %s) OR (t.fecha = %s AND t.id_partido > %s))"
+    assert params == ["2025-08-01", "2025-08-01", 40]
+
+
+def test_keyset_tres_columnas_mezcladas():
+    orden = [("a", "ASC"), ("b", "DESC"), ("c", "ASC")]
+    condicion, params = _condicion_keyset(orden, (1, 2, 3))
+    assert condicion == ("((t.a > %s) OR (t.a = %s AND t.b < %s) "
+                         "OR (t.a = %s AND t.b = %s AND t.c > %s))")
+    assert params == [1, 1, 2, 1, 2, 3]
+    assert condicion.count("%s") == len(params)
@@ -0,0 +1,56 @@
+from collections import Counter
+
+import pytest
+
+from herramientas.generar_datos import _FlujoCopy, _calendario
+
+
+# 📅 Calendario todos contra todos
+@pytest.mark.parametrize("n", [2, 5, 6, 20])
+def test_calendario_ida_y_vuelta(n):
+    jornadas = _calendario(range(1, n + 1))
+    assert len(jornadas) == 2 * (n - 1 if n % 2 == 0 else n)
+
+    cruces = Counter(cruce for jornada in jornadas for cruce in jornada)
+    # cada par se enfrenta dos veces, una de local cada uno
+    assert len(cruces) == n * (n - 1)
+    assert set(cruces.values()) == {1}
+
+
+@pytest.mark.parametrize("n", [5, 6])
+def test_calendario_un_partido_por_equipo_y_jornada(n):
+    for jornada in _calendario(range(n)):
+        equipos = [e for cruce in jornada for e in cruce]
+        assert len(equipos) == len(set(equipos))
+        assert len(jornada) == n // 2
+
+
+# 🌊 Flujo de COPY
+def _leer_todo(flujo, tamano):
+    partes = []
+    while True:
+        bloque = flujo.read(tamano)
+        if not bloque:
+            return "".join(partes)
+        assert len(bloque) <= tamano
+        partes.append(bloque)
+
+
+@pytest.mark.parametrize("tamano", [1, 7, 65536])
+def test_flujo_copy_entrega_todas_las_lineas_sin_cortes(tamano):
+    filas = [(i, f"Jugador {i}", None) for i in range(100)]
+    flujo = _FlujoCopy(filas)
+    texto = _leer_todo(flujo, tamano)
+    assert texto == "".join(f"{i}\tJugador {i}\t\\N\n" for i in range(100))
+    assert flujo.total == 100
+
+
+def test_flujo_copy_escapa_separadores():
+    flujo = _FlujoCopy([("a\tb", "línea\nnueva\r", "barra\\")])
+    assert flujo.read() == "a\\tb\tlínea\\nnueva\\r\tbarra\\\\\n"
+
+
+def test_flujo_copy_vacio():
+    flujo = _FlujoCopy([])
+    assert flujo.read() == ""
+    assert flujo.total == 0
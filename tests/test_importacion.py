@@ -0,0 +1,57 @@
+import pandas as pd
+
+from core.importacion import _entero, _resolver
+
+JUGADORES = pd.DataFrame({
+    "id_jugador": [1, 2, 3, 4],
+    "nombre": ["Lionel Messi", "Enner Valencia", "Moisés Caicedo", "Moisés Caicedo"],
+})
+
+
+def _lista(serie):
+    return [None if pd.isna(v) else v for v in serie]
+
+
+# 🔎 Jugador o partido por id o por texto
+def test_resolver_por_id_y_por_nombre_sin_mayusculas():
+    ids, errores = _resolver(pd.Series(["2", " lionel MESSI ", 3]), JUGADORES, "id_jugador", ["nombre"])
+    assert _lista(ids) == [2, 1, 3]
+    assert _lista(errores) == [None, None, None]
+
+
+def test_resolver_informa_repetidos_vacios_e_inexistentes():
+    ids, errores = _resolver(pd.Series(["moisés caicedo", "", None, "Pelé", "99"]),
+                             JUGADORES, "id_jugador", ["nombre"])
+    assert _lista(ids) == [None] * 5
+    assert _lista(errores) == ["coincide con varios, usa el id", "vacío", "vacío", "no existe", "no existe"]
+
+
+def test_resolver_prueba_las_columnas_clave_en_orden():
+    partidos = pd.DataFrame({
+        "id_partido": [10, 11, 12],
+        "fecha": ["2025-08-01", "2025-08-01", "2025-08-02"],
+        "descripcion": ["A vs B - 2025-08-01", "C vs D - 2025-08-01", "A vs C - 2025-08-02"],
+    })
+    ids, errores = _resolver(pd.Series(["2025-08-02", "c vs d - 2025-08-01", "2025-08-01"]),
+                             partidos, "id_partido", ["descripcion", "fecha"])
+    assert _lista(ids) == [12, 11, None]
+    assert _lista(errores) == [None, None, "coincide con varios, usa el id"]
+
+
+# 🔢 Enteros con mínimo, máximo y valor por defecto
+def test_entero_valida_rango_y_formato():
+    numeros, errores = _entero(pd.Series(["3", "2.0", "1.5", "x", "-1", "151"]), 0, 150)
+    assert _lista(numeros)[:2] == [3, 2]
+    assert _lista(errores) == [None, None, "no es un número entero", "no es un número entero",
+                               "menor que 0", "mayor que 150"]
+
+
+def test_entero_vacio_usa_el_valor_por_defecto():
+    numeros, errores = _entero(pd.Series(["", None, "4"]), 0, por_defecto=0)
+    assert _lista(numeros) == [0, 0, 4]
+    assert _lista(errores) == [None, None, None]
+
+
+def test_entero_vacio_sin_valor_por_defecto_es_error():
+    _, errores = _entero(pd.Series([""]), 1)
+    assert _lista(errores) == ["no es un número entero"]
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from views.rendimiento import COLUMNAS, percentiles
+
+
+def _sentencias(filas):
+    return pd.DataFrame(filas, columns=COLUMNAS)
+
+
+# ⏱️ Percentiles por pantalla o sentencia
+def test_percentiles_en_milisegundos_ordenados_por_total():
+    df = _sentencias(
+        [(0, "Jugadores", 1, "SELECT 1", s / 1000, 10) for s in range(1, 101)]
+        + [(0, "Equipos", 1, "SELECT 2", 1.0, 4), (0, "Equipos", 2, "SELECT 2", 3.0, 6)]
+    )
+    resumen = percentiles(df, "pantalla")
+
+    assert list(resumen["pantalla"]) == ["Jugadores", "Equipos"]
+    jugadores, equipos = resumen.iloc[0], resumen.iloc[1]
+    assert jugadores["veces"] == 100
+    assert jugadores["p50"] == pytest.approx(50.5)
+    assert jugadores["p95"] == pytest.approx(95.0, abs=0.1)
+    assert jugadores["p99"] == pytest.approx(99.0, abs=0.1)
+    assert jugadores["total_ms"] == pytest.approx(5050.0)
+    assert equipos["total_ms"] == pytest.approx(4000.0)
+    assert equipos["filas_prom"] == 5
+
+
+def test_percentiles_con_varias_claves():
+    df = _sentencias([(0, "Bitácora", 1, "SELECT a", 0.002, 1), (0, "Bitácora", 1, "SELECT b", 0.001, 1)])
+    resumen = percentiles(df, ["pantalla", "sentencia"])
+    assert list(resumen["sentencia"]) == ["SELECT a", "SELECT b"]
+    assert list(resumen["p50"]) == [2.0, 1.0]
@@ -0,0 +1,276 @@
+import json
+from functools import wraps
+import streamlit as st
+import pandas as pd
+from core.db import solo_lectura, en_solo_lectura, en_pantalla, pantalla_actual
+from core.trazas import tramo
+from core.cache import consultar_filas
+from core import catalogo
+from core.catalogo import escapar_like
+from core.exportacion import exportar_cacheado, FORMATOS
+
+# 🧩 Componentes compartidos por las pantallas de listados
+
+
+def fragmento(funcion):
+    """
+    Convierte `funcion` en un st.fragment: sus widgets (filtros, páginas) solo la
+    vuelven a ejecutar a ella, sin main.py ni el resto de la pantalla. Los argumentos
+    se guardan de la última ejecución completa, así que un DataFrame ya consultado se
+    reutiliza tal cual.
+    Al re-ejecutarse sola no hay pantalla abierta: recupera la pantalla y el modo
+    de solo lectura de la ejecución completa y abre su propia traza.
+    """
+    @st.fragment
+    @wraps(funcion)
+    def ejecutar(pantalla, lectura, *args, **kwargs):
+        if pantalla is None or pantalla_actual() is not None:
+            return funcion(*args, **kwargs)
+        sesion = st.session_state.get("id_sesion")
+        with en_pantalla(pantalla), solo_lectura(lectura), \
+                tramo("fragmento", raiz=True, pantalla=pantalla, sesion=sesion, tipo=funcion.__name__):
+            return funcion(*args, **kwargs)
+
+    @wraps(funcion)
+    def llamar(*args, **kwargs):
+        return ejecutar(pantalla_actual(), en_solo_lectura(), *args, **kwargs)
+    return llamar
+
+
+@fragmento
+def tabla_por_paginas(df, filas_por_pagina=10, etiqueta="📄 Página", key=None):
+    """Selector de página y la porción de `df` que le toca; cambiar de página solo redibuja esto."""
+    total_paginas = max((len(df) - 1) // filas_por_pagina + 1, 1)
+    pagina = st.number_input(etiqueta, min_value=1, max_value=total_paginas, step=1, key=key)
+    inicio = (pagina - 1) * filas_por_pagina
+    st.dataframe(df.iloc[inicio:inicio + filas_por_pagina], use_container_width=True)
+
+
+def _condicion_keyset(orden, cursor):
+    """
+    Construye la condición "fila posterior al cursor" para un ORDER BY compuesto.
+    Con todas las columnas en la misma dirección usa comparación de filas
+    (aprovecha un índice compuesto); si se mezclan direcciones la expande con OR.
+    """
+    columnas = [f"t.{col}" for col, _ in orden]
+    direcciones = {dir_.upper() for _, dir_ in orden}
+    if len(direcciones) == 1:
+        op = "<" if direcciones.pop() == "DESC" else ">"
+        marcadores = ", ".join(["%s"] * len(orden))
+        return f"({', '.join(columnas)}) {op} ({marcadores})", list(cursor)
+
+    partes, params = [], []
+    for i, (col, dir_) in enumerate(orden):
+        op = "<" if dir_.upper() == "DESC" else ">"
+        iguales = [f"{c} = %s" for c in columnas[:i]]
+        partes.append("(" + " AND ".join(iguales + [f"{columnas[i]} {op} %s"]) + ")")
+        params.extend(list(cursor[:i]) + [cursor[i]])
+    return "(" + " OR ".join(partes) + ")", params
+
+
+def estimar_total(conn, consulta, params=(), tablas=()):
+    """
+    Total aproximado de filas de una consulta usando la estimación del planificador
+    (EXPLAIN, sin ejecutarla). Si la estimación es pequeña se hace el COUNT exacto,
+    que en ese caso es barato.
+    Con `tablas` el resultado pasa por la caché de consultas.
+    Devuelve (total, es_estimado).
+    """
+    _, filas = consultar_filas(f"EXPLAIN (FORMAT JSON) {consulta}", params, tablas, conn)
+    plan = filas[0][0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimado = int(plan[0]["Plan"]["Plan Rows"])
+    if estimado > 5000:
+        return estimado, True
+
+    _, filas = consultar_filas(f"SELECT COUNT(*) FROM ({consulta}) AS c", params, tablas, conn)
+    return filas[0][0], False
+
+
+def grilla_paginada(nombre, consulta, orden, filtro="", columnas_filtro=(),
+                    condiciones=(), filas_por_pagina=8, ocultar=(), tablas=(), conn=None, total=None):
+    """
+    Muestra una tabla paginada en el servidor con paginación por cursor (keyset).
+
+    Cada página se pide con `WHERE (orden) > (última fila vista) ORDER BY ... LIMIT n`,
+    así que pasar de página cuesta lo mismo con mil filas que con millones.
+    Los cursores de las páginas visitadas se guardan en session_state para poder
+    volver atrás; cambiar el filtro reinicia la navegación.
+
+    Parámetros:
+        nombre (str): Identificador único de la grilla (claves de session_state y botones).
+        consulta (str): SELECT base sin ORDER BY; se envuelve como subconsulta `t`.
+        orden (list): [(columna, "ASC"|"DESC")]; la última columna debe ser única.
+        filtro (str): Texto a buscar (ILIKE) en `columnas_filtro`.
+        columnas_filtro (tuple): Expresiones sobre `t` donde buscar el filtro.
+        condiciones (tuple): [(sql, params)] adicionales sobre columnas de `t`.
+        filas_por_pagina (int): Tamaño de página.
+        ocultar (tuple): Columnas que se devuelven pero no se muestran.
+        tablas (tuple): Tablas que lee la consulta; si se indican, las páginas se cachean.
+        conn: Conexión abierta; sin ella cada consulta pide una al pool (lo que hace
+            falta dentro de un fragmento, que se re-ejecuta después de devolverla).
+        total (tuple): (total, es_estimado) ya calculado por la pantalla; sin él se
+            llama a `estimar_total` en cada página.
+
+    Devuelve:
+        DataFrame con las filas de la página actual.
+    """
+    where, params = [], []
+    if filtro and columnas_filtro:
+        patron = f"%{escapar_like(filtro.strip())}%"
+        where.append("(" + " OR ".join(f"{c} ILIKE %s" for c in columnas_filtro) + ")")
+        params.extend([patron] * len(columnas_filtro))
+    for sql, valores in condiciones:
+        where.append(f"({sql})")
+        params.extend(valores)
+
+    base = f"SELECT * FROM ({consulta}) AS t"
+    if where:
+        base += " WHERE " + " AND ".join(where)
+
+    # 🔁 Estado de navegación: cursores[i] es la clave de la última fila de la página i-1
+    clave = f"keyset_{nombre}"
+    firma = (filtro, tuple(map(str, params)), filas_por_pagina)
+    estado = st.session_state.get(clave)
+    if not estado or estado["firma"] != firma:
+        estado = {"firma": firma, "cursores": [None]}
+        st.session_state[clave] = estado
+
+    cursor_actual = estado["cursores"][-1]
+    sql, sql_params = base, list(params)
+    if cursor_actual is not None:
+        condicion, valores = _condicion_keyset(orden, cursor_actual)
+        sql += (" AND " if where else " WHERE ") + condicion
+        sql_params += valores
+    sql += " ORDER BY " + ", ".join(f"t.{col} {dir_}" for col, dir_ in orden)
+    sql += f" LIMIT {int(filas_por_pagina) + 1}"
+
+    columnas, filas = consultar_filas(sql, sql_params, tablas, conn)
+
+    hay_siguiente = len(filas) > filas_por_pagina
+    filas = filas[:filas_por_pagina]
+    df = pd.DataFrame(filas, columns=columnas)
+
+    pagina = len(estado["cursores"])
+    if filas:
+        indices = [columnas.index(col) for col, _ in orden]
+        ultimo = tuple(filas[-1][i] for i in indices)
+        total, estimado = total or estimar_total(conn, base, params, tablas)
+        inicio = (pagina - 1) * filas_por_pagina + 1
+        fin = inicio + len(filas) - 1
+        st.dataframe(df.drop(columns=list(ocultar)), use_container_width=True)
+        st.caption(f"Página {pagina} · Mostrando registros {inicio} - {fin} de {'~' if estimado else ''}{total}")
+    else:
+        ultimo = None
+        st.info("ℹ️ No hay registros para mostrar.")
+
+    def _anterior():
+        st.session_state[clave]["cursores"].pop()
+
+    def _siguiente(cursor):
+        st.session_state[clave]["cursores"].append(cursor)
+
+    col_ant, _, col_sig = st.columns([1, 2, 1])
+    with col_ant:
+        st.button("⬅️ Anterior", key=f"{clave}_anterior", disabled=pagina == 1, on_click=_anterior)
+    with col_sig:
+        st.button("➡️ Siguiente", key=f"{clave}_siguiente", disabled=not hay_siguiente,
+                  on_click=_siguiente, args=(ultimo,))
+
+    return df
+
+
+def boton_exportar(etiqueta, sql, params, nombre_archivo, formato="xlsx", max_filas=None, key=None, tablas=()):
+    """
+    Botón de descarga que genera el archivo solo cuando el usuario lo pulsa.
+
+    La exportación corre en streaming (core.exportacion) en un hilo aparte, sin
+    bloquear la página, y se guarda por (consulta, filtros, versión de los datos de
+    `tablas`): descargar otra vez el mismo reporte sin cambios no vuelve a generarlo.
+    """
+    lectura = en_solo_lectura()   # la descarga corre fuera del rerun: se lleva si la pantalla lee de la réplica
+
+    def generar():
+        with solo_lectura(lectura):
+            return exportar_cacheado(sql, params, formato, tablas, max_filas)
+
+    ayuda = "El archivo se genera al hacer clic."
+    if max_filas:
+        ayuda += f" Se exportan como máximo {max_filas} filas."
+    st.download_button(label=etiqueta, data=generar, file_name=nombre_archivo, mime=FORMATOS[formato],
+                       key=key, help=ayuda, on_click="ignore")
+
+
+def selector_partido(key, etiqueta="📅 Partido"):
+    """
+    Buscador de partidos: torneo opcional, texto (equipo, «Local vs Visitante» o
+    fecha) y un selectbox con la página de candidatos que trae la base.
+    Devuelve (id_partido o None, catálogo de candidatos con extras (equipo_local, equipo_visitante)).
+    """
+    torneos = catalogo.torneos()
+    col_torneo, col_texto = st.columns([1, 2])
+    with col_torneo:
+        id_torneo = st.selectbox("🏆 Torneo", [None] + torneos.ids, key=f"{key}_torneo",
+                                 format_func=lambda i: "Todos" if i is None else torneos.etiqueta(i))
+    with col_texto:
+        texto = st.text_input("🔎 Buscar partido", key=f"{key}_texto",
+                              placeholder="Equipo, Local vs Visitante o fecha (2025-08)")
+    candidatos = catalogo.buscar_partidos(texto, id_torneo)
+    if not candidatos:
+        st.caption("Ningún partido coincide con la búsqueda.")
+        return None, candidatos
+    return st.selectbox(etiqueta, candidatos.ids, format_func=candidatos.etiqueta, key=key), candidatos
+
+
+def selector_jugador(key, etiqueta="👤 Jugador", equipos=()):
+    """
+    Buscador de jugadores por nombre; con `equipos` solo busca en esos planteles
+    salvo que el usuario lo desmarque. Devuelve (id_jugador o None, catálogo de candidatos).
+    """
+    col_texto, col_alcance = st.columns([2, 1])
+    with col_texto:
+        texto = st.text_input("🔎 Buscar jugador", key=f"{key}_texto",
+                              placeholder="Nombre o inicio del nombre")
+    if equipos:
+        with col_alcance:
+            if not st.checkbox("Solo de estos equipos", value=True, key=f"{key}_alcance"):
+                equipos = ()
+    candidatos = catalogo.buscar_jugadores(texto, equipos)
+    if not candidatos:
+        st.caption("Ningún jugador coincide con la búsqueda.")
+        return None, candidatos
+    return st.selectbox(etiqueta, candidatos.ids, format_func=candidatos.etiqueta, key=key), candidatos
+
+
+# tipo de resultado -> (ícono, entrada del menú, clave del filtro de esa pantalla)
+DESTINOS_BUSQUEDA = {
+    "jugador": ("👤", "Jugadores", "filtro_jugadores"),
+    "equipo": ("🏟️", "Equipos", "filtro_equipos"),
+    "entrenador": ("🧠", "Entrenadores", None),
+    "torneo": ("🏆", "Partidos", None),
+    "partido": ("📅", "Partidos", None),
+}
+
+
+def resultados_busqueda(texto):
+    """
+    Resultados de la búsqueda global (core/busqueda.py) como botones; al pulsar uno
+    deja en session_state["ir_a"] la pantalla de destino y, si la pantalla tiene
+    filtro, lo completa con el nombre encontrado.
+    """
+    from core.busqueda import buscar
+
+    def _ir(destino, clave_filtro, etiqueta):
+        st.session_state["ir_a"] = destino
+        if clave_filtro:
+            st.session_state[clave_filtro] = etiqueta
+
+    resultados = buscar(texto)
+    if resultados.empty:
+        st.caption("Sin resultados.")
+        return
+    for fila in resultados.itertuples():
+        icono, destino, clave_filtro = DESTINOS_BUSQUEDA[fila.tipo]
+        st.button(f"{icono} {fila.etiqueta}", key=f"busqueda_{fila.tipo}_{fila.id}", help=f"{fila.tipo.capitalize()} · {fila.detalle}",
+                  on_click=_ir, args=(destino, clave_filtro, fila.etiqueta), use_container_width=True)
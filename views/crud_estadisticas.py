@@ -1,119 +1,300 @@
 import streamlit as st
-import pandas as pd
-from core.db import get_connection
+from core.db import conexion
 from features.utils import registrar_entrada
+from views.componentes import grilla_paginada, selector_partido, selector_jugador, fragmento
+from core.cache import consultar, invalidar
+from core.importacion import COLUMNAS, leer_archivo, validar_estadisticas, importar_estadisticas
 
-# 🔄 Paginador elegante
-def paginar_dataframe(df, filas_por_pagina=8, nombre="estadisticas"):
-    total_filas = len(df)
-    total_paginas = (total_filas - 1) // filas_por_pagina + 1
-    pagina = st.number_input("📄 Página", min_value=1, max_value=total_paginas, value=1, key=f"pagina_{nombre}")
-    inicio = (pagina - 1) * filas_por_pagina
-    fin = inicio + filas_por_pagina
-    st.dataframe(df.iloc[inicio:fin], use_container_width=True)
-    st.caption(f"Mostrando registros {inicio + 1} - {min(fin, total_filas)} de {total_filas}")
-
-# 🔍 Filtro por jugador o fecha
-def filtrar_estadisticas(df, texto):
-    return df[df["jugador"].str.lower().str.contains(texto.lower()) |
-              df["fecha"].astype(str).str.contains(texto)]
+# 🧾 Planilla de un partido: los dos planteles con lo ya cargado en ese partido
+def cargar_planilla(partido, conn=None):
+    return consultar("""
+        SELECT j.id_jugador, eq.nombre_equipo AS equipo, j.nombre AS jugador, j.posicion,
+               e.id_jugador IS NOT NULL AS jugo,
+               COALESCE(e.goles, 0)::int AS goles, COALESCE(e.asistencias, 0)::int AS asistencias,
+               COALESCE(e.minutos_jugados, 0)::int AS minutos
+        FROM jugadores j
+        JOIN equipos eq ON eq.id_equipo = j.id_equipo
+        LEFT JOIN estadisticas e ON e.id_jugador = j.id_jugador AND e.id_partido = %(partido)s
+        WHERE j.id_equipo IN (%(local)s, %(visitante)s)
+        ORDER BY j.id_equipo = %(local)s DESC, eq.nombre_equipo, j.posicion, j.nombre
+    """, {"partido": int(partido["id_partido"]), "local": int(partido["equipo_local"]),
+          "visitante": int(partido["equipo_visitante"])},
+        tablas=("jugadores", "equipos", "estadisticas"), conn=conn)
+
+# 🔀 Estadísticas del partido de jugadores que ya no están en ninguno de los dos equipos
+def jugadores_fuera_de_planilla(partido, conn=None):
+    return consultar("""
+        SELECT j.nombre AS jugador, e.goles
+        FROM estadisticas e
+        JOIN jugadores j ON j.id_jugador = e.id_jugador
+        WHERE e.id_partido = %(partido)s
+          AND j.id_equipo IS DISTINCT FROM %(local)s AND j.id_equipo IS DISTINCT FROM %(visitante)s
+        ORDER BY j.nombre
+    """, {"partido": int(partido["id_partido"]), "local": int(partido["equipo_local"]),
+          "visitante": int(partido["equipo_visitante"])},
+        tablas=("jugadores", "estadisticas"), conn=conn)
+
+def guardar_planilla(conn, id_partido, planilla):
+    """
+    Guarda la planilla completa en una sola sentencia: inserta o actualiza a los que
+    jugaron (ON CONFLICT sobre jugador y partido), borra a los desmarcados y pone el
+    marcador con la suma de goles de cada plantel.
+    Si el partido tiene estadísticas de jugadores que ya no están en ninguno de los
+    dos equipos, la suma sería parcial y el marcador no se toca (vuelve como None).
+    Devuelve (insertadas, actualizadas, borradas, marcador_local, marcador_visitante).
+    """
+    jugo = planilla["jugo"].astype(bool)
+    jugaron = planilla[jugo]   # índice: id_jugador
+    cursor = conn.cursor()
+    # Sentencia única: la bitácora recibe una entrada de resumen en vez de una por jugador (migraciones/004)
+    cursor.execute("""
+        SET LOCAL futbol.bitacora_resumida = 'on';
+        WITH planilla AS (
+            SELECT * FROM unnest(%(jugadores)s::int[], %(goles)s::int[], %(asistencias)s::int[], %(minutos)s::int[])
+                AS t(id_jugador, goles, asistencias, minutos)
+        ),
+        borradas AS (
+            DELETE FROM estadisticas
+            WHERE id_partido = %(partido)s AND id_jugador = ANY(%(quitar)s::int[])
+            RETURNING 1
+        ),
+        guardadas AS (
+            INSERT INTO estadisticas (id_jugador, id_partido, goles, asistencias, minutos_jugados)
+            SELECT pl.id_jugador, %(partido)s, pl.goles, pl.asistencias, pl.minutos
+            FROM planilla pl
+            ON CONFLICT (id_jugador, id_partido) DO UPDATE
+            SET goles = EXCLUDED.goles, asistencias = EXCLUDED.asistencias,
+                minutos_jugados = EXCLUDED.minutos_jugados
+            RETURNING xmax = 0 AS insertada
+        ),
+        marcador AS (
+            UPDATE partidos p
+            SET marcador_local = g.local, marcador_visitante = g.visitante
+            FROM (
+                SELECT COALESCE(SUM(pl.goles) FILTER (WHERE j.id_equipo = pa.equipo_local), 0) AS local,
+                       COALESCE(SUM(pl.goles) FILTER (WHERE j.id_equipo = pa.equipo_visitante), 0) AS visitante
+                FROM partidos pa
+                LEFT JOIN planilla pl ON true
+                LEFT JOIN jugadores j ON j.id_jugador = pl.id_jugador
+                WHERE pa.id_partido = %(partido)s
+            ) g
+            WHERE p.id_partido = %(partido)s
+              AND NOT EXISTS (
+                  SELECT 1 FROM estadisticas e
+                  JOIN jugadores j ON j.id_jugador = e.id_jugador
+                  WHERE e.id_partido = %(partido)s
+                    AND j.id_equipo IS DISTINCT FROM p.equipo_local
+                    AND j.id_equipo IS DISTINCT FROM p.equipo_visitante
+              )
+            RETURNING p.marcador_local, p.marcador_visitante
+        )
+        SELECT (SELECT COUNT(*) FROM guardadas WHERE insertada), (SELECT COUNT(*) FROM guardadas WHERE NOT insertada),
+               (SELECT COUNT(*) FROM borradas),
+               (SELECT marcador_local FROM marcador), (SELECT marcador_visitante FROM marcador)
+    """, {
+        "partido": id_partido,
+        "jugadores": jugaron.index.astype(int).tolist(),
+        "goles": jugaron["goles"].astype(int).tolist(),
+        "asistencias": jugaron["asistencias"].astype(int).tolist(),
+        "minutos": jugaron["minutos"].astype(int).tolist(),
+        "quitar": planilla.index[~jugo].astype(int).tolist(),
+    })
+    resultado = cursor.fetchone()
+    conn.commit()
+    return resultado
+
+QUERY_ESTADISTICAS = """
+SELECT est.id_estadistica, j.nombre AS jugador, p.fecha,
+       est.goles, est.asistencias, est.minutos_jugados
+FROM estadisticas est
+JOIN jugadores j ON est.id_jugador = j.id_jugador
+JOIN partidos p ON est.id_partido = p.id_partido
+"""
+
+# 📋 Listado con filtro, paginación y edición: filtrar o cambiar de página solo re-ejecuta esto
+@fragmento
+def listado_estadisticas(rol):
+    try:
+        st.subheader("📋 Estadísticas registradas")
+        filtro = st.text_input("🔎 Filtrar por jugador o fecha", placeholder="Ej. Messi, 2025-08-01")
+        grilla_paginada("estadisticas", QUERY_ESTADISTICAS, [("fecha", "DESC"), ("id_estadistica", "DESC")],
+                        filtro=filtro, columnas_filtro=["t.jugador", "t.fecha::text"],
+                        tablas=("estadisticas", "jugadores", "partidos"))
+
+        if rol == "admin":
+            editar_estadistica()
+
+    except Exception as e:
+        st.error(f"❌ Error en la base de datos: {e}")
+
+# ✏️ Editar / eliminar cualquier estadística: se busca el partido y se elige el jugador
+def editar_estadistica():
+    st.subheader("✏️ Editar o eliminar estadísticas")
+    id_partido, _ = selector_partido("editar_est_partido", etiqueta="🎯 Partido")
+    if id_partido is None:
+        return
+    del_partido = consultar("""
+        SELECT est.id_estadistica, j.nombre AS jugador, est.goles, est.asistencias, est.minutos_jugados
+        FROM estadisticas est
+        JOIN jugadores j ON est.id_jugador = j.id_jugador
+        WHERE est.id_partido = %s
+        ORDER BY j.nombre, est.id_estadistica
+    """, (id_partido,), tablas=("estadisticas", "jugadores"))
+    if del_partido.empty:
+        st.caption("Ese partido no tiene estadísticas registradas.")
+        return
+    jugadores = dict(zip(del_partido["id_estadistica"], del_partido["jugador"]))
+    id_sel = st.selectbox("👤 Jugador", list(jugadores), format_func=jugadores.get, key="editar_est_jugador")
+    fila = del_partido[del_partido["id_estadistica"] == id_sel].iloc[0]
+
+    with st.form("form_edit_est"):
+        col1, col2 = st.columns(2)
+        with col1:
+            nuevos_goles = st.number_input("⚽ Goles", min_value=0, value=fila["goles"])
+            nuevas_asistencias = st.number_input("🎯 Asistencias", min_value=0, value=fila["asistencias"])
+        with col2:
+            nuevos_minutos = st.number_input("⏱️ Minutos jugados", min_value=0, value=fila["minutos_jugados"])
+
+        col_guardar, col_eliminar = st.columns(2)
+        with col_guardar:
+            if st.form_submit_button("💾 Guardar cambios"):
+                with conexion() as conn:
+                    conn.cursor().execute("""
+                        UPDATE estadisticas
+                        SET goles=%s, asistencias=%s, minutos_jugados=%s
+                        WHERE id_estadistica=%s
+                    """, (nuevos_goles, nuevas_asistencias, nuevos_minutos, id_sel))
+                    conn.commit()
+                invalidar("estadisticas")
+                registrar_entrada("estadisticas", "UPDATE", f"Actualizada estadística ID {id_sel}")
+                st.success("✅ Estadística actualizada correctamente")
+                st.rerun()
+
+        with col_eliminar:
+            if st.form_submit_button("🗑️ Eliminar"):
+                with conexion() as conn:
+                    conn.cursor().execute("DELETE FROM estadisticas WHERE id_estadistica=%s", (id_sel,))
+                    conn.commit()
+                invalidar("estadisticas")
+                registrar_entrada("estadisticas", "DELETE", f"Eliminada estadística ID {id_sel}")
+                st.warning("⚠️ Estadística eliminada")
+                st.rerun()
 
 def crud_estadisticas():
     st.title("📊 Gestión Profesional de Estadísticas de Jugadores")
     rol = st.session_state.get("rol")
 
     try:
+        # 📋 Estadísticas registradas y edición (fragmento)
         with st.spinner("Cargando estadísticas..."):
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            query = """
-            SELECT est.id_estadistica, j.nombre AS jugador, p.fecha, 
-                   est.goles, est.asistencias, est.minutos_jugados
-            FROM estadisticas est
-            JOIN jugadores j ON est.id_jugador = j.id_jugador
-            JOIN partidos p ON est.id_partido = p.id_partido
-            ORDER BY p.fecha DESC;
-            """
-            df = pd.read_sql(query, conn)
-
-        st.subheader("📋 Estadísticas registradas")
-        if df.empty:
-            st.info("ℹ️ No hay estadísticas registradas.")
-        else:
-            filtro = st.text_input("🔎 Filtrar por jugador o fecha", placeholder="Ej. Messi, 2025-08-01")
-            if filtro:
-                df = filtrar_estadisticas(df, filtro)
-            paginar_dataframe(df, nombre="estadisticas")
-
-        # Obtener datos para formularios
-        jugadores = pd.read_sql("SELECT id_jugador, nombre FROM jugadores ORDER BY nombre", conn)
-        partidos = pd.read_sql("SELECT id_partido, fecha FROM partidos ORDER BY fecha DESC", conn)
+            listado_estadisticas(rol)
 
         # ➕ Agregar nueva estadística
-        if rol in ["admin", "usuario"] and not jugadores.empty and not partidos.empty:
+        if rol in ["admin", "usuario"]:
             with st.expander("➕ Agregar nueva estadística"):
+                # Los buscadores van fuera del formulario: cada búsqueda tiene que recargar los candidatos
+                id_partido, partidos = selector_partido("estadistica_partido")
+                id_jugador, jugadores = selector_jugador("estadistica_jugador", equipos=partidos.extras.get(id_partido, ()))
                 with st.form("form_estadistica"):
                     col1, col2 = st.columns(2)
                     with col1:
-                        jugador_sel = st.selectbox("👤 Jugador", jugadores["nombre"].tolist())
-                        id_jugador = jugadores[jugadores["nombre"] == jugador_sel]["id_jugador"].values[0]
                         goles = st.number_input("⚽ Goles", min_value=0)
                         asistencias = st.number_input("🎯 Asistencias", min_value=0)
                     with col2:
-                        partido_sel = st.selectbox("📅 Partido (fecha)", partidos["fecha"].astype(str).tolist())
-                        id_partido = partidos[partidos["fecha"].astype(str) == partido_sel]["id_partido"].values[0]
                         minutos = st.number_input("⏱️ Minutos jugados", min_value=0, max_value=150)
 
                     if st.form_submit_button("💾 Guardar"):
-                        if minutos <= 0:
+                        if id_partido is None or id_jugador is None:
+                            st.warning("⚠️ Selecciona el partido y el jugador.")
+                        elif minutos <= 0:
                             st.warning("⚠️ Los minutos jugados deben ser mayores a 0.")
                         else:
-                            cursor.execute("""
-                                INSERT INTO estadisticas (id_jugador, id_partido, goles, asistencias, minutos_jugados)
-                                VALUES (%s, %s, %s, %s, %s)
-                            """, (id_jugador, id_partido, goles, asistencias, minutos))
-                            conn.commit()
-                            registrar_entrada("estadisticas", "INSERT", f"{jugador_sel} - Goles: {goles}, Asistencias: {asistencias}")
-                            st.success("✅ Estadística agregada correctamente")
-                            st.rerun()
-
-        # ✏️ Editar o eliminar estadísticas
-        if rol == "admin" and not df.empty:
-            st.subheader("✏️ Editar o eliminar estadísticas")
-            id_sel = st.selectbox("🎯 Selecciona una estadística por ID", df["id_estadistica"].tolist())
-            fila = df[df["id_estadistica"] == id_sel].iloc[0]
-
-            with st.form("form_edit_est"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    nuevos_goles = st.number_input("⚽ Goles", min_value=0, value=fila["goles"])
-                    nuevas_asistencias = st.number_input("🎯 Asistencias", min_value=0, value=fila["asistencias"])
-                with col2:
-                    nuevos_minutos = st.number_input("⏱️ Minutos jugados", min_value=0, value=fila["minutos_jugados"])
-
-                col_guardar, col_eliminar = st.columns(2)
-                with col_guardar:
-                    if st.form_submit_button("💾 Guardar cambios"):
-                        cursor.execute("""
-                            UPDATE estadisticas
-                            SET goles=%s, asistencias=%s, minutos_jugados=%s
-                            WHERE id_estadistica=%s
-                        """, (nuevos_goles, nuevas_asistencias, nuevos_minutos, id_sel))
-                        conn.commit()
-                        registrar_entrada("estadisticas", "UPDATE", f"Actualizada estadística ID {id_sel}")
-                        st.success("✅ Estadística actualizada correctamente")
-                        st.rerun()
-
-                with col_eliminar:
-                    if st.form_submit_button("🗑️ Eliminar"):
-                        cursor.execute("DELETE FROM estadisticas WHERE id_estadistica=%s", (id_sel,))
-                        conn.commit()
-                        registrar_entrada("estadisticas", "DELETE", f"Eliminada estadística ID {id_sel}")
-                        st.warning("⚠️ Estadística eliminada")
-                        st.rerun()
+                            with conexion() as conn:
+                                cursor = conn.cursor()
+                                cursor.execute("""
+                                    INSERT INTO estadisticas (id_jugador, id_partido, goles, asistencias, minutos_jugados)
+                                    VALUES (%s, %s, %s, %s, %s)
+                                    ON CONFLICT (id_jugador, id_partido) DO NOTHING
+                                """, (id_jugador, id_partido, goles, asistencias, minutos))
+                                conn.commit()
+                            if cursor.rowcount == 0:
+                                st.warning("⚠️ Ese jugador ya tiene estadística en este partido; corrígela en la planilla.")
+                            else:
+                                invalidar("estadisticas")
+                                registrar_entrada("estadisticas", "INSERT", f"{jugadores.etiqueta(id_jugador)} - Goles: {goles}, Asistencias: {asistencias}")
+                                st.success("✅ Estadística agregada correctamente")
+                                st.rerun()
+
+        # 🧾 Planilla: todo un partido en una grilla y un solo guardado
+        if rol in ["admin", "usuario"]:
+            with st.expander("🧾 Planilla del partido"):
+                partido_sel, partidos = selector_partido("planilla_partido")
+                if partido_sel is not None:
+                    local, visitante = partidos.extras[partido_sel]
+                    partido = {"id_partido": partido_sel, "equipo_local": local, "equipo_visitante": visitante,
+                               "descripcion": partidos.etiqueta(partido_sel)}
+                    planilla = cargar_planilla(partido).set_index("id_jugador")
+                    fuera = jugadores_fuera_de_planilla(partido)
+                    if not fuera.empty:
+                        st.info(f"ℹ️ Con estadística en este partido pero fuera de los dos equipos: "
+                                f"{', '.join(fuera['jugador'])}. No aparecen en la planilla y el marcador "
+                                "no se recalcula al guardar.")
+                    if planilla.empty:
+                        st.info("ℹ️ Ninguno de los dos equipos tiene jugadores registrados.")
+                    else:
+                        with st.form("form_planilla"):
+                            editada = st.data_editor(
+                                planilla, num_rows="fixed", hide_index=True, use_container_width=True,
+                                key=f"planilla_{partido['id_partido']}",
+                                disabled=["equipo", "jugador", "posicion"],
+                                column_config={
+                                    "jugo": st.column_config.CheckboxColumn("Jugó"),
+                                    "goles": st.column_config.NumberColumn("⚽ Goles", min_value=0, step=1),
+                                    "asistencias": st.column_config.NumberColumn("🎯 Asistencias", min_value=0, step=1),
+                                    "minutos": st.column_config.NumberColumn("⏱️ Minutos", min_value=0, max_value=150, step=1),
+                                },
+                            )
+                            if st.form_submit_button("💾 Guardar planilla"):
+                                sin_minutos = editada[editada["jugo"].astype(bool) & (editada["minutos"] <= 0)]
+                                if not sin_minutos.empty:
+                                    st.warning(f"⚠️ Faltan los minutos jugados de: {', '.join(sin_minutos['jugador'])}")
+                                else:
+                                    with conexion() as conn:
+                                        insertadas, actualizadas, borradas, local, visitante = guardar_planilla(
+                                            conn, int(partido["id_partido"]), editada)
+                                    invalidar("estadisticas", "partidos")
+                                    marcador = "sin cambios" if local is None else f"{local}-{visitante}"
+                                    registrar_entrada("estadisticas", "UPSERT",
+                                                      f"Planilla {partido['descripcion']}: {insertadas} nuevas, "
+                                                      f"{actualizadas} actualizadas, {borradas} eliminadas; marcador {marcador}")
+                                    st.success(f"✅ Planilla guardada · marcador {marcador}")
+                                    st.rerun()
+
+        # 📥 Importar una jornada completa desde CSV o XLSX
+        if rol in ["admin", "usuario"]:
+            with st.expander("📥 Importar estadísticas desde archivo"):
+                st.caption(f"Columnas: {', '.join(COLUMNAS)}. Jugador y partido pueden ser el ID, el nombre "
+                           "del jugador y «Local vs Visitante - AAAA-MM-DD» (o solo la fecha si ese día hubo un partido). "
+                           "Si el jugador ya tiene estadística en ese partido, se actualiza.")
+                archivo = st.file_uploader("📄 Archivo CSV o XLSX", type=["csv", "xlsx"], key="importar_estadisticas")
+                if archivo is not None:
+                    try:
+                        validas, errores = validar_estadisticas(leer_archivo(archivo, archivo.name))
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        if not errores.empty:
+                            st.error(f"❌ {len(errores)} filas con errores; corrige el archivo y vuelve a subirlo.")
+                            st.dataframe(errores, use_container_width=True, hide_index=True)
+                        else:
+                            st.dataframe(validas.head(20), use_container_width=True, hide_index=True)
+                            if st.button(f"📥 Importar {len(validas)} filas"):
+                                insertadas, actualizadas = importar_estadisticas(validas)
+                                invalidar("estadisticas")
+                                registrar_entrada("estadisticas", "IMPORT",
+                                                  f"Importación de {archivo.name}: {insertadas} nuevas, {actualizadas} actualizadas")
+                                st.success(f"✅ {insertadas} estadísticas nuevas y {actualizadas} actualizadas")
+                                st.rerun()
 
     except Exception as e:
         st.error(f"❌ Error en la base de datos: {e}")
-    finally:
-        conn.close()
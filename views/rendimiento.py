@@ -0,0 +1,108 @@
+import streamlit as st
+import pandas as pd
+from core.db import conexion, consultas_recientes, limpiar_consultas_recientes, estadisticas_pool, estadisticas_replica
+from core.cache import estadisticas_cache
+from core.exportacion import estadisticas_exportaciones
+
+# ⏱️ Panel de rendimiento (solo administradores)
+# Lee el buffer de sentencias que registra core/db (CursorMedido) y los contadores
+# del pool, la caché de consultas y las exportaciones de este proceso.
+
+COLUMNAS = ["momento", "pantalla", "ejecucion", "sentencia", "segundos", "filas"]
+
+
+def percentiles(df, por):
+    """p50/p95/p99 y totales en milisegundos agrupando por `por`, los de más tiempo total primero."""
+    ms = df.assign(ms=df["segundos"] * 1000).groupby(por)
+    resumen = ms["ms"].agg(
+        veces="count",
+        p50=lambda s: s.quantile(0.50),
+        p95=lambda s: s.quantile(0.95),
+        p99=lambda s: s.quantile(0.99),
+        total_ms="sum",
+    )
+    resumen["filas_prom"] = ms["filas"].mean()
+    return resumen.sort_values("total_ms", ascending=False).round(1).reset_index()
+
+
+def conexiones_servidor():
+    """Conexiones a esta base según pg_stat_activity, por estado."""
+    with conexion() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT COALESCE(state, 'sin estado') AS estado, COUNT(*) AS conexiones
+            FROM pg_stat_activity
+            WHERE datname = current_database()
+            GROUP BY 1 ORDER BY 2 DESC
+        """)
+        filas = cur.fetchall()
+        cur.execute("SHOW max_connections")
+        maximo = int(cur.fetchone()[0])
+    return pd.DataFrame(filas, columns=["estado", "conexiones"]), maximo
+
+
+def mostrar_rendimiento():
+    st.title("⏱️ Rendimiento")
+    st.caption("Sentencias ejecutadas por este proceso desde que arrancó (o desde la última limpieza).")
+
+    # 🏊 Conexiones
+    st.subheader("🏊 Conexiones")
+    pool = estadisticas_pool()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Abiertas (pool)", f"{pool['abiertas']} / {pool['maximo']}")
+    col2.metric("En uso", pool["en_uso"], help=f"Pico: {pool['pico_en_uso']}")
+    col3.metric("Esperas por una libre", pool["esperas"], help=f"Sin conexión tras la espera máxima: {pool['agotado']}")
+    col4.metric("Creadas / reutilizadas", f"{pool['creadas']} / {pool['reutilizadas']}")
+    servidor, maximo = conexiones_servidor()
+    st.caption(f"En el servidor: {int(servidor['conexiones'].sum())} de {maximo} conexiones permitidas")
+    st.dataframe(servidor, hide_index=True)
+
+    replica = estadisticas_replica()
+    if replica is not None:
+        st.markdown("**🪞 Réplica de lectura**")
+        retraso = "sin medir" if replica["retraso"] is None else f"{replica['retraso']:.1f}s"
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Estado", "Disponible" if replica["disponible"] else "Caída",
+                    help=replica["ultimo_error"] or f"Retraso tolerado: {replica['retraso_max']:.0f}s")
+        col2.metric("Retraso", retraso)
+        col3.metric("Conexiones a la réplica", replica["lecturas"], help=f"Abiertas: {replica['pool']['abiertas']}")
+        col4.metric("Desviadas a la principal", replica["por_caida"] + replica["por_retraso"] + replica["por_escritura"],
+                    help=f"Réplica caída: {replica['por_caida']}, atrasada: {replica['por_retraso']}, "
+                         f"datos recién escritos: {replica['por_escritura']}")
+
+    # 🗃️ Cachés
+    st.subheader("🗃️ Caché de consultas y exportaciones")
+    cache = estadisticas_cache()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Aciertos de caché", f"{cache['tasa_aciertos']:.0%}", help=f"{cache['aciertos']} aciertos, {cache['fallos']} fallos")
+    col2.metric("Entradas", cache["entradas"], help=f"{cache['bytes'] / 1024 / 1024:.1f} de {cache['max_bytes'] / 1024 / 1024:.0f} MB")
+    col3.metric("Invalidaciones", cache["invalidaciones"], help=f"Desalojos: {cache['desalojos']}, caducadas: {cache['caducadas']}")
+    st.json(estadisticas_exportaciones(), expanded=False)
+
+    # 📈 Sentencias
+    df = pd.DataFrame(consultas_recientes(), columns=COLUMNAS)
+    if df.empty:
+        st.info("ℹ️ Todavía no se registraron sentencias.")
+        return
+    df["pantalla"] = df["pantalla"].fillna("(fuera de una pantalla)")
+    df["momento"] = pd.to_datetime(df["momento"], unit="s")
+    st.caption(f"{len(df)} sentencias desde {df['momento'].min():%H:%M:%S}")
+
+    st.subheader("🖥️ Por pantalla")
+    por_pantalla = percentiles(df, "pantalla")
+    # Idas y vueltas a la base por cada vez que se dibuja la pantalla
+    viajes = df.dropna(subset=["ejecucion"]).groupby(["pantalla", "ejecucion"]).size().groupby("pantalla").mean()
+    por_pantalla["sentencias_por_ejecucion"] = por_pantalla["pantalla"].map(viajes).round(1)
+    st.dataframe(por_pantalla, hide_index=True, use_container_width=True)
+
+    st.subheader("🧮 Por sentencia")
+    st.dataframe(percentiles(df, "sentencia").head(50), hide_index=True, use_container_width=True,
+                 column_config={"sentencia": st.column_config.TextColumn(width="large")})
+
+    st.subheader("🐢 Las más lentas")
+    lentas = df.nlargest(20, "segundos").assign(ms=lambda d: (d["segundos"] * 1000).round(1))
+    st.dataframe(lentas[["momento", "pantalla", "ms", "filas", "sentencia"]], hide_index=True, use_container_width=True)
+
+    if st.button("🧹 Limpiar registro"):
+        limpiar_consultas_recientes()
+        st.rerun()
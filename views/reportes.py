@@ -1,17 +1,10 @@
 import streamlit as st
-import pandas as pd
-import io
-import requests
-import matplotlib.pyplot as plt
-from core.db import get_connection
+from core.cache import consultar, consultar_en_paralelo
+from views.componentes import boton_exportar, tabla_por_paginas
 from streamlit_lottie import st_lottie
+from core.animaciones import cargar_animacion
+from core.trazas import tramo
 
-# 🌀 Lottie
-def cargar_lottie(url):
-    r = requests.get(url)
-    if r.status_code == 200:
-        return r.json()
-    return None
 
 # 📜 Reportes
 def reportes():
@@ -29,110 +22,168 @@ def reportes():
 
     st.markdown('<h1 class="titulo">📊 Reportes del Sistema de Gestión Futbolística</h1>', unsafe_allow_html=True)
 
-    animacion = cargar_lottie("https://lottie.host/8f1c5566-e4b9-4d08-8ad0-9b7348441bfb/yvOKmBGz1L.json")
+    animacion = cargar_animacion("reportes")
     if animacion:
-        st_lottie(animacion, height=180)
+        with tramo("lottie.dibujar"):
+            st_lottie(animacion, height=180)
 
+    # Con on_change="rerun" cada pestaña sabe si está abierta (.open) y solo se
+    # consulta lo de la que se está mirando
+    tab1, tab2 = st.tabs(["🏃 Rendimiento de Jugadores", "📅 Historial de Partidos"],
+                         key="reportes_pestana", on_change="rerun")
     try:
-        conn = get_connection()
-        tab1, tab2 = st.tabs(["🏃 Rendimiento de Jugadores", "📅 Historial de Partidos"])
-
         # 🎯 TAB 1 - Rendimiento
-        with tab1:
-            st.subheader("🧑‍💼 Rendimiento por partido")
-
-            query1 = """
-                SELECT
-                    j.nombre AS jugador,
-                    e.nombre_equipo AS equipo,
-                    p.fecha AS fecha_partido,
-                    est.goles,
-                    est.asistencias,
-                    est.minutos_jugados
-                FROM estadisticas est
-                JOIN jugadores j ON est.id_jugador = j.id_jugador
-                LEFT JOIN equipos e ON j.id_equipo = e.id_equipo
-                JOIN partidos p ON est.id_partido = p.id_partido
-                ORDER BY p.fecha DESC;
-            """
-            df1 = pd.read_sql(query1, conn)
-
-            if not df1.empty:
-                # Filtros
-                jugador_sel = st.selectbox("🔎 Filtrar por jugador", ["Todos"] + sorted(df1["jugador"].unique().tolist()))
-                equipo_sel = st.selectbox("🏳️ Filtrar por equipo", ["Todos"] + sorted(df1["equipo"].dropna().unique().tolist()))
-
-                if jugador_sel != "Todos":
-                    df1 = df1[df1["jugador"] == jugador_sel]
-                if equipo_sel != "Todos":
-                    df1 = df1[df1["equipo"] == equipo_sel]
-
-                # Paginación
-                filas_pagina = 10
-                pagina = st.number_input("📄 Página", min_value=1, max_value=(len(df1) // filas_pagina + 1), step=1)
-                inicio = (pagina - 1) * filas_pagina
-                fin = inicio + filas_pagina
-
-                st.dataframe(df1.iloc[inicio:fin], use_container_width=True)
-
-                # Descarga
-                excel_buffer = io.BytesIO()
-                df1.to_excel(excel_buffer, index=False, engine='openpyxl')
-                st.download_button("📥 Descargar rendimiento", data=excel_buffer.getvalue(), file_name="reporte_rendimiento.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
-                # 📊 Gráfico
-                st.subheader("📊 Goles por jugador")
-                top_goleadores = df1.groupby("jugador")["goles"].sum().sort_values(ascending=False).head(10)
-                st.bar_chart(top_goleadores)
+        if tab1.open:
+            with tab1:
+                rendimiento_jugadores()
 
         # 🎯 TAB 2 - Partidos
-        with tab2:
-            st.subheader("🏟️ Historial completo de partidos")
-
-            query2 = """
-                SELECT
-                    p.fecha,
-                    el.nombre_equipo AS equipo_local,
-                    ev.nombre_equipo AS equipo_visitante,
-                    p.marcador_local,
-                    p.marcador_visitante
-                FROM partidos p
-                JOIN equipos el ON p.equipo_local = el.id_equipo
-                JOIN equipos ev ON p.equipo_visitante = ev.id_equipo
-                ORDER BY p.fecha DESC;
-            """
-            df2 = pd.read_sql(query2, conn)
-
-            if not df2.empty:
-                # Filtro por equipo
-                equipos = sorted(set(df2["equipo_local"]).union(df2["equipo_visitante"]))
-                filtro_equipo = st.selectbox("🏁 Filtrar por equipo", ["Todos"] + equipos)
-                if filtro_equipo != "Todos":
-                    df2 = df2[(df2["equipo_local"] == filtro_equipo) | (df2["equipo_visitante"] == filtro_equipo)]
-
-                # Paginación
-                filas_pagina = 10
-                pagina = st.number_input("📄 Página de partidos", min_value=1, max_value=(len(df2) // filas_pagina + 1), step=1, key="partidos_pagina")
-                inicio = (pagina - 1) * filas_pagina
-                fin = inicio + filas_pagina
-
-                st.dataframe(df2.iloc[inicio:fin], use_container_width=True)
-
-                # Descarga
-                excel_buffer = io.BytesIO()
-                df2.to_excel(excel_buffer, index=False, engine='openpyxl')
-                st.download_button("📥 Descargar historial", data=excel_buffer.getvalue(), file_name="reporte_historial.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
-                # 📊 Gráfico
-                st.subheader("📈 Promedio de goles por partido")
-                df2["total_goles"] = df2["marcador_local"] + df2["marcador_visitante"]
-                fig, ax = plt.subplots()
-                df2.groupby("fecha")["total_goles"].mean().plot(ax=ax)
-                ax.set_title("Promedio de goles por fecha")
-                ax.set_ylabel("Goles")
-                st.pyplot(fig)
+        if tab2.open:
+            with tab2:
+                historial_partidos()
 
     except Exception as e:
         st.error(f"❌ Error al generar los reportes: {e}")
-    finally:
-        conn.close()
+
+
+def _filtro(valor):
+    return None if valor in (None, "Todos") else valor
+
+
+def rendimiento_jugadores():
+    st.subheader("🧑‍💼 Rendimiento por partido")
+
+    query1 = """
+        SELECT
+            j.nombre AS jugador,
+            e.nombre_equipo AS equipo,
+            p.fecha AS fecha_partido,
+            est.goles,
+            est.asistencias,
+            est.minutos_jugados
+        FROM estadisticas est
+        JOIN jugadores j ON est.id_jugador = j.id_jugador
+        LEFT JOIN equipos e ON j.id_equipo = e.id_equipo
+        JOIN partidos p ON est.id_partido = p.id_partido
+        ORDER BY p.fecha DESC;
+    """
+    query_goles = """
+        SELECT j.nombre AS jugador, t.goles
+        FROM totales_jugadores t
+        JOIN jugadores j ON t.id_jugador = j.id_jugador
+        LEFT JOIN equipos e ON j.id_equipo = e.id_equipo
+        WHERE (%(jugador)s IS NULL OR j.nombre = %(jugador)s)
+          AND (%(equipo)s IS NULL OR e.nombre_equipo = %(equipo)s)
+        ORDER BY t.goles DESC
+        LIMIT 10;
+    """
+    tablas_goles = ("totales_jugadores", "jugadores", "equipos")
+
+    # Los filtros de este rerun ya están en session_state, así que el gráfico no tiene
+    # que esperar a la tabla: las dos consultas salen a la vez
+    filtros = {
+        "jugador": _filtro(st.session_state.get("reportes_jugador")),
+        "equipo": _filtro(st.session_state.get("reportes_equipo")),
+    }
+    resultados = consultar_en_paralelo({
+        "rendimiento": (query1, None, ("estadisticas", "jugadores", "equipos", "partidos")),
+        "goles": (query_goles, filtros, tablas_goles),
+    })
+    panel_tabla = st.empty()
+    panel_tabla.caption("⏳ Cargando...")
+    panel_grafico = st.empty()
+
+    def grafico(top_goleadores):
+        with panel_grafico.container():
+            st.subheader("📊 Goles por jugador")
+            st.bar_chart(top_goleadores.groupby("jugador")["goles"].sum().sort_values(ascending=False))
+
+    for nombre, df in resultados:
+        if nombre == "goles":
+            if filtros is not None:
+                grafico(df)
+            continue
+        with panel_tabla.container():
+            elegidos = tabla_rendimiento(query1, df)
+        if elegidos is None:
+            panel_grafico.empty()   # sin estadísticas no hay gráfico
+            filtros = None
+        elif elegidos != filtros:
+            # Un filtro que ya no está entre las opciones volvió a "Todos": se repite el gráfico
+            filtros = None
+            grafico(consultar(query_goles, elegidos, tablas=tablas_goles))
+
+
+def tabla_rendimiento(query1, df1):
+    """Filtros, página y descarga del rendimiento; devuelve los filtros elegidos (None si no hay datos)."""
+    if df1.empty:
+        return None
+
+    # Filtros
+    jugador_sel = st.selectbox("🔎 Filtrar por jugador", ["Todos"] + sorted(df1["jugador"].unique().tolist()),
+                               key="reportes_jugador")
+    equipo_sel = st.selectbox("🏳️ Filtrar por equipo", ["Todos"] + sorted(df1["equipo"].dropna().unique().tolist()),
+                              key="reportes_equipo")
+
+    filtros = {"jugador": _filtro(jugador_sel), "equipo": _filtro(equipo_sel)}
+    if jugador_sel != "Todos":
+        df1 = df1[df1["jugador"] == jugador_sel]
+    if equipo_sel != "Todos":
+        df1 = df1[df1["equipo"] == equipo_sel]
+
+    # Paginación (fragmento: cambiar de página no vuelve a consultar ni a dibujar el gráfico)
+    tabla_por_paginas(df1, 10)
+
+    # Descarga
+    query_export = f"""
+        SELECT * FROM ({query1.strip().rstrip(';')}) AS r
+        WHERE (%(jugador)s IS NULL OR r.jugador = %(jugador)s)
+          AND (%(equipo)s IS NULL OR r.equipo = %(equipo)s)
+        ORDER BY r.fecha_partido DESC
+    """
+    boton_exportar("📥 Descargar rendimiento", query_export, filtros, "reporte_rendimiento.xlsx",
+                   tablas=("estadisticas", "jugadores", "equipos", "partidos"))
+    return filtros
+
+
+def historial_partidos():
+    st.subheader("🏟️ Historial completo de partidos")
+
+    query2 = """
+        SELECT
+            p.fecha,
+            el.nombre_equipo AS equipo_local,
+            ev.nombre_equipo AS equipo_visitante,
+            p.marcador_local,
+            p.marcador_visitante
+        FROM partidos p
+        JOIN equipos el ON p.equipo_local = el.id_equipo
+        JOIN equipos ev ON p.equipo_visitante = ev.id_equipo
+        ORDER BY p.fecha DESC;
+    """
+    df2 = consultar(query2, tablas=("partidos", "equipos"))
+
+    if not df2.empty:
+        # Filtro por equipo
+        equipos = sorted(set(df2["equipo_local"]).union(df2["equipo_visitante"]))
+        filtro_equipo = st.selectbox("🏁 Filtrar por equipo", ["Todos"] + equipos)
+        if filtro_equipo != "Todos":
+            df2 = df2[(df2["equipo_local"] == filtro_equipo) | (df2["equipo_visitante"] == filtro_equipo)]
+
+        # Paginación
+        tabla_por_paginas(df2, 10, "📄 Página de partidos", key="partidos_pagina")
+
+        # Descarga
+        boton_exportar("📥 Descargar historial", query2, None, "reporte_historial.xlsx", tablas=("partidos", "equipos"))
+
+        # 📊 Gráfico
+        st.subheader("📈 Promedio de goles por partido")
+        df2["total_goles"] = df2["marcador_local"] + df2["marcador_visitante"]
+        with tramo("grafico", tipo="matplotlib.line"):
+            import matplotlib.pyplot as plt   # solo cuando se dibuja: tarda en importarse
+            fig, ax = plt.subplots()
+            df2.groupby("fecha")["total_goles"].mean().plot(ax=ax)
+            ax.set_title("Promedio de goles por fecha")
+            ax.set_ylabel("Goles")
+            st.pyplot(fig)
+            plt.close(fig)
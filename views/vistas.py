@@ -2,53 +2,36 @@
 
 import streamlit as st
 import pandas as pd
-import psycopg2
-import io
+from psycopg2 import sql
+from core.cache import consultar
+from views.componentes import boton_exportar, tabla_por_paginas
 from streamlit_lottie import st_lottie
-import json
-import matplotlib.pyplot as plt
-
-# 🎨 Animación
-def cargar_animacion(ruta):
-    try:
-        with open(ruta, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        st.warning(f"No se pudo cargar la animación: {e}")
-        return None
-
-# ⚙️ Conexión
-def conectar_bd():
-    return psycopg2.connect(
-        host="localhost",
-        database="futbol_gestion",
-        user="postgres",
-        password="12345"
-    )
+from core.animaciones import cargar_animacion
+from core.trazas import tramo, trazado
 
 # 🧾 Cargar vista
 def cargar_vista(nombre_vista):
-    conn = conectar_bd()
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT * FROM {nombre_vista}")
-    columnas = [desc[0] for desc in cursor.description]
-    datos = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return pd.DataFrame(datos, columns=columnas)
-
-# 📤 Exportar Excel
-def descargar_excel(df, nombre_archivo):
-    buffer = io.BytesIO()
-    df.to_excel(buffer, index=False, engine='openpyxl')
-    st.download_button(
-        label="📥 Descargar Excel",
-        data=buffer.getvalue(),
-        file_name=nombre_archivo,
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    return consultar(f"SELECT * FROM {nombre_vista}", tablas=(nombre_vista,))
+
+# 📤 Exportar Excel (los filtros elegidos se aplican en SQL y las filas van en streaming)
+@trazado("descargar_excel")
+def descargar_excel(nombre_vista, filtros, nombre_archivo):
+    condiciones, params = [], []
+    for col, seleccionados in filtros.items():
+        valores = [v.item() if hasattr(v, "item") else v for v in seleccionados if not pd.isna(v)]
+        condicion = sql.SQL("{} = ANY(%s)").format(sql.Identifier(col))
+        if len(valores) < len(seleccionados):
+            condicion = sql.SQL("({} OR {} IS NULL)").format(condicion, sql.Identifier(col))
+        condiciones.append(condicion)
+        params.append(valores)
+
+    consulta = sql.SQL("SELECT * FROM {}").format(sql.Identifier(nombre_vista))
+    if condiciones:
+        consulta += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(condiciones)
+    boton_exportar("📥 Descargar Excel", consulta, params, nombre_archivo, tablas=(nombre_vista,))
 
 # 📊 Gráfico básico por columna
+@trazado("grafico")
 def mostrar_graficos(df):
     st.markdown("### 📈 Gráficos")
     if 'jugador' in df.columns and 'goles' in df.columns:
@@ -56,18 +39,21 @@ def mostrar_graficos(df):
         st.bar_chart(goles)
     if 'equipo' in df.columns:
         equipo_counts = df['equipo'].value_counts()
+        import matplotlib.pyplot as plt   # diferido: solo lo usa este gráfico
         fig, ax = plt.subplots()
         ax.pie(equipo_counts, labels=equipo_counts.index, autopct='%1.1f%%', startangle=90)
         ax.axis('equal')
         st.pyplot(fig)
+        plt.close(fig)
 
 # 🖥️ Interfaz principal
 def mostrar_vistas():
     st.set_page_config(page_title="Vistas Globales", layout="wide")
 
-    animacion = cargar_animacion("animaciones/futbol.json")
+    animacion = cargar_animacion("vistas")
     if animacion:
-        st_lottie(animacion, height=180, speed=1, key="animacion_futbol")
+        with tramo("lottie.dibujar"):
+            st_lottie(animacion, height=180, speed=1, key="animacion_futbol")
 
     st.title("📊 Reportes Globales del Sistema Futbolístico")
     st.markdown("Consulta las vistas avanzadas del sistema de forma elegante y profesional.")
@@ -93,23 +79,19 @@ def mostrar_vistas():
         else:
             # 🔍 Filtro por columnas
             columnas_filtrables = st.multiselect("🔎 Filtrar por columnas:", df.columns.tolist())
+            filtros = {}
             for col in columnas_filtrables:
                 valores = df[col].unique()
                 seleccionados = st.multiselect(f"Filtrar {col}:", valores)
                 if seleccionados:
                     df = df[df[col].isin(seleccionados)]
+                    filtros[col] = seleccionados
 
             # 📄 Paginación
             filas_por_pagina = st.selectbox("📄 Filas por página:", [5, 10, 20, 50], index=1)
-            total_filas = len(df)
-            total_paginas = (total_filas - 1) // filas_por_pagina + 1
-            pagina_actual = st.number_input("📍 Página:", min_value=1, max_value=total_paginas, step=1)
+            tabla_por_paginas(df, filas_por_pagina, "📍 Página:")
 
-            inicio = (pagina_actual - 1) * filas_por_pagina
-            fin = inicio + filas_por_pagina
-            st.dataframe(df.iloc[inicio:fin], use_container_width=True)
-
-            descargar_excel(df, archivo_excel)
+            descargar_excel(nombre_vista, filtros, archivo_excel)
 
             # 📊 Mostrar gráficos decorativos
             mostrar_graficos(df)